@@ -0,0 +1,65 @@
+import argparse
+import os
+import sys
+import time
+
+# Put the repository root first on sys.path so src and benchmarks resolve to this checkout
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import numpy as np
+import pandas as pd
+from src.backtesting import backtest, forecast_metrics
+
+
+def string_round_trip(predicted, actual):
+    # What app.py did per forecast table: format to 2-decimal strings, parse back, then compute accuracy
+    forecast_df = pd.DataFrame({'Predicted': predicted, 'Actual': actual})
+    forecast_df = forecast_df.map(lambda x: f"{x:.2f}")
+    accuracy = (1 - abs(forecast_df['Predicted'].astype(float) - forecast_df['Actual'].astype(float))
+                / forecast_df['Actual'].astype(float)) * 100
+    return accuracy.mean()
+
+
+def synthetic_series(countries, years, seed=0):
+    # Two trending yearly series per country, visitors and expenditure
+    rng = np.random.default_rng(seed)
+    index = np.arange(2024 - years, 2024)
+    return {(f"Country {c}", column): pd.Series(np.cumsum(rng.uniform(-1, 3, years)) * scale + scale * 10, index=index)
+            for c in range(countries) for column, scale in (('visitors', 1.0), ('expenditure', 60.0))}
+
+
+def timed(func, repeat=3):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        timings.append(time.perf_counter() - start)
+    return result, min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Backtest metrics: string round-trips vs vectorized, serial vs pool')
+    parser.add_argument('--countries', type=int, default=19)
+    parser.add_argument('--years', type=int, default=12)
+    parser.add_argument('--workers', type=int, default=os.cpu_count())
+    args = parser.parse_args()
+
+    # Metrics alone, over a large block of stored forecasts
+    rng = np.random.default_rng(1)
+    actual = rng.uniform(10, 100, (args.countries * 2, 200, 3))
+    predicted = actual * rng.normal(1, 0.05, actual.shape)
+    _, looped = timed(lambda: [string_round_trip(p, a) for p, a in zip(predicted.reshape(-1, 3), actual.reshape(-1, 3))],
+                      repeat=1)
+    _, vectorized = timed(lambda: forecast_metrics(predicted, actual, axis=1))
+    print(f"{actual.size:,} forecasts  string round-trip {looped * 1000:>8.1f}ms   "
+          f"vectorized {vectorized * 1000:>6.2f}ms ({looped / vectorized:,.0f}x)")
+
+    series = synthetic_series(args.countries, args.years)
+    for workers in sorted({1, args.workers}):
+        results, seconds = timed(lambda: backtest(series, models=('ets', 'sarimax'), workers=workers), repeat=1)
+        print(f"{len(series)} series x {args.years} years, {int(results['origins'].sum())} forecasts, "
+              f"{workers} worker(s): {seconds:.2f}s")
+
+
+if __name__ == '__main__':
+    main()
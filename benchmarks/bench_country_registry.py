@@ -0,0 +1,114 @@
+import argparse
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+# Put the repository root first on sys.path so src and benchmarks resolve to this checkout
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import numpy as np
+import pandas as pd
+from benchmarks.common import ROOT, run_isolated
+from src.data_preprocessing import load_workbook
+
+SPEC = os.path.join(ROOT, 'data', 'specs', 'thailand.json')
+COUNTRIES = [
+    "Thailand", "Oman", "United Arab Emirates", "Saudi Arabia", "Qatar",
+    "United Kingdom", "United States", "Canada", "Turkey", "France",
+    "Italy", "Greece", "Spain", "Egypt", "Morocco", "Colombia",
+    "China", "Japan", "India"
+]
+
+# One app server's life in a fresh interpreter: start up, index every country, then let sessions switch
+# between countries and open every view, measuring RSS after each switch
+SERVER = '''
+import json, time
+start = time.perf_counter()
+from benchmarks.common import rss_kb
+from src.datasets import DatasetRegistry, view_sources
+from src.views import load_country_specs
+
+registry = DatasetRegistry(load_country_specs({specs_dir!r}), max_loaded={max_loaded}, cache_dir={cache_dir!r})
+startup_ms = (time.perf_counter() - start) * 1000
+start = time.perf_counter()
+index = registry.index()
+index_ms = (time.perf_counter() - start) * 1000
+
+baseline_kb = rss_kb()
+samples = []
+for country in registry.countries() * {rounds}:
+    store = registry.store(country)
+    spec = registry.spec(country)
+    for view in spec['views']:
+        for source in view_sources(spec, view):
+            store.table(source)
+    del store
+    samples.append(rss_kb())
+steady = samples[len(registry.countries()):] or samples
+print(json.dumps({{'startup_ms': startup_ms, 'index_ms': index_ms, 'countries': len(index),
+                  'baseline_kb': baseline_kb, 'first_kb': samples[0], 'steady_kb': max(steady),
+                  'loaded': len(registry.loaded())}}))
+'''
+
+
+def onboard(tmp, countries, scale, seed=0):
+    # A workbook and spec per country: Thailand's sheets with rescaled numbers and the Visitor Arrivals sheet
+    # repeated scale times, so each country holds a realistic amount of data
+    rng = np.random.default_rng(seed)
+    sheets = load_workbook(os.path.join(ROOT, 'data', 'new_tourism_data_2010_2015_fixed.xlsx'))
+    with open(SPEC, encoding='utf-8') as f:
+        template = json.load(f)
+    specs_dir = os.path.join(tmp, 'specs')
+    os.makedirs(specs_dir)
+    for country in countries:
+        slug = country.lower().replace(' ', '-')
+        workbook = os.path.join(tmp, f"{slug}.xlsx")
+        factor = rng.uniform(0.2, 2.0)
+        with pd.ExcelWriter(workbook) as writer:
+            for sheet, df in sheets.items():
+                if sheet == 'Visitor Arrivals':
+                    df = df.loc[np.tile(df.index, scale)]
+                numeric = df.columns.drop('Year', errors='ignore')
+                numeric = [column for column in numeric if pd.api.types.is_numeric_dtype(df[column])]
+                df = df.assign(**{column: df[column] * factor for column in numeric})
+                df.to_excel(writer, sheet_name=sheet, index=False)
+        spec = dict(template, country=country, workbook=workbook)
+        with open(os.path.join(specs_dir, f"{slug}.json"), 'w', encoding='utf-8') as f:
+            json.dump(spec, f)
+    return specs_dir
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Startup time and steady-state RSS with many onboarded countries')
+    parser.add_argument('--countries', type=int, default=len(COUNTRIES))
+    parser.add_argument('--scale', type=int, default=20, help='copies of the Visitor Arrivals sheet per country')
+    parser.add_argument('--max-loaded', type=int, default=2)
+    parser.add_argument('--rounds', type=int, default=2, help='passes over every country')
+    args = parser.parse_args()
+
+    tmp = tempfile.mkdtemp(prefix='wavetour-bench-')
+    try:
+        start = time.perf_counter()
+        specs_dir = onboard(tmp, COUNTRIES[:args.countries], args.scale)
+        print(f"onboarded {args.countries} synthetic countries in {time.perf_counter() - start:.1f}s")
+        cache_dir = os.path.join(tmp, '.cache')
+
+        # The first server parses every workbook while indexing; later ones find the cache and manifests
+        variants = [('cold start', args.max_loaded), ('warm start', args.max_loaded),
+                    ('one store per country (before)', args.countries)]
+        print(f"{'':<32}{'startup':>10}{'index':>10}{'idle RSS':>11}{'1 country':>11}{'steady RSS':>12}{'stores':>8}")
+        for label, max_loaded in variants:
+            result = run_isolated(SERVER.format(specs_dir=specs_dir, cache_dir=cache_dir, max_loaded=max_loaded,
+                                                rounds=args.rounds))
+            print(f"{label:<32}{result['startup_ms']:>8.0f}ms{result['index_ms']:>8.0f}ms"
+                  f"{result['baseline_kb'] / 1024:>9.0f}MB{result['first_kb'] / 1024:>9.0f}MB"
+                  f"{result['steady_kb'] / 1024:>10.0f}MB{result['loaded']:>8}")
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
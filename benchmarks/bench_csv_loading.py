@@ -0,0 +1,45 @@
+import argparse
+import os
+import sys
+import tempfile
+
+# Put the repository root first on sys.path so src and benchmarks resolve to this checkout
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from benchmarks.common import TOURISM_CSV, run_isolated, write_synthetic_tourism_csv
+
+LOADER = '''
+import json, time
+from benchmarks.common import peak_rss_kb
+from src.data_preprocessing import load_data
+start = time.perf_counter()
+data = load_data({path!r}, schema={schema})
+print(json.dumps({{'seconds': time.perf_counter() - start, 'frame_bytes': int(data.memory_usage(deep=True).sum()),
+                  'max_rss_kb': peak_rss_kb()}}))
+'''
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Plain read_csv vs schema-aware load_data')
+    parser.add_argument('--scales', type=int, nargs='*', default=[1, 100])
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix='wavetour-bench-') as tmp:
+        for scale in args.scales:
+            path = TOURISM_CSV
+            if scale != 1:
+                path = write_synthetic_tourism_csv(os.path.join(tmp, f'tourism_x{scale}.csv'), 50_000 * scale)
+
+            print(f"{scale}x ({os.path.getsize(path) / 2 ** 20:,.1f} MB)")
+            for label, schema in [('read_csv (before)', 'None'), ('load_data + schema', 'TOURISM_SCHEMA')]:
+                code = LOADER.format(path=path, schema=schema)
+                if schema != 'None':
+                    code = code.replace('import load_data', 'import TOURISM_SCHEMA, load_data')
+                result = run_isolated(code)
+                print(f"  {label:<20}{result['seconds'] * 1000:>9.1f} ms   "
+                      f"frame {result['frame_bytes'] / 2 ** 20:>8.1f} MB   "
+                      f"peak RSS {result['max_rss_kb'] / 1024:>8.1f} MB")
+
+
+if __name__ == '__main__':
+    main()
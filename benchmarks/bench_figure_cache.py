@@ -0,0 +1,54 @@
+import contextlib
+import io
+import os
+import sys
+import time
+
+# Put the repository root first on sys.path so src and benchmarks resolve to this checkout
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from benchmarks.common import ROOT
+from src.figures import figure_cache
+
+VIEWS = ['Visitor Arrivals', 'Tourist Expenditures', 'Weather Patterns', 'Economic Indicators']
+
+
+def timed_rerun(app, before=None, repeat=5):
+    timings = []
+    for _ in range(repeat):
+        if before is not None:
+            before()
+        start = time.perf_counter()
+        app.run()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    from streamlit.testing.v1 import AppTest
+
+    os.chdir(ROOT)
+    app = AppTest.from_file(os.path.join(ROOT, 'app.py'), default_timeout=60)
+    print(f"{'view':<24}{'charts':>7}{'rebuilt':>12}{'cached':>12}{'speedup':>9}")
+    with contextlib.redirect_stdout(io.StringIO()):
+        app.run()
+        app.session_state['logged_in'] = True
+        app.run()
+        for view in VIEWS:
+            app.sidebar.selectbox[1].select(view).run()
+            # Clearing the cache before every rerun reproduces building each go.Figure from scratch
+            rebuilt = timed_rerun(app, before=figure_cache.clear)
+            app.run()
+            cached = timed_rerun(app)
+            charts = len(app.get('plotly_chart'))
+            with contextlib.redirect_stdout(sys.__stdout__):
+                print(f"{view:<24}{charts:>7}{rebuilt * 1000:>10.1f}ms{cached * 1000:>10.1f}ms"
+                      f"{rebuilt / cached:>8.1f}x")
+        # One warm pass over every view so the totals below cover all charts
+        for view in VIEWS:
+            app.sidebar.selectbox[1].select(view).run()
+    print(f"figure cache: {len(figure_cache)} figures, {figure_cache.size_bytes / 1024:,.0f} KB of JSON")
+
+
+if __name__ == '__main__':
+    main()
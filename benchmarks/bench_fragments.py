@@ -0,0 +1,103 @@
+import argparse
+import os
+import statistics
+import sys
+
+# Put the repository root first on sys.path so src and benchmarks resolve to this checkout
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+# Every rerun and fragment records its spans, so both are measured the same way
+os.environ['WAVETOUR_INSTRUMENT'] = '1'
+
+from benchmarks.common import ROOT
+from src import instrumentation
+from src.figures import figure_cache
+
+# AppTest reruns the whole script for every interaction, even one inside a fragment, so each interaction is
+# measured twice from the same run: the script rerun every interaction used to trigger, and the fragment span,
+# which is all a Streamlit server reruns now when the interaction is inside that fragment
+VIEWS = ["Visitor Arrivals", "Tourist Expenditures", "Weather Patterns", "Economic Indicators"]
+
+
+def stage_total(stage):
+    histogram = instrumentation.metrics.stages.get(stage)
+    return histogram.total if histogram else 0.0
+
+
+def timed_run(at):
+    # Seconds of the script rerun and of the named fragments inside it, from the process-wide histograms
+    stages = ('view', 'section')
+    before = instrumentation.metrics.reruns.total, {stage: stage_total(stage) for stage in stages}
+    misses = figure_cache.misses
+    at.run()
+    if at.exception:
+        raise RuntimeError(at.exception[0].value)
+    return {
+        'script': instrumentation.metrics.reruns.total - before[0],
+        **{stage: stage_total(stage) - before[1][stage] for stage in stages},
+        'figures built': figure_cache.misses - misses,
+    }
+
+
+def select_view(at, view):
+    next(box for box in at.selectbox if box.label == "Choose dataset to view").select(view)
+
+
+def set_sections(at, value):
+    for toggle in at.toggle:
+        if toggle.label != 'Performance panel':
+            toggle.set_value(value)
+
+
+def main(repeat=5):
+    from streamlit.testing.v1 import AppTest
+
+    os.chdir(ROOT)
+    at = AppTest.from_file(os.path.join(ROOT, 'app.py'), default_timeout=120)
+    at.session_state['logged_in'] = True
+    at.run()
+
+    # Cold figure cache: how many figures a first visit builds with its sections closed, and opening them
+    print(f"{'first visit, cold cache':<26}{'figures built':>14}")
+    for view in VIEWS:
+        figure_cache.clear()
+        select_view(at, view)
+        closed = timed_run(at)['figures built']
+        set_sections(at, True)
+        opened = timed_run(at)['figures built']
+        set_sections(at, False)
+        at.run()
+        print(f"{view:<26}{closed:>7} closed{opened:>4} more opened")
+
+    # Warm caches: each interaction repeated, medians in ms
+    rows = []
+    for view in VIEWS:
+        samples = []
+        for _ in range(repeat):
+            select_view(at, VIEWS[0] if view != VIEWS[0] else VIEWS[1])
+            at.run()
+            select_view(at, view)
+            samples.append(timed_run(at))
+        rows.append((f"choose {view}", statistics.median(s['script'] for s in samples),
+                     statistics.median(s['view'] for s in samples)))
+
+    select_view(at, VIEWS[0])
+    at.run()
+    samples = []
+    for _ in range(repeat):
+        set_sections(at, True)
+        samples.append(timed_run(at))
+        set_sections(at, False)
+        at.run()
+    rows.append(("open Visitor Arrivals sections", statistics.median(s['script'] for s in samples),
+                 statistics.median(s['section'] for s in samples)))
+
+    print(f"\n{'interaction':<36}{'script rerun':>14}{'fragment':>12}")
+    for label, script, fragment in rows:
+        print(f"{label:<36}{script * 1000:>12.1f}ms{fragment * 1000:>10.1f}ms")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Rerun latency per dashboard interaction, script against fragment')
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+    main(args.repeat)
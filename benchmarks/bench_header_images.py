@@ -0,0 +1,93 @@
+import argparse
+import contextlib
+import io
+import os
+import sys
+import time
+
+# Put the repository root first on sys.path so src and benchmarks resolve to this checkout
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from benchmarks.common import ROOT
+from src.image_assets import image_bytes, image_cache
+
+# Header image and sidebar selections of each view
+VIEWS = {
+    'Visitor Arrivals': ('images/visitor-arrivals-header.png', 'Thailand'),
+    'Tourist Expenditures': ('images/expenditure-header.png', 'Thailand'),
+    'Weather Patterns': ('images/weathers-header.png', 'Thailand'),
+    'Economic Indicators': ('images/economics-header.png', 'Thailand'),
+    'Coming soon (Oman)': ('images/soon-header.png', 'Oman'),
+}
+
+
+def shipped_before(path):
+    # What st.image(path, use_column_width=True) sent: the file re-read every rerun and, for these 1366px
+    # banners, passed through at full resolution in its original format
+    from streamlit.elements.image import _ensure_image_size_and_format, _validate_image_format_string
+
+    with open(path, 'rb') as f:
+        data = f.read()
+    return _ensure_image_size_and_format(data, -2, _validate_image_format_string(data, 'auto'))
+
+
+def shipped_after(path):
+    from streamlit.elements.image import _ensure_image_size_and_format
+
+    return _ensure_image_size_and_format(image_bytes(path), -2, 'JPEG')
+
+
+def timed(func, repeat=5):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        timings.append(time.perf_counter() - start)
+    return result, min(timings)
+
+
+def view_reruns():
+    # Server-side rerun time and chart payload of each view, from a headless run of the app
+    from streamlit.testing.v1 import AppTest
+
+    app = AppTest.from_file(os.path.join(ROOT, 'app.py'), default_timeout=60)
+    app.run()
+    app.session_state['logged_in'] = True
+    app.run()
+    reruns = {}
+    for view, (_, country) in VIEWS.items():
+        app.sidebar.selectbox[0].select(country).run()
+        if country == 'Thailand':
+            app.sidebar.selectbox[1].select(view).run()
+        _, seconds = timed(app.run, repeat=3)
+        charts = sum(len(chart.proto.spec) for chart in app.get('plotly_chart'))
+        reruns[view] = seconds, charts
+    return reruns
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Header image payload and estimated time to first paint per view')
+    parser.add_argument('--mbps', type=float, default=20.0, help='link speed used to estimate transfer time')
+    args = parser.parse_args()
+    os.chdir(ROOT)
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        reruns = view_reruns()
+    bytes_per_second = args.mbps * 1e6 / 8
+    print(f"{'view':<22}{'':>8}{'image':>10}{'charts':>10}{'payload':>10}{'server':>10}{'paint*':>10}")
+    for view, (path, _) in VIEWS.items():
+        rerun_seconds, chart_bytes = reruns[view]
+        image_cache.clear()
+        image_bytes(path)
+        for label, ship in (('before', shipped_before), ('after', shipped_after)):
+            data, image_seconds = timed(lambda: ship(path))
+            payload = len(data) + chart_bytes
+            server = rerun_seconds + image_seconds
+            paint = server + payload / bytes_per_second
+            print(f"{view if label == 'before' else '':<22}{label:>8}{len(data) / 1024:>8.0f}KB"
+                  f"{chart_bytes / 1024:>8.0f}KB{payload / 1024:>8.0f}KB{server * 1000:>8.0f}ms{paint * 1000:>8.0f}ms")
+    print(f"* server time plus payload transfer at {args.mbps:g} Mbit/s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,93 @@
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+# Put the repository root first on sys.path so src and benchmarks resolve to this checkout
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import numpy as np
+import pandas as pd
+from benchmarks.common import ROOT
+from src.aggregates import compute_year_rollups
+from src.data_preprocessing import load_workbook
+from src.datasets import DatasetStore
+
+WORKBOOK = os.path.join(ROOT, 'data', 'new_tourism_data_2010_2015_fixed.xlsx')
+SHEET = 'Visitor Arrivals'
+
+
+def tiled_workbook(path, sheets, scale):
+    # The Thailand workbook with its Visitor Arrivals sheet repeated scale times
+    with pd.ExcelWriter(path) as writer:
+        for sheet, df in sheets.items():
+            if sheet == SHEET:
+                df = df.loc[np.tile(df.index, scale)]
+            df.to_excel(writer, sheet_name=sheet, index=False)
+
+
+def delta_rows(sheets, rows, year, seed=0):
+    # rows new Visitor Arrivals rows for one year, sampled from the existing ones
+    rng = np.random.default_rng(seed)
+    source = sheets[SHEET]
+    delta = source.iloc[rng.integers(0, len(source), rows)].reset_index(drop=True)
+    delta['Year'] = year
+    return delta
+
+
+def reparse(path, cache_dir):
+    # Before: new rows meant a new workbook, so every sheet was parsed and every rollup recomputed
+    shutil.rmtree(cache_dir, ignore_errors=True)
+    compute_year_rollups(load_workbook(path, cache_dir))
+
+
+def main(scales=(1, 10), deltas=(100, 10_000), prior_batches=(0, 50)):
+    source = load_workbook(WORKBOOK, cache_dir=tempfile.mkdtemp(prefix='wavetour-bench-'))
+    print(f"{'history':>10}{'prior batches':>15}{'delta rows':>12}{'reparse':>12}{'ingest':>12}{'refresh':>12}")
+    for scale in scales:
+        for prior in prior_batches:
+            for rows in deltas:
+                tmp = tempfile.mkdtemp(prefix='wavetour-bench-')
+                try:
+                    path = os.path.join(tmp, 'workbook.xlsx')
+                    tiled_workbook(path, source, scale)
+                    store = DatasetStore(path, cache_dir=os.path.join(tmp, 'cache'),
+                                         ingest_dir=os.path.join(tmp, 'store'))
+                    for batch in range(prior):
+                        store.ingest.append(SHEET, delta_rows(source, 10, 2016, seed=batch))
+                    store.table('year_summary')
+                    store.table(SHEET)
+                    delta = delta_rows(source, rows, 2017)
+
+                    start = time.perf_counter()
+                    store.ingest.append(SHEET, delta)
+                    ingest = time.perf_counter() - start
+
+                    # What the next rerun pays: the rollups from the stored partials; the sheet is read lazily
+                    start = time.perf_counter()
+                    store.table('year_summary')
+                    refresh = time.perf_counter() - start
+
+                    # The same rows written into the workbook, then parsed from scratch
+                    sheets = dict(source)
+                    sheets[SHEET] = pd.concat([source[SHEET].loc[np.tile(source[SHEET].index, scale)], delta])
+                    rewritten = os.path.join(tmp, 'rewritten.xlsx')
+                    tiled_workbook(rewritten, sheets, 1)
+                    start = time.perf_counter()
+                    reparse(rewritten, os.path.join(tmp, 'reparse'))
+                    full = time.perf_counter() - start
+                finally:
+                    shutil.rmtree(tmp, ignore_errors=True)
+                history = len(source[SHEET]) * scale
+                print(f"{history:>10,}{prior:>15}{rows:>12,}{full * 1000:>10.1f}ms{ingest * 1000:>10.1f}ms"
+                      f"{refresh * 1000:>10.1f}ms")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Ingesting new rows against rewriting and reparsing the workbook')
+    parser.add_argument('--scales', type=int, nargs='*', default=[1, 10])
+    parser.add_argument('--deltas', type=int, nargs='*', default=[100, 10_000])
+    args = parser.parse_args()
+    main(args.scales, args.deltas)
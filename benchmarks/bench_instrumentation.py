@@ -0,0 +1,56 @@
+import argparse
+import contextlib
+import io
+import os
+import sys
+import time
+import timeit
+
+# Put the repository root first on sys.path so src and benchmarks resolve to this checkout
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from benchmarks.common import ROOT
+from src.instrumentation import finish_rerun, span, start_rerun
+
+
+def span_cost(enabled, number=200_000):
+    start_rerun(enabled=enabled)
+    try:
+        seconds = timeit.timeit("with span('stage'):\n    pass", globals={'span': span}, number=number)
+    finally:
+        finish_rerun()
+    return seconds / number
+
+
+def rerun_time(app, panel, repeat=5):
+    app.session_state['perf_panel'] = panel
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        app.run()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Cost of the timing spans, disabled and enabled')
+    parser.parse_args()
+
+    disabled, enabled = span_cost(False), span_cost(True)
+    print(f"span() disabled {disabled * 1e9:>7.0f} ns   enabled {enabled * 1e9:>7.0f} ns")
+
+    from streamlit.testing.v1 import AppTest
+
+    os.chdir(ROOT)
+    app = AppTest.from_file(os.path.join(ROOT, 'app.py'), default_timeout=60)
+    with contextlib.redirect_stdout(io.StringIO()):
+        app.run()
+        app.session_state['logged_in'] = True
+        app.run()
+        off = rerun_time(app, False)
+        on = rerun_time(app, True)
+    print(f"Visitor Arrivals rerun: instrumentation off {off * 1000:.1f} ms, on with panel {on * 1000:.1f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,40 @@
+import os
+import sys
+
+# Put the repository root first on sys.path so src and benchmarks resolve to this checkout
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from benchmarks.common import run_isolated
+from src.model_registry import DEFAULT_LINEAR_MODEL_PATH, DEFAULT_MODEL_PATH
+from src.model_training import train_model
+
+# Each worker imports the prediction module, loads one artifact, scores one row and reports its footprint
+WORKER = '''
+import json, sys, time
+start = time.perf_counter()
+from src.predictions import {loader}, make_prediction
+make_prediction([7, 38, 3, 0], model={loader}())
+elapsed = time.perf_counter() - start
+from benchmarks.common import peak_rss_kb
+print(json.dumps({{
+    'seconds': elapsed,
+    'max_rss_kb': peak_rss_kb(),
+    'sklearn_imported': 'sklearn' in sys.modules,
+}}))
+'''
+
+
+def main(runs=5):
+    if not (os.path.exists(DEFAULT_MODEL_PATH) and os.path.exists(DEFAULT_LINEAR_MODEL_PATH)):
+        train_model()
+
+    for label, loader in [('sklearn pickle', 'load_model'), ('numpy linear', 'load_linear_model')]:
+        results = [run_isolated(WORKER.format(loader=loader)) for _ in range(runs)]
+        seconds = min(result['seconds'] for result in results)
+        rss_mb = min(result['max_rss_kb'] for result in results) / 1024
+        print(f"{label:<18}startup {seconds * 1000:>8.1f} ms   max RSS {rss_mb:>7.1f} MB   "
+              f"sklearn imported: {results[0]['sklearn_imported']}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,55 @@
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+# Put the repository root first on sys.path so src and benchmarks resolve to this checkout
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import pandas as pd
+from src.data_preprocessing import load_workbook
+
+WORKBOOK = 'data/new_tourism_data_2010_2015_fixed.xlsx'
+SHEETS = ['Visitor Arrivals', 'Tourist Expenditure', 'Weather Patterns', 'Economic Indicators', 'Overall Data']
+
+
+def per_sheet_reads():
+    return {sheet: pd.read_excel(WORKBOOK, sheet_name=sheet) for sheet in SHEETS}
+
+
+def timed(func, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main(repeat=5):
+    cache_dir = tempfile.mkdtemp(prefix='wavetour-bench-')
+    try:
+        def cold():
+            shutil.rmtree(cache_dir, ignore_errors=True)
+            load_workbook(WORKBOOK, cache_dir=cache_dir)
+
+        def warm():
+            load_workbook(WORKBOOK, cache_dir=cache_dir)
+
+        results = [
+            ('read_excel per sheet (before)', timed(per_sheet_reads, repeat)),
+            ('load_workbook cold', timed(cold, repeat)),
+        ]
+        warm()
+        results.append(('load_workbook warm', timed(warm, repeat)))
+    finally:
+        shutil.rmtree(cache_dir, ignore_errors=True)
+
+    baseline = results[0][1]
+    for label, seconds in results:
+        print(f"{label:<32}{seconds * 1000:>10.1f} ms{baseline / seconds:>8.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,73 @@
+import os
+import sys
+import time
+
+# Put the repository root first on sys.path so src and benchmarks resolve to this checkout
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import joblib
+import numpy as np
+from src.model_registry import DEFAULT_LOOKUP_TABLE_PATH, DEFAULT_MODEL_PATH, registry
+from src.model_training import train_model
+from src.data_preprocessing import FEATURES, load_data
+from src.predictions import load_lookup_table, load_model, make_prediction, predict_batch
+
+SAMPLE = [7, 38, 3, 0]
+
+
+def uncached_prediction(input_data):
+    # The pre-registry behaviour: unpickle the artifact on every call
+    model = joblib.load(DEFAULT_MODEL_PATH)
+    prediction = model.predict(np.array(input_data).reshape(1, -1))
+    return prediction[0]
+
+
+def latencies(func, calls):
+    timings = np.empty(calls)
+    for i in range(calls):
+        start = time.perf_counter()
+        func(SAMPLE)
+        timings[i] = time.perf_counter() - start
+    return timings
+
+
+def report(label, timings):
+    p50, p99 = np.percentile(timings, [50, 99]) * 1e6
+    print(f"{label:<28}p50 {p50:>9.1f} us   p99 {p99:>9.1f} us")
+
+
+def rows_per_second(func, rows):
+    start = time.perf_counter()
+    func(rows)
+    return len(rows) / (time.perf_counter() - start)
+
+
+def model_prediction(input_data):
+    return make_prediction(input_data, model=load_model())
+
+
+def scalar_loop(rows):
+    return [model_prediction(row) for row in rows.to_numpy(dtype=np.float64)]
+
+
+def main(calls=10_000):
+    if not (os.path.exists(DEFAULT_MODEL_PATH) and os.path.exists(DEFAULT_LOOKUP_TABLE_PATH)):
+        train_model()
+    registry.clear()
+
+    report('joblib.load per call', latencies(uncached_prediction, calls))
+    report('registry', latencies(model_prediction, calls))
+    report('registry + lookup table', latencies(make_prediction, calls))
+
+    rows = load_data('data/tourism_data.csv')[FEATURES]
+    scalar = rows_per_second(scalar_loop, rows.head(calls))
+    batch = rows_per_second(lambda frame: predict_batch(frame, model=load_model()), rows)
+    lookup = rows_per_second(predict_batch, rows)
+    print(f"{'make_prediction loop':<28}{scalar:>12,.0f} rows/s")
+    print(f"{'predict_batch':<28}{batch:>12,.0f} rows/s{batch / scalar:>8.0f}x")
+    print(f"{'predict_batch + lookup':<28}{lookup:>12,.0f} rows/s{lookup / scalar:>8.0f}x")
+    print(f"lookup table hit rate: {load_lookup_table().hit_rate:.1%}")
+
+
+if __name__ == '__main__':
+    main()
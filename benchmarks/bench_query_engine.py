@@ -0,0 +1,67 @@
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+
+# Put the repository root first on sys.path so src and benchmarks resolve to this checkout
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from benchmarks.common import run_isolated, write_synthetic_tourism_csv
+
+# The same questions answered by filtering whole frames in pandas, as the views do, and by the query engine.
+# Each runs in a fresh interpreter so the peak RSS is that of the approach alone; the engine's database is
+# loaded beforehand, as it is once per version in the app
+PANDAS = '''
+import json, time
+from benchmarks.common import peak_rss_kb
+start = time.perf_counter()
+from src.data_preprocessing import load_data
+data = load_data(CSV)
+december = data[(data['month'] == 12) & data['holiday_season']]
+by_events = data[data['temperature'].between(30, 35)].groupby('local_events')['predicted_visitors'].mean()
+print(json.dumps({'seconds': time.perf_counter() - start, 'peak_rss_kb': peak_rss_kb(),
+                  'rows': len(december) + len(by_events)}))
+'''
+
+ENGINE = '''
+import json, time
+from benchmarks.common import peak_rss_kb
+start = time.perf_counter()
+from src.query_engine import QueryEngine, RowQuery
+engine = QueryEngine(DB)
+december = engine.rows(RowQuery(months=[12], holiday_season=True))
+by_events = engine.rows(RowQuery(temperature=(30, 35), group_by='local_events', aggregate='mean'))
+print(json.dumps({'seconds': time.perf_counter() - start, 'peak_rss_kb': peak_rss_kb(),
+                  'rows': len(december) + len(by_events)}))
+'''
+
+LOAD = '''
+import json, time
+start = time.perf_counter()
+from src.query_engine import QueryEngine
+QueryEngine(DB).sync_csv(CSV)
+print(json.dumps({'seconds': time.perf_counter() - start}))
+'''
+
+
+def main(rows=1_000_000):
+    tmp = tempfile.mkdtemp(prefix='wavetour-bench-')
+    try:
+        csv = write_synthetic_tourism_csv(os.path.join(tmp, 'tourism.csv'), rows)
+        header = f"CSV = {csv!r}\nDB = {os.path.join(tmp, 'query.sqlite')!r}\n"
+        load = run_isolated(header + LOAD)
+        print(f"{rows:,} training rows, loaded into the query engine once in {load['seconds']:.2f}s\n")
+        print(f"{'december holidays + mean by events':<36}{'time':>8}{'peak rss':>10}{'rows':>8}")
+        for label, code in (('pandas, whole frame', PANDAS), ('query engine', ENGINE)):
+            result = run_isolated(header + code)
+            print(f"{label:<36}{result['seconds']:>7.2f}s{result['peak_rss_kb'] / 1024:>8.0f}MB{result['rows']:>8,}")
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Filtered reads of the training rows, pandas against the query engine')
+    parser.add_argument('--rows', type=int, default=1_000_000)
+    args = parser.parse_args()
+    main(args.rows)
@@ -0,0 +1,51 @@
+import argparse
+import os
+import sys
+import time
+import warnings
+
+# Put the repository root first on sys.path so src and benchmarks resolve to this checkout
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import numpy as np
+from src.predictions import load_default_model, make_prediction
+from src.scenarios import apply_shifts, scenario_grid, simulate
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Scenario evaluations per second: make_prediction vs simulate')
+    parser.add_argument('--evaluations', type=int, default=10_000_000)
+    parser.add_argument('--workers', type=int, default=os.cpu_count())
+    parser.add_argument('--sample', type=int, default=20_000, help='make_prediction calls timed for the estimate')
+    args = parser.parse_args()
+
+    grid = apply_shifts(scenario_grid(temperatures=range(20, 41), local_events=range(0, 6)),
+                        temperature_shift=2, holiday_events=2)
+    draws = max(1, args.evaluations // len(grid))
+    model = load_default_model()
+
+    # One make_prediction call per perturbed row, as a caller of the current API would loop
+    rng = np.random.default_rng(0)
+    rows = grid[rng.integers(0, len(grid), args.sample)]
+    rows[:, 1] += np.rint(rng.normal(0, 1.5, len(rows)))
+    start = time.perf_counter()
+    with warnings.catch_warnings():
+        # Off-grid rows reach sklearn as bare arrays, which warns once per call
+        warnings.simplefilter('ignore', UserWarning)
+        for row in rows:
+            make_prediction(row.tolist(), model=model)
+    per_row = (time.perf_counter() - start) / len(rows)
+    print(f"{'make_prediction loop (estimated)':<34}{per_row * len(grid) * draws:>9.1f}s"
+          f"{1 / per_row:>14,.0f} evaluations/s")
+
+    for workers in sorted({1, args.workers}):
+        start = time.perf_counter()
+        summary = simulate(grid, draws=draws, temperature_sd=1.5, events_sd=1.0, workers=workers)
+        seconds = time.perf_counter() - start
+        label = f"simulate, {workers} worker(s)"
+        print(f"{label:<34}{seconds:>9.1f}s{summary.attrs['evaluations'] / seconds:>14,.0f} evaluations/s"
+              f"   -> {len(summary):,} rows of quantiles")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,82 @@
+import argparse
+import os
+import sys
+
+# Put the repository root first on sys.path so src and benchmarks resolve to this checkout
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from benchmarks.common import run_isolated
+
+# Each of N threads plays one session's rerun: fetch the cached frames, edit them the way the old views did,
+# and hold on to them until every session has loaded, so peak RSS reflects N concurrent reruns
+SESSIONS = '''
+import json, logging, threading, time
+import numpy as np
+import pandas as pd
+import streamlit as st
+from benchmarks.common import peak_rss_kb
+from src.data_preprocessing import load_workbook, shared_view
+
+logging.disable(logging.WARNING)
+pd.set_option('mode.copy_on_write', {copy_on_write})
+sheets = load_workbook('data/new_tourism_data_2010_2015_fixed.xlsx')
+visitors = sheets['Visitor Arrivals']
+sheets['Visitor Arrivals'] = visitors.loc[np.tile(visitors.index, {scale})].reset_index(drop=True)
+
+@st.cache_data
+def load_copies():
+    return sheets
+
+@st.cache_resource
+def load_shared():
+    return sheets
+
+def rerun():
+    if {shared}:
+        frames = {{name: shared_view(frame) for name, frame in load_shared().items()}}
+    else:
+        frames = load_copies()
+    # A session reading its frames and building a derived column, without writing to the shared ones
+    visitors = frames['Visitor Arrivals']
+    visitors = visitors.assign(Total=visitors['Visitors (in thousands)'].fillna(0))
+    return frames, visitors
+
+(load_shared if {shared} else load_copies)()
+baseline_kb = peak_rss_kb()
+barrier = threading.Barrier({sessions})
+timings = []
+
+def session():
+    start = time.perf_counter()
+    held = rerun()
+    timings.append(time.perf_counter() - start)
+    barrier.wait()
+
+threads = [threading.Thread(target=session) for _ in range({sessions})]
+for thread in threads:
+    thread.start()
+for thread in threads:
+    thread.join()
+print(json.dumps({{'per_session_kb': (peak_rss_kb() - baseline_kb) / {sessions},
+                  'rerun_ms': float(np.median(timings)) * 1000,
+                  'rows': len(sheets['Visitor Arrivals'])}}))
+'''
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Per-session memory of cache_data copies vs shared views')
+    parser.add_argument('--sessions', type=int, default=50)
+    parser.add_argument('--scales', type=int, nargs='*', default=[1, 100])
+    args = parser.parse_args()
+
+    variants = [('cache_data copies (before)', False, False), ('cache_resource + CoW views', True, True)]
+    for scale in args.scales:
+        for label, shared, copy_on_write in variants:
+            result = run_isolated(SESSIONS.format(sessions=args.sessions, scale=scale, shared=shared,
+                                                  copy_on_write=copy_on_write))
+            print(f"{result['rows']:>9,} rows  {label:<28}"
+                  f"{result['per_session_kb'] / 1024:>8.2f} MB/session   rerun {result['rerun_ms']:>8.2f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,86 @@
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+
+# Put the repository root first on sys.path so src and benchmarks resolve to this checkout
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from benchmarks.common import ROOT
+
+# One replica's cold start in a fresh interpreter with its own local cache directory: every table of every
+# Thailand view and every chart that does not need a forecast. WAVETOUR_CACHE_URL decides what it shares
+REPLICA = '''
+import json, sys, time
+start = time.perf_counter()
+import pandas as pd
+from src.datasets import DatasetStore, view_blocks, view_sources
+from src.figures import build_figure, cached_figure
+from src.shared_cache import shared_backend
+from src.views import load_spec
+
+spec = load_spec('data/specs/thailand.json')
+store = DatasetStore(spec['workbook'], spec.get('tables'), cache_dir=sys.argv[1])
+version = store.version()
+figures = 0
+for view in spec['views']:
+    for source in view_sources(spec, view):
+        store.table(source, version)
+    for block in view_blocks(spec, view):
+        chart = spec['charts'].get(block.get('chart'), {})
+        if 'source' in chart:
+            table = store.table(chart['source'], version)
+            cached_figure(('Thailand', view, block['chart'], store.table_version(chart['source'], version), 'light'),
+                          build_figure, chart, table)
+            figures += 1
+backend = shared_backend()
+print(json.dumps({'seconds': time.perf_counter() - start, 'figures': figures, 'computed': backend.computed,
+                  'hits': backend.hits}))
+'''
+
+
+def start_replicas(tmp, replicas, cache_url):
+    env = dict(os.environ, WAVETOUR_CACHE_URL=cache_url)
+    processes = []
+    for replica in range(replicas):
+        cache_dir = os.path.join(tmp, f"replica-{replica}")
+        processes.append(subprocess.Popen([sys.executable, '-W', 'ignore', '-c', REPLICA, cache_dir], cwd=ROOT,
+                                          env=env, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True))
+    results = []
+    for process in processes:
+        output, errors = process.communicate()
+        if process.returncode:
+            raise RuntimeError(errors)
+        results.append(json.loads(output.strip().splitlines()[-1]))
+    return results
+
+
+def main(replicas=4):
+    tmp = tempfile.mkdtemp(prefix='wavetour-bench-')
+    try:
+        runs = [
+            ('no shared cache', ''),
+            ('sqlite, cold', f"sqlite:///{os.path.join(tmp, 'shared.sqlite')}"),
+            ('sqlite, warm (replica restart)', f"sqlite:///{os.path.join(tmp, 'shared.sqlite')}"),
+        ]
+        print(f"{'':<32}{'slowest':>10}{'mean':>10}{'computed':>10}{'hits':>6}")
+        for label, url in runs:
+            results = start_replicas(os.path.join(tmp, label.replace(' ', '-')), replicas, url)
+            seconds = [result['seconds'] for result in results]
+            print(f"{label:<32}{max(seconds):>9.2f}s{sum(seconds) / len(seconds):>9.2f}s"
+                  f"{sum(result['computed'] for result in results):>10}{sum(result['hits'] for result in results):>6}")
+        size = os.path.getsize(os.path.join(tmp, 'shared.sqlite'))
+        print(f"{replicas} replicas started at once; 'computed' counts entries built across all of them. "
+              f"Shared file: {size / 1024:,.0f} KB")
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Cold start of several replicas with and without a shared cache')
+    parser.add_argument('--replicas', type=int, default=4)
+    args = parser.parse_args()
+    main(args.replicas)
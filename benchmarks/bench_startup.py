@@ -0,0 +1,76 @@
+import argparse
+import os
+import subprocess
+import sys
+
+# Put the repository root first on sys.path so src and benchmarks resolve to this checkout
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from benchmarks.common import ROOT, run_isolated
+
+# What each path imports: the login page needs Streamlit and the instrumentation only, the signed-in page also
+# loads src.dashboard with pandas, the data stores, the figures and the forecasting engine
+PATHS = {
+    'login page': 'import streamlit, src.instrumentation',
+    'signed-in page': 'import streamlit, src.instrumentation, src.dashboard',
+}
+
+# Time to the first rendered login page and the process RSS afterwards, in a fresh interpreter. 'eager' imports
+# src.dashboard before the first run, as app.py did when it imported the data and plotting stack at the top
+LOGIN = '''
+import json, sys, time
+start = time.perf_counter()
+from streamlit.testing.v1 import AppTest
+from benchmarks.common import peak_rss_kb, rss_kb
+if MODE == 'eager':
+    import src.dashboard
+at = AppTest.from_file('app.py', default_timeout=120)
+at.run()
+assert not at.exception and at.button, 'login page did not render'
+print(json.dumps({'seconds': time.perf_counter() - start, 'rss_kb': rss_kb(), 'peak_rss_kb': peak_rss_kb(),
+                  'pandas': 'pandas' in sys.modules}))
+'''
+
+
+def import_times(statement):
+    # Per-module cumulative microseconds from python -X importtime, which writes one line per import to stderr
+    errors = subprocess.run([sys.executable, '-X', 'importtime', '-W', 'ignore', '-c', statement], cwd=ROOT,
+                            check=True, capture_output=True, text=True).stderr
+    times = {}
+    for line in errors.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        # A module imported at the top level is not indented; its cumulative time includes its own imports
+        if not name[1:].startswith(' '):
+            times[name.strip()] = int(cumulative)
+    return times
+
+
+def login_page(mode, repeat):
+    runs = [run_isolated(f"MODE = {mode!r}\n{LOGIN}") for _ in range(repeat)]
+    runs.sort(key=lambda run: run['seconds'])
+    return runs[len(runs) // 2]
+
+
+def main(repeat=3, top=8):
+    for label, statement in PATHS.items():
+        times = import_times(statement)
+        print(f"{label}: {sum(times.values()) / 1e6:.2f}s importing, slowest top-level imports")
+        for name, micros in sorted(times.items(), key=lambda item: -item[1])[:top]:
+            print(f"  {name:<40}{micros / 1000:>9.1f}ms")
+
+    print(f"\n{'login page':<28}{'time':>8}{'rss':>10}{'peak rss':>10}  pandas loaded")
+    for mode, label in (('eager', 'before (eager imports)'), ('lazy', 'after (lazy imports)')):
+        run = login_page(mode, repeat)
+        print(f"{label:<28}{run['seconds']:>7.2f}s{run['rss_kb'] / 1024:>8.0f}MB{run['peak_rss_kb'] / 1024:>8.0f}MB"
+              f"  {run['pandas']}")
+    print(f"Median of {repeat} fresh interpreters each, including the AppTest harness")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Import time and memory of the login page, lazy against eager')
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--top', type=int, default=8)
+    args = parser.parse_args()
+    main(args.repeat, args.top)
@@ -0,0 +1,58 @@
+import argparse
+import os
+import sys
+import tempfile
+
+# Put the repository root first on sys.path so src and benchmarks resolve to this checkout
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from benchmarks.common import run_isolated, write_synthetic_tourism_csv
+
+STREAMING = '''
+import json, time
+from benchmarks.common import peak_rss_kb
+from src.model_training import fit_streaming
+start = time.perf_counter()
+model, _, _ = fit_streaming({path!r}, chunksize={chunksize})
+print(json.dumps({{'seconds': time.perf_counter() - start, 'max_rss_kb': peak_rss_kb(),
+                  'coef': model.coef_.tolist(), 'intercept': float(model.intercept_)}}))
+'''
+
+IN_MEMORY = '''
+import json, time
+from benchmarks.common import peak_rss_kb
+from sklearn.linear_model import LinearRegression
+from src.data_preprocessing import FEATURES, TARGET, load_data
+start = time.perf_counter()
+data = load_data({path!r})
+model = LinearRegression().fit(data[FEATURES], data[TARGET])
+print(json.dumps({{'seconds': time.perf_counter() - start, 'max_rss_kb': peak_rss_kb(),
+                  'coef': model.coef_.tolist(), 'intercept': float(model.intercept_)}}))
+'''
+
+
+def report(label, result):
+    print(f"{label:<14}{result['seconds']:>9.1f} s   peak RSS {result['max_rss_kb'] / 1024:>8.1f} MB   "
+          f"coef {[round(value, 6) for value in result['coef']]}   intercept {result['intercept']:.6f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Streaming vs in-memory training on a synthetic tourism CSV')
+    parser.add_argument('--rows', type=int, default=50_000_000)
+    parser.add_argument('--chunksize', type=int, default=250_000)
+    parser.add_argument('--skip-in-memory', action='store_true',
+                        help='the in-memory fit needs several GB of RAM at the default size')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix='wavetour-bench-') as tmp:
+        path = os.path.join(tmp, 'tourism_synthetic.csv')
+        write_synthetic_tourism_csv(path, args.rows)
+        print(f"{args.rows:,} rows, {os.path.getsize(path) / 2 ** 20:,.0f} MB on disk")
+
+        report('streaming', run_isolated(STREAMING.format(path=path, chunksize=args.chunksize)))
+        if not args.skip_in_memory:
+            report('in-memory', run_isolated(IN_MEMORY.format(path=path)))
+
+
+if __name__ == '__main__':
+    main()
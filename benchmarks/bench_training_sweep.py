@@ -0,0 +1,39 @@
+import argparse
+import os
+import sys
+import time
+
+# Put the repository root first on sys.path so src and benchmarks resolve to this checkout
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.data_preprocessing import FEATURES, TARGET, load_data
+from src.model_training import cross_validate_candidates, leaderboard
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Wall time of the CV sweep by process pool size')
+    parser.add_argument('--folds', type=int, default=5)
+    parser.add_argument('--workers', type=int, nargs='*', default=None)
+    args = parser.parse_args()
+
+    cpus = os.cpu_count() or 1
+    workers = args.workers or sorted({1, 2, 4, cpus} & set(range(1, cpus + 1)))
+
+    data = load_data('data/tourism_data.csv')
+    X, y = data[FEATURES].to_numpy(), data[TARGET].to_numpy()
+
+    baseline = None
+    for count in workers:
+        start = time.perf_counter()
+        results = cross_validate_candidates(X, y, n_splits=args.folds, max_workers=count)
+        seconds = time.perf_counter() - start
+        baseline = baseline or seconds
+        print(f"{count:>3} workers {seconds:>8.1f} s   speedup {baseline / seconds:>5.2f}x   "
+              f"efficiency {baseline / seconds / count:>5.0%}")
+
+    print()
+    print(leaderboard(results).to_string(index=False))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,79 @@
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+# Put the repository root first on sys.path so src and benchmarks resolve to this checkout
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import pandas as pd
+from src.aggregates import load_year_rollups
+from src.data_preprocessing import load_workbook, workbook_sha256
+
+WORKBOOK = 'data/new_tourism_data_2010_2015_fixed.xlsx'
+
+
+def inline_rollups(sheets):
+    # What app.py used to run on every rerun: two conversions, three groupbys and a frame rebuild
+    visitors_df = sheets['Visitor Arrivals'].copy()
+    expenditure_df = sheets['Tourist Expenditure'].copy()
+    weather_df, economic_df = sheets['Weather Patterns'], sheets['Economic Indicators']
+
+    visitors_df['Visitors (in thousands)'] = pd.to_numeric(visitors_df['Visitors (in thousands)'], errors='coerce')
+    visitors_df['Visitors (in thousands)'] = visitors_df['Visitors (in thousands)'].fillna(0)
+    visitor_totals = visitors_df.groupby('Year')['Visitors (in thousands)'].sum()
+    expenditure_df = expenditure_df.ffill()
+    expenditure_df['Total ($US) / Person per day'] = pd.to_numeric(expenditure_df['Total ($US) / Person per day'],
+                                                                   errors='coerce').fillna(0)
+    total_expenditure = expenditure_df.groupby('Year')['Total ($US) / Person per day'].sum()
+    avg_expenditure = (total_expenditure / expenditure_df.groupby('Year')['Total ($US) / Person per day'].count())
+    overall = sheets['Overall Data'].groupby('Year')[
+        ['Number of Visitors (in millions)', 'Expenditure (in billion THB)']].sum().reset_index()
+    return overall, pd.DataFrame({
+        'Year': visitor_totals.index,
+        'Visitor Arrivals': visitor_totals.values,
+        'Average Expenditure': avg_expenditure.round(2).values,
+        'Avg Temp (°C)': weather_df['Average Temperature (°C)'],
+        'Rainfall (mm)': weather_df['Rainfall (mm)'],
+        'GDP Growth (%)': economic_df['GDP Growth (%)']
+    })
+
+
+def timed(func, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main(repeat=20):
+    cache_dir = tempfile.mkdtemp(prefix='wavetour-bench-')
+    try:
+        sheets = load_workbook(WORKBOOK, cache_dir=cache_dir)
+        memo = {}
+
+        def memoized():
+            # What a Streamlit rerun pays: hash lookup, then a hit in st.cache_data
+            version = workbook_sha256(WORKBOOK, cache_dir)
+            if version not in memo:
+                memo[version] = load_year_rollups(WORKBOOK, cache_dir)
+            return memo[version]
+
+        results = [('inline rollups per rerun (before)', timed(lambda: inline_rollups(sheets), repeat))]
+        load_year_rollups(WORKBOOK, cache_dir)
+        results.append(('rollup store read from disk', timed(lambda: load_year_rollups(WORKBOOK, cache_dir), repeat)))
+        memoized()
+        results.append(('rollup store, in-process hit', timed(memoized, repeat)))
+    finally:
+        shutil.rmtree(cache_dir, ignore_errors=True)
+
+    baseline = results[0][1]
+    for label, seconds in results:
+        print(f"{label:<36}{seconds * 1000:>10.2f} ms{baseline / seconds:>8.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,56 @@
+import json
+import os
+import resource
+import subprocess
+import sys
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+TOURISM_CSV = os.path.join(ROOT, 'data', 'tourism_data.csv')
+
+
+def peak_rss_kb():
+    # ru_maxrss survives exec on Linux and would report the parent's peak, so prefer VmHWM
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def rss_kb():
+    # Current resident set size, for steady-state measurements where the peak would hide later releases
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def run_isolated(code):
+    # Run a snippet in a fresh interpreter from the repo root; it must print one JSON object last
+    output = subprocess.run([sys.executable, '-W', 'ignore', '-c', code], cwd=ROOT, check=True,
+                            capture_output=True, text=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def write_synthetic_tourism_csv(path, rows, seed=0, chunk_rows=1_000_000):
+    # Resample real rows of tourism_data.csv so value ranges and correlations stay realistic
+    import numpy as np
+    import pandas as pd
+
+    source = pd.read_csv(TOURISM_CSV)
+    rng = np.random.default_rng(seed)
+    written = 0
+    with open(path, 'w', newline='') as f:
+        while written < rows:
+            take = min(chunk_rows, rows - written)
+            chunk = source.iloc[rng.integers(0, len(source), take)]
+            chunk.to_csv(f, index=False, header=written == 0)
+            written += take
+    return path
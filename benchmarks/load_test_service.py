@@ -0,0 +1,100 @@
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import time
+
+# Put the repository root first on sys.path so src and benchmarks resolve to this checkout
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import numpy as np
+from benchmarks.common import ROOT
+
+
+async def request(reader, writer, host, body):
+    writer.write(f"POST /predict HTTP/1.1\r\nHost: {host}\r\nContent-Type: application/json\r\n"
+                 f"Content-Length: {len(body)}\r\n\r\n".encode() + body)
+    await writer.drain()
+    status = int((await reader.readline()).split()[1])
+    length = 0
+    while True:
+        line = await reader.readline()
+        if line in (b'\r\n', b''):
+            break
+        if line.lower().startswith(b'content-length:'):
+            length = int(line.split(b':')[1])
+    await reader.readexactly(length)
+    return status
+
+
+async def client(host, port, deadline, latencies, errors, seed):
+    rng = np.random.default_rng(seed)
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        while time.perf_counter() < deadline:
+            month = int(rng.integers(1, 13))
+            body = json.dumps({'month': month, 'temperature': int(rng.integers(20, 41)),
+                               'local_events': int(rng.integers(0, 6)),
+                               'holiday_season': int(rng.integers(0, 2))}).encode()
+            start = time.perf_counter()
+            status = await request(reader, writer, host, body)
+            latencies.append(time.perf_counter() - start)
+            if status != 200:
+                errors.append(status)
+    finally:
+        writer.close()
+
+
+async def run(host, port, concurrency, duration):
+    latencies, errors = [], []
+    deadline = time.perf_counter() + duration
+    start = time.perf_counter()
+    await asyncio.gather(*(client(host, port, deadline, latencies, errors, seed) for seed in range(concurrency)))
+    return latencies, errors, time.perf_counter() - start
+
+
+async def wait_for_port(host, port, timeout=30):
+    deadline = time.perf_counter() + timeout
+    while True:
+        try:
+            _, writer = await asyncio.open_connection(host, port)
+            writer.close()
+            return
+        except OSError:
+            if time.perf_counter() > deadline:
+                raise
+            await asyncio.sleep(0.1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Load test for src/prediction_service.py')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--concurrency', type=int, default=64)
+    parser.add_argument('--duration', type=float, default=10.0)
+    parser.add_argument('--spawn', action='store_true', help='start a local service for the duration of the test')
+    parser.add_argument('--max-wait-ms', type=float, default=2.0)
+    args = parser.parse_args()
+
+    server = None
+    if args.spawn:
+        server = subprocess.Popen([sys.executable, '-W', 'ignore', 'src/prediction_service.py', '--host', args.host,
+                                   '--port', str(args.port), '--max-wait-ms', str(args.max_wait_ms)], cwd=ROOT)
+    try:
+        asyncio.run(wait_for_port(args.host, args.port))
+        latencies, errors, elapsed = asyncio.run(run(args.host, args.port, args.concurrency, args.duration))
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+
+    p50, p99 = np.percentile(latencies, [50, 99]) * 1000
+    print(f"{len(latencies):,} requests in {elapsed:.1f} s with {args.concurrency} connections")
+    print(f"throughput {len(latencies) / elapsed:,.0f} req/s   p50 {p50:.2f} ms   p99 {p99:.2f} ms   "
+          f"errors {len(errors)}")
+
+
+if __name__ == '__main__':
+    main()
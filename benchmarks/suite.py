@@ -0,0 +1,350 @@
+import argparse
+import contextlib
+import datetime
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import warnings
+
+# Put the repository root first on sys.path so src and benchmarks resolve to this checkout
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import numpy as np
+import pandas as pd
+from benchmarks.common import ROOT, write_synthetic_tourism_csv
+from src.data_preprocessing import load_workbook
+
+WORKBOOK = os.path.join(ROOT, 'data', 'new_tourism_data_2010_2015_fixed.xlsx')
+SPEC = os.path.join(ROOT, 'data', 'specs', 'thailand.json')
+RESULTS_DIR = os.path.join(ROOT, 'benchmarks', 'results')
+# Rows of data/tourism_data.csv; scale N means N times as many synthetic rows
+CSV_ROWS = 50_000
+DEFAULT_SCALES = (1, 10, 100)
+# Writing and parsing .xlsx grows slowly with scale, so workbook cases stop at 10x
+WORKBOOK_SCALES = (1, 10)
+DEFAULT_THRESHOLD = 0.2
+
+
+# A plain script rather than pytest-benchmark or asv: it runs from the app image with requirements.txt alone, so
+# results come from the deployment's own hardware and Python, and the JSON it writes is all --compare needs
+
+
+def _in_directory(root, func):
+    # train_model reads data/tourism_data.csv and writes models/ relative to the working directory
+    cwd = os.getcwd()
+    os.chdir(root)
+    try:
+        return func()
+    finally:
+        os.chdir(cwd)
+
+
+class Fixtures:
+    # Synthetic inputs, generated on first use and shared by every case in the run
+
+    def __init__(self, tmp):
+        self.tmp = tmp
+        self._files = {}
+
+    def path(self, *parts):
+        path = os.path.join(self.tmp, *parts)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        return path
+
+    def csv(self, scale):
+        key = ('csv', scale)
+        if key not in self._files:
+            self._files[key] = write_synthetic_tourism_csv(self.path(f"tourism-{scale}x.csv"), CSV_ROWS * scale,
+                                                           seed=scale)
+        return self._files[key]
+
+    def workbook(self, scale):
+        # The Thailand workbook with its Visitor Arrivals sheet repeated scale times
+        key = ('workbook', scale)
+        if key not in self._files:
+            if scale == 1:
+                self._files[key] = WORKBOOK
+            else:
+                sheets = load_workbook(WORKBOOK, cache_dir=self.path('.cache', 'source'))
+                path = self.path(f"workbook-{scale}x.xlsx")
+                with pd.ExcelWriter(path) as writer:
+                    for sheet, df in sheets.items():
+                        if sheet == 'Visitor Arrivals':
+                            df = df.loc[np.tile(df.index, scale)]
+                        df.to_excel(writer, sheet_name=sheet, index=False)
+                self._files[key] = path
+        return self._files[key]
+
+    def training_root(self, scale):
+        # Scratch directory holding the synthetic CSV as data/tourism_data.csv, for train_model to run in
+        csv = self.path(f"train-{scale}x", 'data', 'tourism_data.csv')
+        if not os.path.exists(csv):
+            shutil.copyfile(self.csv(scale), csv)
+        return os.path.dirname(os.path.dirname(csv))
+
+    def model(self):
+        # The default model trained on the 1x CSV into the fixtures, fronted by its lookup table as
+        # load_default_model serves it; the checkout's gitignored models/ directory is never read
+        if 'model' not in self._files:
+            from src.model_training import train_model as train
+            from src.predictions import TablePredictor, load_lookup_table, load_model
+
+            root = self.training_root(1)
+            _in_directory(root, train)
+            models = os.path.join(root, 'models')
+            self._files['model'] = TablePredictor(load_lookup_table(os.path.join(models, 'tourism_lookup.npz')),
+                                                  load_model(os.path.join(models, 'tourism_model.pkl')))
+        return self._files['model']
+
+
+# Each case takes the fixtures and a scale and returns the zero-argument callable to time; setup stays outside
+# the timing. Names are stable because results are compared by name across runs
+
+def load_workbook_cold(fixtures, scale):
+    workbook, cache_dir = fixtures.workbook(scale), fixtures.path('.cache', f"cold-{scale}")
+
+    def run():
+        shutil.rmtree(cache_dir, ignore_errors=True)
+        load_workbook(workbook, cache_dir=cache_dir)
+    return run
+
+
+def load_workbook_warm(fixtures, scale):
+    workbook, cache_dir = fixtures.workbook(scale), fixtures.path('.cache', f"warm-{scale}")
+    load_workbook(workbook, cache_dir=cache_dir)
+    return lambda: load_workbook(workbook, cache_dir=cache_dir)
+
+
+def load_data_csv(fixtures, scale):
+    from src.data_preprocessing import load_data
+
+    path = fixtures.csv(scale)
+    return lambda: load_data(path)
+
+
+def train_model(fixtures, scale):
+    # Runs in a scratch directory holding the synthetic CSV
+    from src.model_training import train_model as train
+
+    root = fixtures.training_root(scale)
+    return lambda: _in_directory(root, train)
+
+
+def predict_single(fixtures, scale):
+    from src.predictions import make_prediction
+
+    model = fixtures.model()
+    rows = pd.read_csv(fixtures.csv(1), nrows=1000)[['month', 'temperature', 'local_events', 'holiday_season']]
+    rows = rows.to_numpy().tolist()
+
+    def run():
+        for row in rows:
+            make_prediction(row, model=model)
+    return run
+
+
+def predict_batch(fixtures, scale):
+    from src.predictions import predict_batch as score
+    from src.schema import FEATURES
+
+    model = fixtures.model()
+    features = pd.read_csv(fixtures.csv(scale), usecols=FEATURES)[FEATURES]
+    return lambda: score(features, model=model)
+
+
+def year_rollups(fixtures, scale):
+    from src.aggregates import compute_year_rollups
+
+    sheets = load_workbook(fixtures.workbook(scale), cache_dir=fixtures.path('.cache', f"rollups-{scale}"))
+    return lambda: compute_year_rollups(sheets)
+
+
+def view_figures(view):
+    # Every chart of one Thailand view built from scratch, as on a figure cache miss
+    def case(fixtures, scale):
+        from src.datasets import DatasetStore, view_blocks, view_sources
+        from src.figures import build_figure
+        from src.forecasting import ForecastEngine
+        from src.views import load_spec
+
+        spec = load_spec(SPEC)
+        store = DatasetStore(fixtures.workbook(scale), spec.get('tables'),
+                             cache_dir=fixtures.path('.cache', f"figures-{scale}"))
+        for source in view_sources(spec, view):
+            store.table(source)
+
+        engine = ForecastEngine(cache_dir=fixtures.path('.cache', 'forecasts'))
+        charts = []
+        for block in view_blocks(spec, view):
+            if block['type'] == 'forecast':
+                history = store.table(block['history']).set_index('Year')[block['series']]
+                engine.forecast(('bench', block['series']), history)
+                engine.wait()
+                forecast = engine.forecast(('bench', block['series']), history)
+                table = forecast.rename(columns={'Forecast': block['predicted']}).merge(
+                    store.table(block['actuals']), on='Year', how='left')
+                charts.append((spec['charts'][block['chart']], table))
+            elif block['type'] == 'chart':
+                chart = spec['charts'][block['chart']]
+                charts.append((chart, store.table(chart['source'])))
+        engine.shutdown()
+
+        def run():
+            for chart, table in charts:
+                build_figure(chart, table).to_json(validate=False)
+        return run
+    return case
+
+
+# name: (case, scales it runs at; None for every requested scale, () for unscaled)
+CASES = {
+    'load_workbook_cold': (load_workbook_cold, WORKBOOK_SCALES),
+    'load_workbook_warm': (load_workbook_warm, WORKBOOK_SCALES),
+    'load_data_csv': (load_data_csv, None),
+    'train_model': (train_model, None),
+    'predict_single_1000': (predict_single, ()),
+    'predict_batch': (predict_batch, None),
+    'year_rollups': (year_rollups, WORKBOOK_SCALES),
+    'figures_visitor_arrivals': (view_figures('Visitor Arrivals'), ()),
+    'figures_tourist_expenditures': (view_figures('Tourist Expenditures'), ()),
+    'figures_weather_patterns': (view_figures('Weather Patterns'), ()),
+    'figures_economic_indicators': (view_figures('Economic Indicators'), ()),
+}
+
+
+def measure(func, repeat, budget):
+    # One untimed warm-up round, then up to repeat rounds, stopping early once budget seconds are spent
+    func()
+    timings = []
+    deadline = time.perf_counter() + budget
+    while len(timings) < repeat and (not timings or time.perf_counter() < deadline):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return {
+        'rounds': len(timings),
+        'min_s': min(timings),
+        'median_s': statistics.median(timings),
+        'mean_s': statistics.fmean(timings),
+        'max_s': max(timings),
+    }
+
+
+def selected_cases(scales, only=None):
+    for name, (case, case_scales) in CASES.items():
+        if only and not any(pattern in name for pattern in only):
+            continue
+        if case_scales == ():
+            yield name, case, 1
+            continue
+        for scale in scales:
+            if case_scales is None or scale in case_scales:
+                yield f"{name}[{scale}x]", case, scale
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_suite(scales=DEFAULT_SCALES, only=None, repeat=5, budget=5.0):
+    results = {}
+    tmp = tempfile.mkdtemp(prefix='wavetour-bench-')
+    try:
+        fixtures = Fixtures(tmp)
+        for name, case, scale in selected_cases(scales, only):
+            try:
+                with warnings.catch_warnings(), contextlib.redirect_stdout(sys.stderr):
+                    # Schema rejections and sklearn feature-name warnings are expected on synthetic data
+                    warnings.simplefilter('ignore')
+                    results[name] = measure(case(fixtures, scale), repeat, budget)
+            except Exception as error:
+                # Recorded with the results; the other cases still run
+                results[name] = {'error': f"{type(error).__name__}: {error}"}
+                print(f"{name:<40}{'FAILED':>15}  {results[name]['error']}")
+            else:
+                print(f"{name:<40}{results[name]['median_s'] * 1000:>12.2f} ms  ({results[name]['rounds']} rounds)")
+            results[name]['scale'] = scale
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+    return {
+        'meta': {
+            'created': datetime.datetime.now(datetime.timezone.utc).isoformat(timespec='seconds'),
+            'commit': git_commit(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpus': os.cpu_count(),
+            'numpy': np.__version__,
+            'pandas': pd.__version__,
+        },
+        'results': results,
+    }
+
+
+def compare(current, baseline, threshold=DEFAULT_THRESHOLD):
+    # Median of each case against the baseline run; a case slower by more than threshold is a regression
+    regressions = []
+    print(f"\n{'case':<40}{'baseline':>12}{'current':>12}{'change':>9}")
+    for name, result in current['results'].items():
+        before = baseline['results'].get(name)
+        if before is None or 'error' in before or 'error' in result:
+            continue
+        change = result['median_s'] / before['median_s'] - 1
+        flag = ''
+        if change > threshold:
+            regressions.append(name)
+            flag = '  REGRESSION'
+        print(f"{name:<40}{before['median_s'] * 1000:>10.2f}ms{result['median_s'] * 1000:>10.2f}ms"
+              f"{change:>+8.0%}{flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the app's hot paths and compare against a baseline")
+    parser.add_argument('--scales', type=int, nargs='*', default=list(DEFAULT_SCALES))
+    parser.add_argument('--only', nargs='*', help='run the cases whose name contains one of these')
+    parser.add_argument('--repeat', type=int, default=5, help='rounds per case')
+    parser.add_argument('--budget', type=float, default=5.0, help='seconds after which a case stops adding rounds')
+    parser.add_argument('--output', help='results file (default: benchmarks/results/<time>-<commit>.json)')
+    parser.add_argument('--compare', help='baseline results file to check for regressions')
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help='relative slowdown of the median that counts as a regression')
+    args = parser.parse_args()
+    os.chdir(ROOT)
+
+    current = run_suite(args.scales, args.only, args.repeat, args.budget)
+    output = args.output
+    if output is None:
+        stamp = datetime.datetime.now().strftime('%Y%m%d-%H%M%S')
+        output = os.path.join(RESULTS_DIR, f"{stamp}-{current['meta']['commit'] or 'nogit'}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump(current, f, indent=2)
+    print(f"results written to {output}")
+
+    failed = [name for name, result in current['results'].items() if 'error' in result]
+    if failed:
+        print(f"{len(failed)} case(s) failed: {', '.join(failed)}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        regressions = compare(current, baseline, args.threshold)
+        if regressions:
+            print(f"{len(regressions)} case(s) regressed by more than {args.threshold:.0%}: {', '.join(regressions)}")
+            sys.exit(1)
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,149 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+from src.data_preprocessing import WORKBOOK_CACHE_DIR, load_workbook, workbook_sha256
+from src.shared_cache import content_key, parquet_bytes, read_parquet_bytes, shared_backend
+
+VISITORS_COLUMN = 'Visitors (in thousands)'
+EXPENDITURE_COLUMN = 'Total ($US) / Person per day'
+OVERALL_COLUMNS = ['Number of Visitors (in millions)', 'Expenditure (in billion THB)']
+
+ROLLUPS = ('overall_by_year', 'year_summary')
+
+
+# Sheets the rollups are computed from; rows ingested into any other sheet leave them unchanged
+ROLLUP_SHEETS = ('Visitor Arrivals', 'Tourist Expenditure', 'Overall Data', 'Weather Patterns', 'Economic Indicators')
+# Per-year columns that are sums, so the partials of two batches of rows add up to the partials of both
+PARTIAL_SUMS = ['visitor_rows', 'visitors', 'spend', 'spend_records', 'overall_rows'] + OVERALL_COLUMNS
+# Per-year values taken as-is from one row, where a later batch replaces an earlier one
+PARTIAL_VALUES = {
+    'Weather Patterns': ['Average Temperature (°C)', 'Rainfall (mm)'],
+    'Economic Indicators': ['GDP Growth (%)'],
+}
+
+
+def year_partials(sheets, carry=None):
+    # Per-year sums and values behind the rollups, from all or only some of the rollup sheets. Expenditure rows are
+    # forward-filled, so carry is the last filled row of the rows before these; the new carry is returned with them
+    parts = []
+    if 'Visitor Arrivals' in sheets:
+        visitors = sheets['Visitor Arrivals']
+        counts = pd.to_numeric(visitors[VISITORS_COLUMN], errors='coerce').fillna(0)
+        parts.append(counts.groupby(visitors['Year']).agg(['count', 'sum'])
+                     .set_axis(['visitor_rows', 'visitors'], axis=1))
+
+    if 'Tourist Expenditure' in sheets:
+        expenditure = sheets['Tourist Expenditure']
+        if carry is not None:
+            expenditure = pd.concat([pd.DataFrame([carry]), expenditure], ignore_index=True)
+        # Forward-fill the whole sheet first, so a year with a missing total reuses the previous year's row
+        expenditure = expenditure.ffill()
+        if carry is not None:
+            expenditure = expenditure.iloc[1:]
+        if len(expenditure):
+            carry = expenditure[['Year', EXPENDITURE_COLUMN]].iloc[-1].to_dict()
+        spend = pd.to_numeric(expenditure[EXPENDITURE_COLUMN], errors='coerce').fillna(0)
+        # Sum and count in one pass over the groups instead of one groupby each
+        parts.append(spend.groupby(expenditure['Year']).agg(['sum', 'count'])
+                     .set_axis(['spend', 'spend_records'], axis=1))
+
+    if 'Overall Data' in sheets:
+        overall = sheets['Overall Data'].groupby('Year')
+        parts.append(overall[OVERALL_COLUMNS].sum().assign(overall_rows=overall.size()))
+
+    for sheet, columns in PARTIAL_VALUES.items():
+        if sheet in sheets:
+            parts.append(sheets[sheet].drop_duplicates('Year', keep='last').set_index('Year')[columns])
+
+    partials = pd.concat(parts, axis=1) if parts else pd.DataFrame()
+    for column in PARTIAL_SUMS:
+        partials[column] = partials[column].fillna(0) if column in partials else 0
+    for columns in PARTIAL_VALUES.values():
+        for column in columns:
+            if column not in partials:
+                partials[column] = np.nan
+    partials.index = partials.index.astype('int64').rename('Year')
+    return partials.sort_index(), carry
+
+
+def merge_partials(base, delta):
+    # Sums add up, values from the later batch replace the earlier ones
+    merged = base.reindex(base.index.union(delta.index))
+    sums = delta[PARTIAL_SUMS].reindex(merged.index, fill_value=0)
+    merged[PARTIAL_SUMS] = merged[PARTIAL_SUMS].fillna(0) + sums
+    values = [column for columns in PARTIAL_VALUES.values() for column in columns]
+    merged[values] = delta[values].reindex(merged.index).combine_first(merged[values])
+    return merged
+
+
+def rollups_from_partials(partials):
+    # Every Year-level aggregate the Thailand views need. The year summary covers the years with visitor rows
+    visited = partials[partials['visitor_rows'] > 0]
+    overall = partials.loc[partials['overall_rows'] > 0, OVERALL_COLUMNS].reset_index()
+    overall['Year'] = overall['Year'].astype(int)
+
+    has_spend = visited['spend_records'] > 0
+    summary = pd.DataFrame({
+        'Year': visited.index.to_numpy(),
+        'Visitor Arrivals': visited['visitors'].to_numpy(),
+        'Total Expenditure': visited['spend'].where(has_spend).to_numpy(),
+        'Expenditure Records': visited['spend_records'].where(has_spend).to_numpy(),
+        'Avg Temp (°C)': visited['Average Temperature (°C)'].to_numpy(),
+        'Rainfall (mm)': visited['Rainfall (mm)'].to_numpy(),
+        'GDP Growth (%)': visited['GDP Growth (%)'].to_numpy(),
+    })
+    summary.insert(4, 'Average Expenditure', (summary['Total Expenditure'] / summary['Expenditure Records']).round(2))
+
+    return {'overall_by_year': overall, 'year_summary': summary}
+
+
+def compute_year_rollups(sheets):
+    return rollups_from_partials(year_partials(sheets)[0])
+
+
+def _partials_path(cache_dir, name, sha256):
+    # Same prefix as the workbook's sheet cache, so load_workbook drops these with the other stale parts
+    return os.path.join(cache_dir, f"{name}-{sha256[:12]}-partials.parquet")
+
+
+def load_year_partials(file_path, cache_dir=WORKBOOK_CACHE_DIR):
+    # Partials of the whole workbook, stored next to the workbook cache and keyed by the workbook's content hash
+    name = os.path.splitext(os.path.basename(file_path))[0]
+    sha256 = workbook_sha256(file_path, cache_dir)
+    path = _partials_path(cache_dir, name, sha256)
+
+    try:
+        return pd.read_parquet(path)
+    except (OSError, ValueError, ImportError):
+        pass
+
+    def compute():
+        return year_partials(load_workbook(file_path, cache_dir, sheets=list(ROLLUP_SHEETS)))[0]
+
+    backend = shared_backend()
+    if backend.shared:
+        # Replicas sharing a cache compute the partials of a workbook once between them
+        partials = read_parquet_bytes(backend.get_or_compute(content_key('partials', sha256),
+                                                             lambda: parquet_bytes(compute())))
+    else:
+        # Nothing is shared, so the frame is never serialised
+        partials = backend.get_or_compute(content_key('partials', sha256), compute)
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        tmp_path = path + '.tmp'
+        partials.to_parquet(tmp_path)
+        os.replace(tmp_path, path)
+    except (OSError, ImportError):
+        # As with the sheet cache, failing to store the partials only costs a recompute next time
+        pass
+    return partials
+
+
+def load_year_rollups(file_path, cache_dir=WORKBOOK_CACHE_DIR, delta=None):
+    # delta holds the partials of rows ingested after the workbook; merging them costs one row per year
+    partials = load_year_partials(file_path, cache_dir)
+    if delta is not None:
+        partials = merge_partials(partials, delta)
+    return rollups_from_partials(partials)
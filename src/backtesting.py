@@ -0,0 +1,124 @@
+import sys
+import os
+
+# Add the parent directory of the current file to the sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import argparse
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from src.datasets import view_blocks
+from src.forecasting import fit_model
+
+METRICS = ('MAPE', 'sMAPE', 'RMSE', 'Bias')
+# Fewest years a model is fitted on; earlier origins are skipped
+MIN_TRAIN_YEARS = 3
+
+
+def accuracy_percent(predicted, actual):
+    # 100 minus the absolute percentage error of each forecast
+    predicted, actual = np.asarray(predicted, dtype=float), np.asarray(actual, dtype=float)
+    return (1 - np.abs(predicted - actual) / actual) * 100
+
+
+def forecast_metrics(predicted, actual, axis=None):
+    # Error metrics along axis over the pairs where both values are known; NaN marks a missing value
+    predicted, actual = np.asarray(predicted, dtype=float), np.asarray(actual, dtype=float)
+    error = predicted - actual
+    with warnings.catch_warnings(), np.errstate(divide='ignore', invalid='ignore'):
+        # A slice with no known pair is NaN, not a warning
+        warnings.simplefilter('ignore', RuntimeWarning)
+        return {
+            'MAPE': np.nanmean(np.abs(error) / np.abs(actual), axis=axis) * 100,
+            'sMAPE': np.nanmean(2 * np.abs(error) / (np.abs(actual) + np.abs(predicted)), axis=axis) * 100,
+            'RMSE': np.sqrt(np.nanmean(error ** 2, axis=axis)),
+            'Bias': np.nanmean(error, axis=axis),
+        }
+
+
+def _origin_forecast(task):
+    # One fit on the years before the origin; module level so a process pool can run it
+    model, values, origin, horizon = task
+    return np.asarray(fit_model(model, values[:origin]).forecast(horizon), dtype=float)
+
+
+def backtest(series, models=('ets',), horizon=3, min_train=MIN_TRAIN_YEARS, workers=None):
+    # Rolling-origin evaluation: every series is refit at each origin from min_train years on and forecast
+    # horizon years ahead. series maps a key, e.g. (country, column), to values indexed by year. Returns one
+    # row per key, model and step ahead, with the metrics over every origin that has an actual for that step
+    keys = list(series)
+    histories = [series[key].dropna().sort_index().to_numpy(dtype=float) for key in keys]
+    origins = max((len(values) - min_train for values in histories), default=0)
+    if origins <= 0:
+        raise ValueError(f"Backtesting needs series longer than {min_train} years")
+
+    # actual[s, o, h] is the value h + 1 years after origin o of series s, NaN past its end
+    actual = np.full((len(keys), origins, horizon), np.nan)
+    for s, values in enumerate(histories):
+        padded = np.concatenate([values, np.full(horizon, np.nan)])
+        steps = np.arange(horizon)
+        for o in range(len(values) - min_train):
+            actual[s, o] = padded[min_train + o + steps]
+
+    tasks = [(model, values, min_train + o, horizon)
+             for model in models for values in histories for o in range(len(values) - min_train)]
+    slots = [(m, s, o) for m in range(len(models)) for s, values in enumerate(histories)
+             for o in range(len(values) - min_train)]
+    workers = os.cpu_count() if workers is None else workers
+    if workers > 1 and len(tasks) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            forecasts = list(pool.map(_origin_forecast, tasks, chunksize=max(1, len(tasks) // (workers * 4))))
+    else:
+        forecasts = [_origin_forecast(task) for task in tasks]
+
+    predicted = np.full((len(models), len(keys), origins, horizon), np.nan)
+    m, s, o = np.array(slots).T
+    predicted[m, s, o] = np.stack(forecasts)
+
+    # Every metric for every model, series and step in one pass over the origin axis
+    metrics = forecast_metrics(predicted, actual[np.newaxis], axis=2)
+    counted = (~np.isnan(predicted - actual[np.newaxis])).sum(axis=2)
+    index = pd.MultiIndex.from_product([models, range(len(keys)), range(1, horizon + 1)],
+                                       names=['model', 'series', 'horizon'])
+    frame = pd.DataFrame({name: values.ravel() for name, values in metrics.items()}, index=index)
+    frame['origins'] = counted.ravel()
+    frame = frame.reset_index()
+    frame.insert(1, 'key', [keys[s] for s in frame.pop('series')])
+    return frame[frame['origins'] > 0].reset_index(drop=True)
+
+
+def forecast_series(registry):
+    # The history behind every forecast block of every onboarded country
+    series = {}
+    for country in registry.countries():
+        spec = registry.spec(country)
+        store = registry.store(country)
+        for view in spec['views']:
+            for block in view_blocks(spec, view):
+                if block['type'] == 'forecast':
+                    history = store.table(block['history']).set_index('Year')[block['series']]
+                    series[(country, block['series'])] = history
+    return series
+
+
+if __name__ == '__main__':
+    from src.datasets import DatasetRegistry
+    from src.forecasting import FORECAST_MODELS
+    from src.views import load_country_specs
+
+    parser = argparse.ArgumentParser(description='Rolling-origin backtest of the forecast models')
+    parser.add_argument('--models', nargs='*', default=list(FORECAST_MODELS), choices=FORECAST_MODELS)
+    parser.add_argument('--horizon', type=int, default=3)
+    parser.add_argument('--min-train', type=int, default=MIN_TRAIN_YEARS)
+    parser.add_argument('--workers', type=int, default=None)
+    args = parser.parse_args()
+
+    results = backtest(forecast_series(DatasetRegistry(load_country_specs())), models=args.models,
+                       horizon=args.horizon, min_train=args.min_train, workers=args.workers)
+    with pd.option_context('display.width', 160, 'display.max_rows', None, 'display.max_columns', None,
+                           'display.float_format', '{:,.2f}'.format):
+        print(results)
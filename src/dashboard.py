@@ -0,0 +1,71 @@
+import pandas as pd
+import streamlit as st
+
+from src.datasets import DatasetRegistry
+from src.forecasting import ForecastEngine
+from src.image_assets import image_bytes
+from src.instrumentation import finish_rerun, metrics, span
+from src.query_engine import QueryEngine
+from src.views import country_page, load_country_specs, performance_panel
+
+# Cached frames are shared by every session; copy-on-write keeps a session's edits out of the shared copy
+pd.set_option('mode.copy_on_write', True)
+
+COUNTRIES = [
+    "Thailand", "Oman", "United Arab Emirates", "Saudi Arabia", "Qatar",
+    "United Kingdom", "United States", "Canada", "Turkey", "France",
+    "Italy", "Greece", "Spain", "Egypt", "Morocco", "Colombia",
+    "China", "Japan", "India"
+]
+
+
+# One registry shared by every session. It only keeps the stores of the most recently selected countries,
+# and a store loads each table on first use and keeps it until the workbook changes
+@st.cache_resource
+def dataset_registry():
+    return DatasetRegistry(load_country_specs())
+
+
+# Forecast fits run on this engine's worker pool, shared by every session
+@st.cache_resource
+def forecast_engine():
+    return ForecastEngine()
+
+
+# Query blocks filter the country's tables through one embedded database, loaded as they are first queried
+@st.cache_resource
+def query_engine():
+    return QueryEngine()
+
+
+def render(logout, profiler=None):
+    # The signed-in page. app.py imports this module on the first signed-in rerun, so the login page never
+    # loads pandas, plotly or the data stack
+    st.sidebar.header("Data Preview")
+
+    # Sort the countries alphabetically; a country with a spec is listed even before it is added here
+    registry = dataset_registry()
+    countries = sorted(set(COUNTRIES) | set(registry.countries()))
+    default_country_index = countries.index("Thailand")
+    country_choice = st.sidebar.selectbox("Choose a country", countries, index=default_country_index)
+
+    if country_choice in registry:
+        st.sidebar.button("Logout", on_click=logout)
+
+        st.sidebar.toggle("Performance panel", key='perf_panel')
+
+        # The dataset chooser and the view are a fragment: choosing a dataset or opening a section reruns only
+        # that part of the page
+        with span('render'):
+            country_page(registry, country_choice, theme=st.get_option('theme.base') or 'light',
+                         forecasts=forecast_engine(), queries=query_engine())
+    else:
+        header_image = 'images/soon-header.png'  # Replace with your image file path or URL
+        st.image(image_bytes(header_image), use_column_width=True, output_format='JPEG')
+        st.warning("Data for the selected country will be implemented soon.")
+        st.sidebar.button("Logout", on_click=logout)
+        st.sidebar.toggle("Performance panel", key='perf_panel')
+
+    rerun = finish_rerun()
+    if profiler is not None or st.session_state.get('perf_panel'):
+        performance_panel(rerun, metrics, profiler.stop() if profiler is not None else None)
@@ -1,6 +1,301 @@
+import importlib.util
+import json
+import os
+import warnings
+
+import numpy as np
 import pandas as pd
 
-def load_data(file_path):
-    data = pd.read_csv(file_path)
-    # Additional preprocessing steps can be added here
-    return data
\ No newline at end of file
+from src.file_utils import file_sha256
+from src.shared_cache import content_key, parquet_bytes, read_parquet_bytes, shared_backend
+from src.schema import FEATURES, TARGET, TOURISM_SCHEMA
+
+# pyarrow parses CSVs multi-threaded; fall back to the C parser when it is not installed
+CSV_ENGINE = 'pyarrow' if importlib.util.find_spec('pyarrow') else 'c'
+CSV_BLOCK_BYTES = 4 << 20
+CSV_CHUNK_ROWS = 250_000
+
+WORKBOOK_CACHE_DIR = os.path.join('data', '.cache')
+
+# The workbook marks missing values with a lowercase "na" string
+WORKBOOK_NA_VALUES = ['na']
+
+
+class SchemaError(ValueError):
+    def __init__(self, message, rejected=None):
+        super().__init__(message)
+        self.rejected = rejected
+
+
+def _empty_report():
+    return pd.DataFrame({'row': pd.Series(dtype='int64'), 'column': pd.Series(dtype=object),
+                         'value': pd.Series(dtype=object), 'reason': pd.Series(dtype=object)})
+
+
+def validate_frame(frame, schema=TOURISM_SCHEMA):
+    # Split a raw frame into rows that satisfy the schema (cast to compact dtypes) and a report of the rest.
+    # The clean columns are cast from the parsed numbers, so text such as "31.0" in an object column is kept as 31
+    missing = [column for column in schema if column not in frame.columns]
+    if missing:
+        raise SchemaError(f"Missing columns: {', '.join(missing)}")
+
+    bad = np.zeros(len(frame), dtype=bool)
+    problems, parsed = [], {}
+    for column, spec in schema.items():
+        raw = frame[column]
+        checks = []
+        if pd.api.types.is_integer_dtype(raw.dtype):
+            # Parsed as integers already: nothing can be missing, textual or fractional
+            values = raw
+        else:
+            values = pd.to_numeric(raw, errors='coerce')
+            checks += [('missing value', raw.isna()), ('not a number', values.isna() & raw.notna())]
+            if spec['dtype'] != 'bool':
+                checks.append(('not an integer', values.notna() & (values % 1 != 0)))
+
+        if spec['dtype'] == 'bool':
+            checks.append(('not 0 or 1', values.notna() & ~values.isin([0, 1])))
+        else:
+            bounds = np.iinfo(spec['dtype'])
+            low, high = spec.get('min', bounds.min), spec.get('max', bounds.max)
+            checks.append((f"outside [{low}, {high}]", (values < low) | (values > high)))
+        parsed[column] = values
+
+        for reason, mask in checks:
+            mask = mask.to_numpy()
+            if mask.any():
+                bad |= mask
+                problems.append(pd.DataFrame({'row': frame.index[mask], 'column': column,
+                                              'value': raw[mask].astype(str).to_numpy(), 'reason': reason}))
+
+    keep = ~bad if bad.any() else slice(None)
+    clean = pd.DataFrame({column: parsed[column].to_numpy()[keep].astype(spec['dtype'])
+                          for column, spec in schema.items()}, index=frame.index[keep])
+    rejected = (pd.concat(problems, ignore_index=True).sort_values('row', kind='stable', ignore_index=True)
+                if problems else _empty_report())
+    return clean, rejected
+
+
+def _csv_chunks(file_path, usecols=None, chunk_rows=CSV_CHUNK_ROWS, engine=CSV_ENGINE):
+    # Raw frames indexed by 0-based data row; pyarrow streams blocks, the C parser is the fallback
+    if usecols:
+        # Both parsers fail on a missing usecols column with errors of their own, so check the header first
+        header = pd.read_csv(file_path, nrows=0).columns
+        missing = [column for column in usecols if column not in header]
+        if missing:
+            raise SchemaError(f"Missing columns: {', '.join(missing)}")
+    offset = 0
+    if engine == 'pyarrow':
+        import pyarrow as pa
+        from pyarrow import csv
+
+        convert_options = csv.ConvertOptions(include_columns=usecols) if usecols else None
+        try:
+            with csv.open_csv(file_path, read_options=csv.ReadOptions(block_size=CSV_BLOCK_BYTES),
+                              convert_options=convert_options) as reader:
+                for batch in reader:
+                    frame = batch.to_pandas()
+                    frame.index += offset
+                    offset += len(frame)
+                    yield frame
+            return
+        except pa.ArrowInvalid:
+            # A later block holds a value that does not parse as the type inferred from the first one;
+            # finish with the C parser, which hands such values over as text for the rejection report
+            pass
+
+    skiprows = range(1, offset + 1) if offset else None
+    for frame in pd.read_csv(file_path, usecols=usecols, skiprows=skiprows, chunksize=chunk_rows,
+                             low_memory=False):
+        frame.index += offset
+        yield frame
+
+
+def iter_validated_chunks(file_path, schema=TOURISM_SCHEMA, chunk_rows=CSV_CHUNK_ROWS, engine=CSV_ENGINE):
+    # Only one raw chunk is alive at a time; callers decide how much of the compact output to keep
+    for raw in _csv_chunks(file_path, usecols=list(schema), chunk_rows=chunk_rows, engine=engine):
+        clean, rejected = validate_frame(raw, schema)
+        yield clean, rejected, len(raw)
+
+
+def load_data(file_path, schema=TOURISM_SCHEMA, errors='drop'):
+    # schema=None keeps the plain read_csv behaviour. With a schema, rows that fail it are never coerced:
+    # errors='drop' removes them and keeps the report in data.attrs['rejected'], errors='raise' raises SchemaError
+    if schema is None:
+        return pd.read_csv(file_path)
+
+    chunks, reports, total = [], [], 0
+    for clean, rejected, rows in iter_validated_chunks(file_path, schema):
+        chunks.append(clean)
+        if len(rejected):
+            reports.append(rejected)
+        total += rows
+
+    if not chunks:
+        chunks.append(validate_frame(pd.DataFrame(columns=list(schema)), schema)[0])
+    data = chunks[0] if len(chunks) == 1 else pd.concat(chunks)
+    rejected = pd.concat(reports, ignore_index=True) if reports else _empty_report()
+    if len(rejected):
+        message = (f"{file_path}: rejected {rejected['row'].nunique()} of {total} rows "
+                   f"({rejected.groupby('reason').size().to_dict()})")
+        if errors == 'raise':
+            raise SchemaError(message, rejected)
+        warnings.warn(message, stacklevel=2)
+    data.attrs['rejected'] = rejected
+    return data
+
+
+def shared_view(frame):
+    # Zero-copy view of a cached frame. With pandas copy-on-write enabled, edits through the view copy only the
+    # columns they touch, so the cached original is never changed
+    return frame.copy(deep=False)
+
+
+def _read_manifest(manifest_path):
+    try:
+        with open(manifest_path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _workbook_version(file_path, manifest):
+    # Trust the previous hash while mtime and size are unchanged, otherwise rehash
+    stat = os.stat(file_path)
+    if manifest and manifest.get('mtime_ns') == stat.st_mtime_ns and manifest.get('size') == stat.st_size:
+        return manifest['sha256'], stat
+    return file_sha256(file_path), stat
+
+
+def workbook_sha256(file_path, cache_dir=WORKBOOK_CACHE_DIR):
+    # Content hash of the workbook; only a stat call while the cached manifest still matches the file
+    name = os.path.splitext(os.path.basename(file_path))[0]
+    return _workbook_version(file_path, _read_manifest(os.path.join(cache_dir, name + '.json')))[0]
+
+
+def load_workbook(file_path, cache_dir=WORKBOOK_CACHE_DIR, sheets=None):
+    # Read every sheet of the workbook, reusing a Parquet copy keyed by the file's mtime and hash.
+    # sheets=[...] returns only those sheets; with a warm cache only their Parquet parts are read
+    name = os.path.splitext(os.path.basename(file_path))[0]
+    manifest_path = os.path.join(cache_dir, name + '.json')
+    manifest = _read_manifest(manifest_path)
+    sha256, stat = _workbook_version(file_path, manifest)
+
+    if manifest and manifest.get('sha256') == sha256:
+        try:
+            cached = {
+                sheet: pd.read_parquet(os.path.join(cache_dir, part))
+                for sheet, part in manifest['sheets']
+                if sheets is None or sheet in sheets
+            }
+        except (OSError, ValueError, ImportError):
+            cached = None
+        if cached is not None and (sheets is None or len(cached) == len(set(sheets))):
+            if manifest.get('mtime_ns') != stat.st_mtime_ns:
+                manifest.update(mtime_ns=stat.st_mtime_ns, size=stat.st_size)
+                _write_manifest(manifest_path, manifest)
+            return cached
+
+    parsed = _parse_workbook(file_path, sha256)
+
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        parts = []
+        for index, (sheet, df) in enumerate(parsed.items()):
+            part = f"{name}-{sha256[:12]}-{index}.parquet"
+            df.to_parquet(os.path.join(cache_dir, part), index=False)
+            parts.append([sheet, part])
+        _write_manifest(manifest_path, {
+            'source': os.path.basename(file_path),
+            'sha256': sha256,
+            'mtime_ns': stat.st_mtime_ns,
+            'size': stat.st_size,
+            'sheets': parts,
+            'years': sheet_years(parsed),
+        })
+        _remove_stale_parts(cache_dir, name, sha256)
+    except (OSError, ImportError):
+        # The cache is an optimisation only; a read-only disk or missing pyarrow just means parsing every time
+        pass
+
+    if sheets is None:
+        return parsed
+    missing = [sheet for sheet in sheets if sheet not in parsed]
+    if missing:
+        raise KeyError(f"{file_path} has no sheet named {', '.join(missing)}")
+    return {sheet: parsed[sheet] for sheet in sheets}
+
+
+def _parse_workbook(file_path, sha256):
+    # One pass over the workbook instead of one read_excel call per sheet. With a shared cache configured, the
+    # first replica to miss stores the parsed sheets under the workbook's hash and the others download them
+    backend = shared_backend()
+    if not backend.shared:
+        # Nothing is shared, so the sheets are returned as parsed instead of serialised for other replicas
+        return backend.get_or_compute(content_key('workbook', sha256),
+                                      lambda: pd.read_excel(file_path, sheet_name=None, na_values=WORKBOOK_NA_VALUES))
+    parsed = {}
+
+    def parse():
+        parsed.update(pd.read_excel(file_path, sheet_name=None, na_values=WORKBOOK_NA_VALUES))
+        index = []
+        for position, (sheet, df) in enumerate(parsed.items()):
+            key = content_key('sheet', sha256, position)
+            backend.set(key, parquet_bytes(df, index=False))
+            index.append([sheet, key])
+        return json.dumps(index).encode('utf-8')
+
+    index = json.loads(backend.get_or_compute(content_key('workbook', sha256), parse))
+    if parsed:
+        return parsed
+    parts = {sheet: backend.get(key) for sheet, key in index}
+    if any(data is None for data in parts.values()):
+        # A sheet was evicted since the index was stored
+        return pd.read_excel(file_path, sheet_name=None, na_values=WORKBOOK_NA_VALUES)
+    return {sheet: read_parquet_bytes(data) for sheet, data in parts.items()}
+
+
+def sheet_years(sheets):
+    # {sheet: [first, last]} for every sheet with a Year column
+    years = {}
+    for sheet, df in sheets.items():
+        if 'Year' in df.columns:
+            values = pd.to_numeric(df['Year'], errors='coerce').dropna()
+            if len(values):
+                years[sheet] = [int(values.min()), int(values.max())]
+    return years
+
+
+def workbook_years(file_path, cache_dir=WORKBOOK_CACHE_DIR):
+    # Year range of each sheet, read from the manifest so indexing a workbook does not load its sheets
+    name = os.path.splitext(os.path.basename(file_path))[0]
+    manifest_path = os.path.join(cache_dir, name + '.json')
+    manifest = _read_manifest(manifest_path)
+    sha256, _ = _workbook_version(file_path, manifest)
+    if manifest and manifest.get('sha256') == sha256 and 'years' in manifest:
+        return manifest['years']
+
+    years = sheet_years(load_workbook(file_path, cache_dir))
+    # Manifests written before the index existed get their years added on the first lookup
+    manifest = _read_manifest(manifest_path)
+    if manifest and manifest.get('sha256') == sha256 and 'years' not in manifest:
+        manifest['years'] = years
+        try:
+            _write_manifest(manifest_path, manifest)
+        except OSError:
+            pass
+    return years
+
+
+def _write_manifest(manifest_path, manifest):
+    tmp_path = manifest_path + '.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp_path, manifest_path)
+
+
+def _remove_stale_parts(cache_dir, name, sha256):
+    current = f"{name}-{sha256[:12]}-"
+    for entry in os.listdir(cache_dir):
+        if entry.startswith(name + '-') and entry.endswith('.parquet') and not entry.startswith(current):
+            os.remove(os.path.join(cache_dir, entry))
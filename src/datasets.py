@@ -0,0 +1,158 @@
+import threading
+from collections import OrderedDict
+
+import pandas as pd
+
+from src.aggregates import ROLLUP_SHEETS, ROLLUPS, load_year_rollups
+from src.data_preprocessing import WORKBOOK_CACHE_DIR, load_workbook, workbook_sha256, workbook_years
+from src.ingestion import INGEST_DIR, IngestStore
+from src.instrumentation import span
+
+
+class DatasetStore:
+    # One country's tables: workbook sheets plus the rows ingested into them since, the Year rollups and small
+    # inline tables from its spec. Each table is loaded the first time a view asks for it and kept until its own
+    # version changes, so ingesting into one sheet leaves every other table and its figures cached
+
+    def __init__(self, workbook_path, inline_tables=None, cache_dir=WORKBOOK_CACHE_DIR, ingest_dir=INGEST_DIR):
+        self.workbook_path = workbook_path
+        self.cache_dir = cache_dir
+        self.inline_tables = dict(inline_tables or {})
+        self.ingest = IngestStore(workbook_path, ingest_dir, cache_dir)
+        self._tables = {}
+        self._lock = threading.Lock()
+
+    def version(self):
+        # Workbook hash plus the hash of the rows ingested since; changes whenever any table may have
+        return f"{workbook_sha256(self.workbook_path, self.cache_dir)}+{self.ingest.version()}"
+
+    def table_version(self, name, version=None):
+        # The part of version a table depends on: the workbook and the rows ingested up to the last batch for its
+        # sheets. version lets a caller that already hashed the workbook this rerun skip the stat call
+        if name in self.inline_tables:
+            return 'inline'
+        workbook = (version or self.version()).split('+')[0]
+        return f"{workbook}+{self.ingest.version(ROLLUP_SHEETS if name in ROLLUPS else (name,))}"
+
+    def table(self, name, version=None):
+        table_version = self.table_version(name, version)
+        with self._lock:
+            cached = self._tables.get(name)
+        if cached is not None and cached[0] == table_version:
+            return cached[1]
+
+        if name in self.inline_tables:
+            loaded = {name: pd.DataFrame(self.inline_tables[name])}
+        elif name in ROLLUPS:
+            with span('aggregate'):
+                loaded = load_year_rollups(self.workbook_path, self.cache_dir, self.ingest.partials())
+        else:
+            with span('load'):
+                loaded = load_workbook(self.workbook_path, self.cache_dir, sheets=[name])
+                ingested = self.ingest.read_sheet(name)
+                if ingested is not None:
+                    loaded[name] = pd.concat([loaded[name], ingested], ignore_index=True)
+
+        with self._lock:
+            self._tables.update((table, (table_version, frame)) for table, frame in loaded.items())
+        return loaded[name]
+
+    def loaded(self):
+        return sorted(self._tables)
+
+
+def view_blocks(spec, view):
+    # Every block of a view, including the blocks inside its sections
+    stack = list(reversed(spec['views'][view]['blocks']))
+    while stack:
+        block = stack.pop()
+        yield block
+        stack.extend(reversed(block.get('blocks', ())))
+
+
+def view_sources(spec, view):
+    # Tables a view reads, directly or through its charts
+    sources = set()
+    for block in view_blocks(spec, view):
+        sources.update(block[field] for field in ('source', 'history', 'actuals') if field in block)
+        sources.update(block.get('datasets', ()))
+        if 'source' in spec['charts'].get(block.get('chart'), {}):
+            sources.add(spec['charts'][block['chart']]['source'])
+    return sources
+
+
+def view_years(spec, years_by_sheet):
+    # {view: (first, last)} from the sheets' Year ranges; rollups span the whole workbook
+    spans = dict(years_by_sheet)
+    if years_by_sheet:
+        workbook_span = [min(first for first, _ in years_by_sheet.values()),
+                         max(last for _, last in years_by_sheet.values())]
+        spans.update((rollup, workbook_span) for rollup in ROLLUPS)
+    for name, table in spec.get('tables', {}).items():
+        if table.get('Year'):
+            spans[name] = [min(table['Year']), max(table['Year'])]
+
+    index = {}
+    for view in spec['views']:
+        covered = [spans[source] for source in view_sources(spec, view) if source in spans]
+        index[view] = (min(first for first, _ in covered), max(last for _, last in covered)) if covered else None
+    return index
+
+
+class DatasetRegistry:
+    # Every onboarded country, by spec. A country's store is created when it is selected and at most max_loaded
+    # stores are kept, least recently selected out first, so memory stays flat however many countries there are
+
+    def __init__(self, specs, max_loaded=2, cache_dir=WORKBOOK_CACHE_DIR, ingest_dir=INGEST_DIR):
+        self.specs = dict(specs)
+        self.max_loaded = max_loaded
+        self.cache_dir = cache_dir
+        self.ingest_dir = ingest_dir
+        self._stores = OrderedDict()
+        self._years = {}
+        self._lock = threading.Lock()
+
+    def __contains__(self, country):
+        return country in self.specs
+
+    def countries(self):
+        return sorted(self.specs)
+
+    def spec(self, country):
+        return self.specs[country]
+
+    def store(self, country):
+        with self._lock:
+            store = self._stores.get(country)
+            if store is None:
+                spec = self.specs[country]
+                store = DatasetStore(spec['workbook'], spec.get('tables'), self.cache_dir, self.ingest_dir)
+                self._stores[country] = store
+            self._stores.move_to_end(country)
+            # A session still rendering an evicted country keeps its tables until that rerun ends
+            while len(self._stores) > self.max_loaded:
+                self._stores.popitem(last=False)
+        return store
+
+    def loaded(self):
+        return list(self._stores)
+
+    def years(self, country):
+        # {view: (first, last)} of one country, from the workbook manifest and the ingest log; recomputed when
+        # either changes
+        spec = self.specs[country]
+        ingest = IngestStore(spec['workbook'], self.ingest_dir, self.cache_dir)
+        version = workbook_sha256(spec['workbook'], self.cache_dir), ingest.version()
+        cached = self._years.get(country)
+        if cached is None or cached[0] != version:
+            years = dict(workbook_years(spec['workbook'], self.cache_dir))
+            for sheet, (first, last) in ingest.years().items():
+                base = years.get(sheet, [first, last])
+                years[sheet] = [min(base[0], first), max(base[1], last)]
+            cached = version, view_years(spec, years)
+            self._years[country] = cached
+        return cached[1]
+
+    def index(self):
+        # Datasets and their years for every country; no sheet is read once the workbooks have been cached
+        return {country: self.years(country) for country in self.countries()}
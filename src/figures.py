@@ -0,0 +1,116 @@
+import copy
+import json
+import threading
+from collections import OrderedDict
+
+import plotly.graph_objects as go
+
+from src.instrumentation import add_payload, span
+from src.shared_cache import content_key, shared_backend
+
+# Serialized figures kept per process; one Thailand chart is 5-60 KB of JSON
+DEFAULT_FIGURE_CACHE_BYTES = 32 << 20
+
+
+def chart_frame(spec, table):
+    # The rows and columns a chart spec plots: renamed columns, and no years where every series is missing
+    frame = table.rename(columns=spec['rename']) if spec.get('rename') else table
+    columns = [series['y'] for series in spec['series']]
+    return frame.dropna(subset=columns, how='all')
+
+
+def _trace(series, defaults, x, frame):
+    trace = {**defaults, **series}
+    column = trace.pop('y')
+    y = frame[column].to_numpy()
+    trace.setdefault('type', 'bar')
+    trace.setdefault('name', column)
+    if trace.pop('text', False):
+        trace['text'] = y
+    color = trace.pop('color', None)
+    if color is not None:
+        # Bars take the series color as their fill, lines as their stroke
+        part = 'marker' if trace['type'] == 'bar' else 'line'
+        trace[part] = {**trace.get(part, {}), 'color': color}
+    return {**trace, 'x': x, 'y': y}
+
+
+def build_figure(spec, table):
+    # One go.Figure call from a chart spec: every trace and the layout are assembled as plain data first
+    with span('clean'):
+        frame = chart_frame(spec, table)
+    x = frame[spec.get('x', 'Year')].to_numpy()
+    defaults = spec.get('trace', {})
+    traces = [_trace(series, defaults, x, frame) for series in spec['series']]
+
+    layout = copy.deepcopy(spec.get('layout', {}))
+    if spec.get('all_ticks'):
+        layout.setdefault('xaxis', {})['tickvals'] = x
+    if spec.get('y_headroom'):
+        top = max(float(trace['y'].max()) for trace in traces)
+        layout.setdefault('yaxis', {})['range'] = [0, top * spec['y_headroom']]
+    return go.Figure(data=traces, layout=layout)
+
+
+class FigureCache:
+    # Figure JSON keyed by (country, dataset, chart, data version, theme), evicting the least recently used
+    # entries once the cached JSON exceeds max_bytes
+
+    def __init__(self, max_bytes=DEFAULT_FIGURE_CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, build, *args):
+        # JSON for key, calling build(*args) only on a miss
+        with self._lock:
+            spec = self._entries.get(key)
+            if spec is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return spec
+
+        def compute():
+            with span('figure'):
+                return build(*args).to_json(validate=False).encode('utf-8')
+
+        # Keys hold the data version and theme, so replicas sharing a cache build each figure once between them
+        spec = shared_backend().get_or_compute(content_key('figure', *key), compute).decode('utf-8')
+        with self._lock:
+            self.misses += 1
+            if key not in self._entries and len(spec) <= self.max_bytes:
+                self._entries[key] = spec
+                self._bytes += len(spec)
+                while self._bytes > self.max_bytes:
+                    _, evicted = self._entries.popitem(last=False)
+                    self._bytes -= len(evicted)
+        return spec
+
+    @property
+    def size_bytes(self):
+        return self._bytes
+
+    def __len__(self):
+        return len(self._entries)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+            self.hits = 0
+            self.misses = 0
+
+
+figure_cache = FigureCache()
+
+
+def cached_figure(key, build, *args):
+    # The cached JSON was produced from a validated figure, so rebuilding it skips Plotly's validation,
+    # which is most of the cost of constructing a figure
+    spec = figure_cache.get(key, build, *args)
+    # Streamlit sends this figure as JSON of about the same size
+    add_payload('figures', len(spec))
+    return go.Figure(json.loads(spec), _validate=False)
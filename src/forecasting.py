@@ -0,0 +1,149 @@
+import json
+import os
+import threading
+import warnings
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from src.data_preprocessing import WORKBOOK_CACHE_DIR
+
+FORECAST_MODELS = ('ets', 'sarimax')
+# Fewest years each model can be fitted on; shorter histories, e.g. of a newly onboarded country, are refused
+MIN_HISTORY_YEARS = {'ets': 2, 'sarimax': 3}
+FORECAST_WORKERS = 2
+# Forecast frames kept per process; each is a handful of rows
+MAX_FORECASTS = 256
+
+
+def fit_model(model, values, start_params=None):
+    # statsmodels is only imported by the worker that fits the first model
+    with warnings.catch_warnings():
+        # A handful of yearly points regularly trips the optimiser's convergence warnings
+        warnings.simplefilter('ignore')
+        if model == 'ets':
+            from statsmodels.tsa.exponential_smoothing.ets import ETSModel
+            return ETSModel(values, error='add', trend='add').fit(start_params=start_params, disp=False)
+        if model == 'sarimax':
+            from statsmodels.tsa.statespace.sarimax import SARIMAX
+            return SARIMAX(values, order=(1, 1, 0), trend='t').fit(start_params=start_params, disp=False)
+    raise ValueError(f"Unknown forecast model {model!r}, expected one of {', '.join(FORECAST_MODELS)}")
+
+
+def _state_path(cache_dir, key, model):
+    name = '-'.join(str(part).lower().replace(' ', '_') for part in key)
+    return os.path.join(cache_dir, f"forecast-{name}-{model}.json")
+
+
+def _read_state(path):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _write_state(path, state):
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(state, f)
+        os.replace(tmp_path, path)
+    except OSError:
+        # Losing the state only means the next fit starts from the default parameters
+        pass
+
+
+class ForecastEngine:
+    # Fits time-series models on a background pool. forecast() never blocks: it returns the cached forecast for
+    # (series, model, data version), or None after queueing the fit. Each series keeps its last fitted
+    # parameters on disk, so a workbook that only gained new years is refit starting from them
+
+    def __init__(self, workers=FORECAST_WORKERS, cache_dir=WORKBOOK_CACHE_DIR, max_forecasts=MAX_FORECASTS):
+        self.cache_dir = cache_dir
+        self.max_forecasts = max_forecasts
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='forecast')
+        self._forecasts = OrderedDict()
+        self._pending = {}
+        # Errors of failed fits by data version, so a failure is reported without refitting on every rerun and a
+        # new version of the data is fitted again
+        self._failed = OrderedDict()
+        self._lock = threading.Lock()
+        self.fits = {'full': 0, 'incremental': 0}
+
+    def forecast(self, key, history, model='ets', horizon=3, version=None):
+        # key names the series, e.g. (country, column); history is a Series of values indexed by year.
+        # version defaults to a hash of the history itself
+        if version is None:
+            version = int(pd.util.hash_pandas_object(history).sum())
+        history = history.dropna().sort_index()
+        if len(history) < MIN_HISTORY_YEARS.get(model, 1):
+            raise ValueError(f"The {model} model needs at least {MIN_HISTORY_YEARS[model]} years of history, "
+                             f"got {len(history)}")
+        cache_key = (key, model, horizon, version)
+        with self._lock:
+            forecast = self._forecasts.get(cache_key)
+            if forecast is not None:
+                self._forecasts.move_to_end(cache_key)
+                return forecast
+            if cache_key in self._failed:
+                raise self._failed[cache_key]
+            future = self._pending.get(cache_key)
+            if future is None:
+                future = self._pool.submit(self._run, cache_key, history, model, horizon)
+                self._pending[cache_key] = future
+        if future.done():
+            # Finished since the lookup above, or failed for this data version
+            return future.result()
+        return None
+
+    def pending(self):
+        return sum(not future.done() for future in list(self._pending.values()))
+
+    def wait(self, timeout=None):
+        for future in list(self._pending.values()):
+            future.exception(timeout)
+
+    def _run(self, cache_key, history, model, horizon):
+        try:
+            forecast = self._fit(cache_key[0], history, model, horizon)
+        except Exception as error:
+            with self._lock:
+                self._failed[cache_key] = error
+                while len(self._failed) > self.max_forecasts:
+                    self._failed.popitem(last=False)
+                self._pending.pop(cache_key, None)
+            raise
+        with self._lock:
+            self._forecasts[cache_key] = forecast
+            while len(self._forecasts) > self.max_forecasts:
+                self._forecasts.popitem(last=False)
+            self._pending.pop(cache_key, None)
+        return forecast
+
+    def _fit(self, key, history, model, horizon):
+        years = [int(year) for year in history.index]
+        values = history.to_numpy(dtype=float)
+        path = _state_path(self.cache_dir, key, model)
+        state = _read_state(path)
+
+        # Incremental when the stored fit covered a prefix of these years with the same values: only new years
+        # arrived, so the previous parameters are a close starting point for the optimiser
+        start_params = None
+        if state and len(state['years']) <= len(years) and years[:len(state['years'])] == state['years'] \
+                and np.allclose(values[:len(state['values'])], state['values']):
+            start_params = np.asarray(state['params'])
+        fitted = fit_model(model, values, start_params)
+        self.fits['incremental' if start_params is not None else 'full'] += 1
+
+        _write_state(path, {'years': years, 'values': values.tolist(), 'params': np.asarray(fitted.params).tolist()})
+        return pd.DataFrame({
+            'Year': np.arange(years[-1] + 1, years[-1] + 1 + horizon),
+            'Forecast': np.asarray(fitted.forecast(horizon)),
+        })
+
+    def shutdown(self):
+        self._pool.shutdown(wait=False, cancel_futures=True)
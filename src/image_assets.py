@@ -0,0 +1,138 @@
+import sys
+import os
+
+# Add the parent directory of the current file to the sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import argparse
+import threading
+
+from src.file_utils import file_sha256
+
+IMAGES_DIR = 'images'
+IMAGE_CACHE_DIR = os.path.join(IMAGES_DIR, '.cache')
+
+# Banner widths: 1280 fills the wide layout's content column, 640 suits narrow screens and thumbnails
+VARIANT_WIDTHS = (640, 1280)
+DEFAULT_WIDTH = 1280
+
+# Pillow format name and save options per variant extension
+VARIANT_FORMATS = {
+    'webp': ('WEBP', {'quality': 80, 'method': 6}),
+    'jpeg': ('JPEG', {'quality': 82, 'optimize': True, 'progressive': True}),
+}
+
+SOURCE_EXTENSIONS = ('.png', '.jpg', '.jpeg')
+
+
+def variant_path(source_path, sha256, width, fmt, cache_dir=IMAGE_CACHE_DIR):
+    name = os.path.splitext(os.path.basename(source_path))[0]
+    return os.path.join(cache_dir, f"{name}-{sha256[:12]}-{width}.{fmt}")
+
+
+def build_variants(source_path, widths=VARIANT_WIDTHS, formats=tuple(VARIANT_FORMATS), cache_dir=IMAGE_CACHE_DIR,
+                   sha256=None):
+    # Resized, recompressed copies of one image, keyed by its content hash; existing variants are reused
+    from PIL import Image
+
+    sha256 = sha256 or file_sha256(source_path)
+    wanted = {(width, fmt): variant_path(source_path, sha256, width, fmt, cache_dir)
+              for width in widths for fmt in formats}
+    missing = {key: path for key, path in wanted.items() if not os.path.exists(path)}
+    if not missing:
+        return wanted
+
+    os.makedirs(cache_dir, exist_ok=True)
+    with Image.open(source_path) as source:
+        image = source.convert('RGBA')
+        # Neither JPEG nor the banners need transparency; flatten onto white once for every variant
+        flat = Image.new('RGB', image.size, (255, 255, 255))
+        flat.paste(image, mask=image.getchannel('A'))
+
+    resized = {}
+    for (width, fmt), path in missing.items():
+        if width not in resized:
+            # Never upscale: a narrow source keeps its own size under the requested width's name
+            height = round(flat.height * width / flat.width)
+            resized[width] = flat.resize((width, height), Image.LANCZOS) if width < flat.width else flat
+        pil_format, options = VARIANT_FORMATS[fmt]
+        tmp_path = path + '.tmp'
+        resized[width].save(tmp_path, pil_format, **options)
+        os.replace(tmp_path, path)
+    return wanted
+
+
+def build_all(images_dir=IMAGES_DIR, cache_dir=IMAGE_CACHE_DIR):
+    # Variants for every raster image Pillow can read; returns {source path: {(width, fmt): variant path}}
+    built = {}
+    for entry in sorted(os.listdir(images_dir)):
+        path = os.path.join(images_dir, entry)
+        if os.path.isfile(path) and entry.lower().endswith(SOURCE_EXTENSIONS):
+            built[path] = build_variants(path, cache_dir=cache_dir)
+    _remove_stale_variants(cache_dir, built)
+    return built
+
+
+def _remove_stale_variants(cache_dir, built):
+    current = {os.path.basename(path) for variants in built.values() for path in variants.values()}
+    for entry in os.listdir(cache_dir) if os.path.isdir(cache_dir) else []:
+        if entry not in current:
+            os.remove(os.path.join(cache_dir, entry))
+
+
+class _Entry:
+    __slots__ = ('data', 'mtime_ns', 'size')
+
+    def __init__(self, data, stat):
+        self.data = data
+        self.mtime_ns = stat.st_mtime_ns
+        self.size = stat.st_size
+
+
+class ImageCache:
+    # Compressed variant bytes per process; a source image is only hashed again when its mtime or size changes
+
+    def __init__(self, cache_dir=IMAGE_CACHE_DIR):
+        self.cache_dir = cache_dir
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def get(self, source_path, width=DEFAULT_WIDTH, fmt='jpeg'):
+        key = (os.path.abspath(source_path), width, fmt)
+        stat = os.stat(source_path)
+        entry = self._entries.get(key)
+        if entry is not None and entry.mtime_ns == stat.st_mtime_ns and entry.size == stat.st_size:
+            return entry.data
+
+        path = build_variants(source_path, widths=(width,), formats=(fmt,), cache_dir=self.cache_dir)[(width, fmt)]
+        with open(path, 'rb') as f:
+            data = f.read()
+        with self._lock:
+            self._entries[key] = _Entry(data, stat)
+        return data
+
+    def payload_bytes(self):
+        return sum(len(entry.data) for entry in self._entries.values())
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+image_cache = ImageCache()
+
+
+def image_bytes(source_path, width=DEFAULT_WIDTH, fmt='jpeg'):
+    return image_cache.get(source_path, width, fmt)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Build resized WebP/JPEG variants of the images/ assets')
+    parser.add_argument('--images-dir', default=IMAGES_DIR)
+    parser.add_argument('--cache-dir', default=IMAGE_CACHE_DIR)
+    args = parser.parse_args()
+
+    for source, variants in build_all(args.images_dir, args.cache_dir).items():
+        sizes = ', '.join(f"{fmt} {width}px {os.path.getsize(path) / 1024:,.0f} KB"
+                          for (width, fmt), path in sorted(variants.items()))
+        print(f"{source} ({os.path.getsize(source) / 1024:,.0f} KB): {sizes}")
@@ -0,0 +1,264 @@
+import sys
+import os
+
+# Add the parent directory of the current file to the sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import argparse
+import hashlib
+import json
+import threading
+
+import numpy as np
+import pandas as pd
+
+from src.aggregates import ROLLUP_SHEETS, merge_partials, year_partials
+from src.data_preprocessing import WORKBOOK_CACHE_DIR, SchemaError, load_data, load_workbook, validate_frame
+from src.file_utils import exclusive_lock, file_sha256
+
+INGEST_DIR = os.path.join('data', 'store')
+# Rows ingested into a CSV such as data/tourism_data.csv go to this sheet, partitioned by month
+CSV_SHEET = 'rows'
+PARTITION_COLUMNS = {CSV_SHEET: 'month'}
+
+
+def _slug(value):
+    return str(value).lower().replace(' ', '_').replace('/', '_')
+
+
+def _empty_log():
+    return {'base': None, 'seq': 0, 'digest': None, 'batches': [], 'columns': {}, 'carry': None, 'partials': None,
+            'normal_equations': None}
+
+
+def read_batch(path, sheet=None):
+    # New rows from a CSV, Parquet or Excel file; an Excel file is read from the sheet of the same name
+    extension = os.path.splitext(path)[1].lower()
+    if extension == '.parquet':
+        return pd.read_parquet(path)
+    if extension in ('.xlsx', '.xls'):
+        return pd.read_excel(path, sheet_name=sheet or 0)
+    return pd.read_csv(path)
+
+
+class IngestStore:
+    # Rows appended to a workbook or CSV after it was published, kept under data/store/<name>/ next to the
+    # untouched base file. Each batch is written as one Parquet file per Year (month for CSV rows) and recorded
+    # in log.json; nothing already written is read or rewritten, except the per-year partials of the rollups and
+    # the model's normal equations, which are a few rows each. The log is tied to the base file's content hash:
+    # a replaced base file is assumed to include the ingested rows, so the store then reads as empty
+    # and the next batch starts a new log
+
+    def __init__(self, base_path, root=INGEST_DIR, cache_dir=WORKBOOK_CACHE_DIR):
+        self.base_path = base_path
+        self.cache_dir = cache_dir
+        self.path = os.path.join(root, os.path.splitext(os.path.basename(base_path))[0])
+        self._log = None, _empty_log()
+        self._lock = threading.Lock()
+
+    def _log_path(self):
+        return os.path.join(self.path, 'log.json')
+
+    def _read_log(self):
+        # Reread only when log.json changed; a log written against another version of the base file is ignored
+        try:
+            stat, base = os.stat(self._log_path()), os.stat(self.base_path)
+        except OSError:
+            return _empty_log()
+        key = (stat.st_mtime_ns, stat.st_size, base.st_mtime_ns, base.st_size)
+        with self._lock:
+            if self._log[0] == key:
+                return self._log[1]
+        with open(self._log_path()) as f:
+            log = json.load(f)
+        if not self._matches_base(log):
+            log = _empty_log()
+        with self._lock:
+            self._log = key, log
+        return log
+
+    def _matches_base(self, log):
+        # Trust the recorded hash while the base file's mtime and size are unchanged, otherwise rehash
+        base = log.get('base')
+        if not base:
+            return False
+        stat = os.stat(self.base_path)
+        if base['mtime_ns'] == stat.st_mtime_ns and base['size'] == stat.st_size:
+            return True
+        return file_sha256(self.base_path) == base['sha256']
+
+    def version(self, sheets=None):
+        # Content hash of the ingested rows up to the last batch appended to any of sheets (all sheets by
+        # default); '' before the first. Replicas holding the same rows agree on it, so it can key shared caches
+        return next((batch['digest'] for batch in reversed(self._read_log()['batches'])
+                     if sheets is None or batch['sheet'] in sheets), '')
+
+    def years(self):
+        # {sheet: [first, last]} of the ingested rows, in the shape of the workbook manifest's years
+        years = {}
+        for batch in self._read_log()['batches']:
+            if batch.get('years'):
+                first, last = years.get(batch['sheet'], batch['years'])
+                years[batch['sheet']] = [min(first, batch['years'][0]), max(last, batch['years'][1])]
+        return years
+
+    def read_sheet(self, sheet):
+        # Every row ingested into sheet, oldest batch first; None when there are none
+        files = [os.path.join(self.path, file) for batch in self._read_log()['batches'] if batch['sheet'] == sheet
+                 for file in batch['files']]
+        if not files:
+            return None
+        return pd.concat([pd.read_parquet(file) for file in files], ignore_index=True)
+
+    def partials(self, log=None):
+        # year_partials of every row ingested into the rollup sheets, for merge_partials with the workbook's
+        log = log or self._read_log()
+        return pd.read_parquet(os.path.join(self.path, log['partials'])) if log['partials'] else None
+
+    def normal_equations(self):
+        # Least-squares statistics of every ingested CSV row, for add_normal_equations with the base CSV's
+        log = self._read_log()
+        if not log['normal_equations']:
+            return None
+        with np.load(os.path.join(self.path, log['normal_equations'])) as stats:
+            return stats['xtx'], stats['xty'], stats['lows'], stats['highs'], int(stats['rows'])
+
+    def append(self, sheet, frame, source=None):
+        # One batch of new rows for sheet. Work and I/O depend on the batch only: the rows are written once, and
+        # the rollup partials and model statistics are updated by merging the batch's own into the stored ones
+        if not len(frame):
+            raise ValueError(f"No rows to ingest into {sheet}")
+        os.makedirs(self.path, exist_ok=True)
+        # One writer per store; readers never block because the log is replaced atomically. The lock file sits
+        # next to the store, not in it, so it stays the same file when the store is set aside for a new base
+        with exclusive_lock(f"{self.path}.lock"):
+            log = self._locked_log()
+            frame = self._conform(log, sheet, frame)
+            seq = log['seq'] + 1
+            partition = PARTITION_COLUMNS.get(sheet, 'Year')
+
+            files = []
+            for value, rows in frame.groupby(partition, sort=True):
+                file = os.path.join(_slug(sheet), f"{partition}={int(value)}", f"part-{seq:06d}.parquet")
+                os.makedirs(os.path.join(self.path, os.path.dirname(file)), exist_ok=True)
+                rows.to_parquet(os.path.join(self.path, file), index=False)
+                files.append(file)
+
+            previous = dict(log)
+            if sheet in ROLLUP_SHEETS:
+                self._update_partials(log, sheet, frame, seq)
+            if sheet == CSV_SHEET:
+                self._update_normal_equations(log, frame, seq)
+
+            # Each batch's digest covers its rows and every batch before it, on top of the base file's hash
+            digest = hashlib.sha256(f"{log.get('digest') or log['base']['sha256']}:{sheet}:".encode('utf-8'))
+            digest.update(pd.util.hash_pandas_object(frame, index=False).to_numpy().tobytes())
+            batch = {'seq': seq, 'sheet': sheet, 'rows': len(frame), 'files': files, 'source': source,
+                     'digest': digest.hexdigest()}
+            if partition == 'Year':
+                batch['years'] = [int(frame['Year'].min()), int(frame['Year'].max())]
+            log['batches'] = log['batches'] + [batch]
+            log['seq'] = seq
+            log['digest'] = batch['digest']
+            self._write_log(log)
+            for field in ('partials', 'normal_equations'):
+                if previous[field] and previous[field] != log[field]:
+                    os.remove(os.path.join(self.path, previous[field]))
+        return batch
+
+    def _locked_log(self):
+        # The current log, or a fresh one recording the base file's hash when the base has been replaced
+        log = _empty_log()
+        if os.path.exists(self._log_path()):
+            with open(self._log_path()) as f:
+                log = json.load(f)
+        if self._matches_base(log):
+            return log
+        if log['batches']:
+            # Rows ingested against an older base are kept, but set aside where they are no longer read
+            os.replace(self.path, f"{self.path}-{log['base']['sha256'][:12]}")
+            os.makedirs(self.path)
+        stat = os.stat(self.base_path)
+        log = _empty_log()
+        log['base'] = {'sha256': file_sha256(self.base_path), 'mtime_ns': stat.st_mtime_ns, 'size': stat.st_size}
+        return log
+
+    def _conform(self, log, sheet, frame):
+        # Batches must have the base sheet's columns, cast to its dtypes; the base columns are looked up once
+        if sheet == CSV_SHEET:
+            clean, rejected = validate_frame(frame)
+            if len(rejected):
+                raise SchemaError(f"{rejected['row'].nunique()} of {len(frame)} rows do not match the schema", rejected)
+            return clean
+        columns = log['columns'].get(sheet)
+        if columns is None:
+            base = load_workbook(self.base_path, self.cache_dir, sheets=[sheet])[sheet]
+            columns = {column: str(dtype) for column, dtype in base.dtypes.items()}
+            log['columns'] = {**log['columns'], sheet: columns}
+        missing = [column for column in columns if column not in frame.columns]
+        extra = [column for column in frame.columns if column not in columns]
+        if missing or extra:
+            raise ValueError(f"{sheet} rows must have the columns {', '.join(columns)}; "
+                             f"missing {missing or 'none'}, unexpected {extra or 'none'}")
+        frame = frame[list(columns)]
+        if frame['Year'].isna().any():
+            raise ValueError(f"{sheet} rows need a Year")
+        try:
+            return frame.astype(columns)
+        except (TypeError, ValueError) as error:
+            raise ValueError(f"{sheet} rows do not match the workbook's column types: {error}") from error
+
+    def _update_partials(self, log, sheet, frame, seq):
+        carry = log['carry']
+        if sheet == 'Tourist Expenditure' and carry is None:
+            # Expenditure rows are forward-filled across the sheet, so the first batch continues the workbook's
+            # last row
+            base = load_workbook(self.base_path, self.cache_dir, sheets=[sheet])[sheet]
+            _, carry = year_partials({sheet: base})
+        partials, carry = year_partials({sheet: frame}, carry if sheet == 'Tourist Expenditure' else None)
+        if sheet == 'Tourist Expenditure':
+            log['carry'] = {key: None if pd.isna(value) else float(value) for key, value in carry.items()}
+        stored = self.partials(log)
+        if stored is not None:
+            partials = merge_partials(stored, partials)
+        log['partials'] = f"partials-{seq:06d}.parquet"
+        partials.to_parquet(os.path.join(self.path, log['partials']))
+
+    def _update_normal_equations(self, log, frame, seq):
+        from src.model_training import add_normal_equations, normal_equations
+        from src.schema import FEATURES, TARGET
+
+        stats = normal_equations(frame[FEATURES], frame[TARGET])
+        if log['normal_equations']:
+            with np.load(os.path.join(self.path, log['normal_equations'])) as stored:
+                stats = add_normal_equations((stored['xtx'], stored['xty'], stored['lows'], stored['highs'],
+                                              int(stored['rows'])), stats)
+        xtx, xty, lows, highs, rows = stats
+        log['normal_equations'] = f"normal-equations-{seq:06d}.npz"
+        with open(os.path.join(self.path, log['normal_equations']), 'wb') as f:
+            np.savez(f, xtx=xtx, xty=xty, lows=lows, highs=highs, rows=rows)
+
+    def _write_log(self, log):
+        tmp_path = self._log_path() + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(log, f, indent=2)
+        os.replace(tmp_path, self._log_path())
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Append new rows to a workbook sheet or to the training CSV')
+    parser.add_argument('batch', help='CSV, Parquet or Excel file holding only the new rows')
+    parser.add_argument('--workbook', help='workbook the rows belong to, e.g. the one named by a country spec')
+    parser.add_argument('--sheet', help='sheet of the workbook the rows are appended to')
+    parser.add_argument('--csv', default='data/tourism_data.csv', help='training CSV the rows are appended to')
+    args = parser.parse_args()
+
+    if args.workbook:
+        if not args.sheet:
+            parser.error('--workbook needs --sheet')
+        store, sheet, rows = IngestStore(args.workbook), args.sheet, read_batch(args.batch, args.sheet)
+    else:
+        # Rows that fail the schema are dropped with a warning, as when loading the CSV itself
+        store, sheet, rows = IngestStore(args.csv), CSV_SHEET, load_data(args.batch)
+    batch = store.append(sheet, rows, source=os.path.basename(args.batch))
+    print(f"batch {batch['seq']}: {batch['rows']} rows into {sheet}, {len(batch['files'])} partition(s)")
@@ -0,0 +1,193 @@
+import os
+import threading
+import time
+from collections import defaultdict
+from contextlib import nullcontext
+
+from src.metrics import Histogram
+
+# Upper bounds, in seconds, of the per-stage histograms; a cold workbook parse takes seconds
+STAGE_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, float('inf'))
+
+# Setting WAVETOUR_INSTRUMENT=1 times every rerun; otherwise only reruns that ask for it are timed
+INSTRUMENT_ALL = os.environ.get('WAVETOUR_INSTRUMENT', '') not in ('', '0')
+# Prometheus text file, e.g. for node_exporter's textfile collector; rewritten at most every METRICS_WRITE_SECONDS
+METRICS_PATH = os.environ.get('WAVETOUR_METRICS_PATH')
+METRICS_WRITE_SECONDS = 10.0
+
+_NO_SPAN = nullcontext()
+_current = threading.local()
+
+
+class _Span:
+    __slots__ = ('rerun', 'stage', 'depth', 'start')
+
+    def __init__(self, rerun, stage):
+        self.rerun = rerun
+        self.stage = stage
+
+    def __enter__(self):
+        self.depth = self.rerun.depth
+        self.rerun.depth += 1
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.rerun.spans.append((self.stage, self.depth, self.start - self.rerun.start,
+                                 time.perf_counter() - self.start))
+        self.rerun.depth -= 1
+        return False
+
+
+class Rerun:
+    # Spans and payload bytes of one script run, each span as (stage, depth, offset, seconds). Spans nest, so a
+    # stage's time includes the stages inside it. kind is 'fragment' for a rerun of one st.fragment only
+
+    def __init__(self, kind='script'):
+        self.kind = kind
+        self.spans = []
+        self.payload = defaultdict(int)
+        self.depth = 0
+        self.start = time.perf_counter()
+        self.seconds = None
+
+    def span(self, stage):
+        return _Span(self, stage)
+
+    def stage_totals(self):
+        totals = defaultdict(float)
+        for stage, _, _, seconds in self.spans:
+            totals[stage] += seconds
+        return dict(totals)
+
+
+class Metrics:
+    # Process-wide histograms of rerun and stage times plus payload byte counters, shared by every session
+
+    def __init__(self, buckets=STAGE_BUCKETS):
+        self.buckets = buckets
+        self.reruns = Histogram(buckets)
+        self.fragment_reruns = Histogram(buckets)
+        self.stages = {}
+        self.payload = defaultdict(int)
+        self._lock = threading.Lock()
+        self._written = 0.0
+
+    def record(self, rerun):
+        with self._lock:
+            (self.fragment_reruns if rerun.kind == 'fragment' else self.reruns).observe(rerun.seconds)
+            for stage, seconds in rerun.stage_totals().items():
+                if stage not in self.stages:
+                    self.stages[stage] = Histogram(self.buckets)
+                self.stages[stage].observe(seconds)
+            for kind, size in rerun.payload.items():
+                self.payload[kind] += size
+
+    def prometheus(self):
+        with self._lock:
+            lines = [self.reruns.prometheus('wavetour_rerun_seconds'),
+                     self.fragment_reruns.prometheus('wavetour_fragment_rerun_seconds')]
+            for index, (stage, histogram) in enumerate(sorted(self.stages.items())):
+                lines.append(histogram.prometheus('wavetour_stage_seconds', {'stage': stage}, type_line=index == 0))
+            lines.append('# TYPE wavetour_payload_bytes_total counter')
+            lines.extend(f'wavetour_payload_bytes_total{{kind="{kind}"}} {size}'
+                         for kind, size in sorted(self.payload.items()))
+        return '\n'.join(lines) + '\n'
+
+    def write(self, path, min_interval=METRICS_WRITE_SECONDS):
+        # Atomic rewrite so a scraper never reads half a file; skipped when the last write is recent
+        now = time.monotonic()
+        if now - self._written < min_interval:
+            return
+        self._written = now
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            f.write(self.prometheus())
+        os.replace(tmp_path, path)
+
+
+metrics = Metrics()
+
+
+def span(stage):
+    # Times a block in the current rerun; a shared no-op context when this rerun is not instrumented
+    rerun = getattr(_current, 'rerun', None)
+    if rerun is None:
+        return _NO_SPAN
+    return rerun.span(stage)
+
+
+def add_payload(kind, size):
+    rerun = getattr(_current, 'rerun', None)
+    if rerun is not None:
+        rerun.payload[kind] += size
+
+
+def start_rerun(enabled=False, kind='script'):
+    # Streamlit runs each session's script on its own thread, so the rerun being timed is tracked per thread
+    if not (enabled or INSTRUMENT_ALL or METRICS_PATH):
+        _current.rerun = None
+        return None
+    _current.rerun = Rerun(kind)
+    return _current.rerun
+
+
+def start_fragment(enabled=False):
+    # A fragment rerun runs only the fragment's function, never the script's start_rerun and finish_rerun. So a
+    # fragment starts a rerun of its own when none is being timed on this thread; None when it is part of one
+    if getattr(_current, 'rerun', None) is not None:
+        return None
+    return start_rerun(enabled, kind='fragment')
+
+
+def finish_rerun():
+    rerun = getattr(_current, 'rerun', None)
+    if rerun is None:
+        return None
+    _current.rerun = None
+    rerun.seconds = time.perf_counter() - rerun.start
+    metrics.record(rerun)
+    if METRICS_PATH:
+        try:
+            metrics.write(METRICS_PATH)
+        except OSError:
+            pass
+    return rerun
+
+
+class Profiler:
+    # cProfile, or pyinstrument when asked for and installed, around one rerun
+
+    def __init__(self, kind='cprofile'):
+        self.kind = 'cprofile'
+        if kind == 'pyinstrument':
+            try:
+                from pyinstrument import Profiler as PyinstrumentProfiler
+            except ImportError:
+                pass
+            else:
+                self._profiler = PyinstrumentProfiler()
+                self.kind = 'pyinstrument'
+        if self.kind == 'cprofile':
+            import cProfile
+            self._profiler = cProfile.Profile()
+
+    def start(self):
+        if self.kind == 'pyinstrument':
+            self._profiler.start()
+        else:
+            self._profiler.enable()
+        return self
+
+    def stop(self, limit=40):
+        # Text report, slowest calls first
+        if self.kind == 'pyinstrument':
+            self._profiler.stop()
+            return self._profiler.output_text()
+        import io
+        import pstats
+
+        self._profiler.disable()
+        out = io.StringIO()
+        pstats.Stats(self._profiler, stream=out).sort_stats('cumulative').print_stats(limit)
+        return out.getvalue()
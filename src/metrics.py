@@ -0,0 +1,59 @@
+# Upper bounds, in seconds, of the latency histogram buckets
+LATENCY_BUCKETS = (0.0005, 0.001, 0.002, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, float('inf'))
+
+
+class Histogram:
+    # Fixed-bucket histogram; scale and unit only affect how snapshot() reports values
+
+    def __init__(self, buckets=LATENCY_BUCKETS, scale=1000.0, unit='ms'):
+        self.buckets = buckets
+        self.scale = scale
+        self.unit = unit
+        self.counts = [0] * len(buckets)
+        self.count = 0
+        self.total = 0.0
+
+    def observe(self, value):
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+        self.count += 1
+        self.total += value
+
+    def quantile(self, q):
+        # Upper bound of the bucket holding the q-th observation
+        if not self.count:
+            return 0.0
+        target = q * self.count
+        seen = 0
+        for bound, count in zip(self.buckets, self.counts):
+            seen += count
+            if seen >= target:
+                return bound
+        return self.buckets[-1]
+
+    def snapshot(self):
+        unit = self.unit
+        return {
+            'count': self.count,
+            f'mean_{unit}': self.total / self.count * self.scale if self.count else 0.0,
+            f'p50_{unit}': self.quantile(0.5) * self.scale,
+            f'p99_{unit}': self.quantile(0.99) * self.scale,
+            f'buckets_{unit}': {('+Inf' if bound == float('inf') else f"{bound * self.scale:g}"): count
+                                for bound, count in zip(self.buckets, self.counts)},
+        }
+
+    def prometheus(self, name, labels=None, type_line=True):
+        # labels, e.g. {'stage': 'load'}, tell apart several histograms exported under one metric name
+        prefix = ''.join(f'{key}="{value}",' for key, value in (labels or {}).items())
+        suffix = f"{{{prefix[:-1]}}}" if prefix else ''
+        lines = [f"# TYPE {name} histogram"] if type_line else []
+        cumulative = 0
+        for bound, count in zip(self.buckets, self.counts):
+            cumulative += count
+            label = '+Inf' if bound == float('inf') else f"{bound:g}"
+            lines.append(f'{name}_bucket{{{prefix}le="{label}"}} {cumulative}')
+        lines.append(f"{name}_sum{suffix} {self.total}")
+        lines.append(f"{name}_count{suffix} {self.count}")
+        return '\n'.join(lines)
@@ -0,0 +1,71 @@
+import os
+import threading
+from collections import OrderedDict
+
+from src.file_utils import file_sha256
+
+DEFAULT_MODEL_PATH = os.path.join('models', 'tourism_model.pkl')
+DEFAULT_LINEAR_MODEL_PATH = os.path.join('models', 'tourism_model.json')
+DEFAULT_LOOKUP_TABLE_PATH = os.path.join('models', 'tourism_lookup.npz')
+
+
+class _Entry:
+    __slots__ = ('model', 'sha256', 'mtime_ns', 'size')
+
+    def __init__(self, model, sha256, stat):
+        self.model = model
+        self.sha256 = sha256
+        self.mtime_ns = stat.st_mtime_ns
+        self.size = stat.st_size
+
+
+class ModelRegistry:
+    # Keeps deserialized models per process, evicting the least recently used beyond max_models
+
+    def __init__(self, max_models=4):
+        self.max_models = max_models
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, path=DEFAULT_MODEL_PATH, mmap_mode=None, loader=None):
+        # loader(path) replaces joblib for artifacts that are not pickles
+        key = (os.path.abspath(path), mmap_mode, loader)
+        stat = os.stat(path)
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.mtime_ns == stat.st_mtime_ns and entry.size == stat.st_size:
+                self._entries.move_to_end(key)
+                return entry.model
+
+        # The artifact is new or was touched; only reload when its contents actually changed
+        sha256 = file_sha256(path)
+        if entry is not None and entry.sha256 == sha256:
+            model = entry.model
+        elif loader is not None:
+            model = loader(path)
+        else:
+            import joblib
+            model = joblib.load(path, mmap_mode=mmap_mode)
+
+        with self._lock:
+            self._entries[key] = _Entry(model, sha256, stat)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_models:
+                self._entries.popitem(last=False)
+        return model
+
+    def version(self, path=DEFAULT_MODEL_PATH, mmap_mode=None, loader=None):
+        entry = self._entries.get((os.path.abspath(path), mmap_mode, loader))
+        return entry.sha256 if entry is not None else None
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+registry = ModelRegistry()
+
+
+def get_model(path=DEFAULT_MODEL_PATH, mmap_mode=None, loader=None):
+    return registry.get(path, mmap_mode=mmap_mode, loader=loader)
@@ -4,20 +4,300 @@ import os
 # Add the parent directory of the current file to the sys.path
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
+import argparse
+import json
+import tempfile
+import time
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
 import pandas as pd
-from sklearn.model_selection import train_test_split
-from sklearn.linear_model import LinearRegression
+from sklearn.base import BaseEstimator, RegressorMixin
+from sklearn.ensemble import GradientBoostingRegressor
+from sklearn.metrics import mean_absolute_error, mean_squared_error, r2_score
+from sklearn.model_selection import KFold
+from sklearn.linear_model import LinearRegression, Ridge
 import joblib
-from src.data_preprocessing import load_data
+from src.data_preprocessing import FEATURES, TARGET, WORKBOOK_CACHE_DIR, iter_validated_chunks, load_data
+from src.file_utils import file_sha256
+from src.predictions import LookupTable
+
+# Rows per chunk when training in streaming mode
+DEFAULT_TRAINING_CHUNKSIZE = 250_000
+
+
+def export_linear_model(model, path='models/tourism_model.json'):
+    # Coefficients, intercept and feature order are all a linear model needs at inference time
+    artifact = {
+        'model': type(model).__name__,
+        'features': list(FEATURES),
+        'coefficients': [float(value) for value in model.coef_],
+        'intercept': float(model.intercept_),
+    }
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump(artifact, f, indent=2)
+    os.replace(tmp_path, path)
+
+
+def normal_equations(X, y):
+    # Sufficient statistics for least squares of one block of rows: [1, X]^T [1, X] and [1, X]^T y, plus
+    # per-feature ranges and the row count. The statistics of two blocks combine with add_normal_equations
+    X = np.asarray(X, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    n_features = X.shape[1]
+    xtx = np.empty((n_features + 1, n_features + 1))
+    # The intercept column is implicit: its products are just row counts and column sums
+    column_sums = X.sum(axis=0)
+    xtx[0, 0] = len(X)
+    xtx[0, 1:] = column_sums
+    xtx[1:, 0] = column_sums
+    xtx[1:, 1:] = X.T @ X
+    xty = np.concatenate([[y.sum()], X.T @ y])
+    return xtx, xty, X.min(axis=0, initial=np.inf), X.max(axis=0, initial=-np.inf), len(X)
+
+
+def add_normal_equations(total, part):
+    xtx, xty, lows, highs, rows = total
+    part_xtx, part_xty, part_lows, part_highs, part_rows = part
+    return xtx + part_xtx, xty + part_xty, np.minimum(lows, part_lows), np.maximum(highs, part_highs), rows + part_rows
+
+
+def empty_normal_equations(n_features=len(FEATURES)):
+    return (np.zeros((n_features + 1, n_features + 1)), np.zeros(n_features + 1), np.full(n_features, np.inf),
+            np.full(n_features, -np.inf), 0)
+
+
+def accumulate_normal_equations(file_path, chunksize=DEFAULT_TRAINING_CHUNKSIZE):
+    # normal_equations over every row of a CSV, one chunk in memory at a time
+    total = empty_normal_equations()
+    rejected = 0
+
+    # Same row-level checks as load_data, applied per chunk so bad rows never reach the statistics.
+    # The C parser keeps a flat footprint here; pyarrow's streaming reader grows with the file
+    for chunk, _, raw_rows in iter_validated_chunks(file_path, chunk_rows=chunksize, engine='c'):
+        rejected += raw_rows - len(chunk)
+        if len(chunk):
+            total = add_normal_equations(total, normal_equations(chunk[FEATURES], chunk[TARGET]))
+
+    if rejected:
+        warnings.warn(f"{file_path}: rejected {rejected} rows that do not match the schema", stacklevel=2)
+    return total
 
-def train_model():
-    data = load_data('data/tourism_data.csv')
-    X = data[['month', 'temperature', 'local_events', 'holiday_season']]
-    y = data['predicted_visitors']
 
-    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
+def cached_normal_equations(file_path, cache_dir=WORKBOOK_CACHE_DIR, chunksize=DEFAULT_TRAINING_CHUNKSIZE):
+    # accumulate_normal_equations of a CSV, stored next to the workbook caches and reused while the file's
+    # size and mtime are unchanged
+    stat = os.stat(file_path)
+    name = os.path.splitext(os.path.basename(file_path))[0]
+    path = os.path.join(cache_dir, f"{name}-normal-equations.npz")
+    try:
+        with np.load(path) as cached:
+            if cached['size'] == stat.st_size and cached['mtime_ns'] == stat.st_mtime_ns:
+                return (cached['xtx'], cached['xty'], cached['lows'], cached['highs'], int(cached['rows']))
+    except (OSError, ValueError, KeyError):
+        pass
 
+    xtx, xty, lows, highs, rows = accumulate_normal_equations(file_path, chunksize)
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        with open(path + '.tmp', 'wb') as f:
+            np.savez(f, xtx=xtx, xty=xty, lows=lows, highs=highs, rows=rows, size=stat.st_size,
+                     mtime_ns=stat.st_mtime_ns)
+        os.replace(path + '.tmp', path)
+    except OSError:
+        pass
+    return xtx, xty, lows, highs, rows
+
+
+def solve_normal_equations(xtx, xty):
+    solution = np.linalg.lstsq(xtx, xty, rcond=None)[0]
+
+    # Populate a regular LinearRegression so every downstream artifact and loader keeps working
     model = LinearRegression()
-    model.fit(X_train, y_train)
+    model.coef_ = solution[1:]
+    model.intercept_ = solution[0]
+    model.n_features_in_ = len(FEATURES)
+    model.feature_names_in_ = np.array(FEATURES, dtype=object)
+    return model
+
+
+def fit_streaming(file_path='data/tourism_data.csv', chunksize=DEFAULT_TRAINING_CHUNKSIZE):
+    # Ordinary least squares over a CSV of any size; peak memory depends on chunksize only
+    xtx, xty, lows, highs, rows = accumulate_normal_equations(file_path, chunksize)
+    if rows == 0:
+        raise ValueError(f"No rows to train on in {file_path}")
+    return solve_normal_equations(xtx, xty), lows, highs
+
+
+def fit_incremental(file_path='data/tourism_data.csv', chunksize=DEFAULT_TRAINING_CHUNKSIZE):
+    # fit_streaming over the CSV plus every batch ingested into it since, without reading either again: the
+    # CSV's statistics are cached and each ingested batch added its own to the ingest store
+    from src.ingestion import IngestStore
+
+    stats = cached_normal_equations(file_path, chunksize=chunksize)
+    ingested = IngestStore(file_path).normal_equations()
+    if ingested is not None:
+        stats = add_normal_equations(stats, ingested)
+    xtx, xty, lows, highs, rows = stats
+    if rows == 0:
+        raise ValueError(f"No rows to train on in {file_path}")
+    return solve_normal_equations(xtx, xty), lows, highs
+
+
+def save_model(model, lows, highs, build_lookup_table=True):
+    os.makedirs('models', exist_ok=True)
+    # The registry reloads the pickle when its mtime changes, so a serving process must never see it half-written
+    tmp_path = 'models/tourism_model.pkl.tmp'
+    joblib.dump(model, tmp_path)
+    os.replace(tmp_path, 'models/tourism_model.pkl')
+    if hasattr(model, 'coef_'):
+        export_linear_model(model)
+    elif os.path.exists('models/tourism_model.json'):
+        # A non-linear winner must not leave the previous closed-form export behind
+        os.remove('models/tourism_model.json')
+
+    # Features are small integers, so every prediction in the training range can be precomputed
+    if build_lookup_table:
+        table = LookupTable.build(model, lows, highs, file_sha256('models/tourism_model.pkl'))
+        table.save('models/tourism_lookup.npz')
+
+
+def train_model(build_lookup_table=True, streaming=False, chunksize=DEFAULT_TRAINING_CHUNKSIZE, incremental=False):
+    if incremental:
+        model, lows, highs = fit_incremental('data/tourism_data.csv', chunksize)
+    elif streaming:
+        model, lows, highs = fit_streaming('data/tourism_data.csv', chunksize)
+    else:
+        # Every path fits every row, so the streaming and incremental fits give the same coefficients as this one.
+        # The held-out split this used to set aside was never scored; the sweep cross-validates instead
+        data = load_data('data/tourism_data.csv')
+        X = data[FEATURES]
+        y = data[TARGET]
+
+        model = LinearRegression()
+        model.fit(X, y)
+        lows, highs = X.min().to_numpy(), X.max().to_numpy()
+
+    save_model(model, lows, highs, build_lookup_table)
+
+
+class PerMonthRegressor(RegressorMixin, BaseEstimator):
+    # One linear model per month on the remaining features, with a global fit for unseen months
+
+    def fit(self, X, y):
+        X, y = np.asarray(X, dtype=np.float64), np.asarray(y, dtype=np.float64)
+        month = X[:, 0]
+        self.global_model_ = LinearRegression().fit(X, y)
+        self.models_ = {
+            int(value): LinearRegression().fit(X[month == value, 1:], y[month == value])
+            for value in np.unique(month)
+        }
+        self.n_features_in_ = X.shape[1]
+        return self
+
+    def predict(self, X):
+        X = np.asarray(X, dtype=np.float64)
+        month = X[:, 0]
+        out = self.global_model_.predict(X)
+        for value, model in self.models_.items():
+            rows = month == value
+            if rows.any():
+                out[rows] = model.predict(X[rows, 1:])
+        return out
+
+
+# Candidate factories are looked up by name inside the workers, so only the name crosses the process boundary
+CANDIDATES = {
+    'linear': lambda: LinearRegression(),
+    'ridge': lambda: Ridge(alpha=1.0),
+    'gradient_boosting': lambda: GradientBoostingRegressor(random_state=42),
+    'per_month_linear': lambda: PerMonthRegressor(),
+}
+
+_shared = {}
+
+
+def _attach_training_matrix(X_path, y_path):
+    # Workers map the matrix read-only instead of receiving a pickled copy per task
+    _shared['X'] = np.load(X_path, mmap_mode='r')
+    _shared['y'] = np.load(y_path, mmap_mode='r')
+
+
+def _evaluate_fold(candidate, fold, n_splits, seed):
+    X, y = _shared['X'], _shared['y']
+    train_index, test_index = list(KFold(n_splits, shuffle=True, random_state=seed).split(X))[fold]
+
+    model = CANDIDATES[candidate]()
+    start = time.perf_counter()
+    model.fit(X[train_index], y[train_index])
+    fit_seconds = time.perf_counter() - start
+    predicted = model.predict(X[test_index])
+
+    return {
+        'candidate': candidate,
+        'fold': fold,
+        'rmse': float(np.sqrt(mean_squared_error(y[test_index], predicted))),
+        'mae': float(mean_absolute_error(y[test_index], predicted)),
+        'r2': float(r2_score(y[test_index], predicted)),
+        'fit_seconds': fit_seconds,
+    }
+
+
+def cross_validate_candidates(X, y, candidates=None, n_splits=5, max_workers=None, seed=42):
+    # Fan every (candidate, fold) pair out across a process pool and return one row per pair
+    candidates = list(candidates or CANDIDATES)
+    with tempfile.TemporaryDirectory(prefix='wavetour-sweep-') as tmp:
+        X_path, y_path = os.path.join(tmp, 'X.npy'), os.path.join(tmp, 'y.npy')
+        np.save(X_path, np.ascontiguousarray(X, dtype=np.float64))
+        np.save(y_path, np.ascontiguousarray(y, dtype=np.float64))
+
+        with ProcessPoolExecutor(max_workers=max_workers, initializer=_attach_training_matrix,
+                                 initargs=(X_path, y_path)) as pool:
+            futures = [pool.submit(_evaluate_fold, candidate, fold, n_splits, seed)
+                       for candidate in candidates for fold in range(n_splits)]
+            results = [future.result() for future in futures]
+
+    return pd.DataFrame(results)
+
+
+def leaderboard(results):
+    board = results.groupby('candidate').agg(
+        rmse=('rmse', 'mean'),
+        rmse_std=('rmse', 'std'),
+        mae=('mae', 'mean'),
+        r2=('r2', 'mean'),
+        fit_seconds=('fit_seconds', 'mean'),
+    )
+    return board.sort_values('rmse').reset_index()
+
+
+def train_sweep(candidates=None, n_splits=5, max_workers=None, build_lookup_table=True):
+    # Cross-validate every candidate, write models/leaderboard.csv and promote the lowest-RMSE model
+    data = load_data('data/tourism_data.csv')
+    X = data[FEATURES]
+    y = data[TARGET]
+
+    board = leaderboard(cross_validate_candidates(X.to_numpy(), y.to_numpy(), candidates, n_splits, max_workers))
+    os.makedirs('models', exist_ok=True)
+    board.to_csv('models/leaderboard.csv', index=False)
+
+    winner = board['candidate'].iloc[0]
+    model = CANDIDATES[winner]().fit(X, y)
+    save_model(model, X.min().to_numpy(), X.max().to_numpy(), build_lookup_table)
+    return board
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Train the WaveTour visitor model')
+    parser.add_argument('--sweep', action='store_true', help='cross-validate all candidates and promote the best')
+    parser.add_argument('--streaming', action='store_true', help='fit the same linear model chunk by chunk')
+    parser.add_argument('--incremental', action='store_true',
+                        help='fit the linear model from cached statistics plus the ingested batches')
+    parser.add_argument('--workers', type=int, default=None)
+    args = parser.parse_args()
 
-    joblib.dump(model, 'models/tourism_model.pkl')
+    if args.sweep:
+        print(train_sweep(max_workers=args.workers).to_string(index=False))
+    else:
+        train_model(streaming=args.streaming, incremental=args.incremental)
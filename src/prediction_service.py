@@ -0,0 +1,267 @@
+import sys
+import os
+
+# Add the parent directory of the current file to the sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import argparse
+import asyncio
+import json
+import time
+
+import numpy as np
+
+from src.metrics import Histogram
+from src.model_registry import DEFAULT_MODEL_PATH, registry
+from src.predictions import TablePredictor, load_default_model, predict_batch
+from src.schema import FEATURES
+
+BATCH_SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128, 256, 512, 1024, float('inf'))
+
+MAX_BODY_BYTES = 1 << 20
+
+REASONS = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed', 413: 'Payload Too Large',
+           500: 'Internal Server Error'}
+
+
+class MicroBatcher:
+    # Collects rows from concurrent requests for up to max_wait seconds and scores them in one call
+
+    def __init__(self, max_batch=512, max_wait=0.002):
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self.batch_sizes = Histogram(BATCH_SIZE_BUCKETS, scale=1, unit='rows')
+        self._queue = asyncio.Queue()
+        self._worker = None
+
+    def start(self):
+        self._worker = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+
+    async def predict(self, rows):
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((rows, future))
+        return await future
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            pending = [await self._queue.get()]
+            size = len(pending[0][0])
+            deadline = loop.time() + self.max_wait
+            while size < self.max_batch:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(self._queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                pending.append(item)
+                size += len(item[0])
+            self._score(pending, size)
+
+    def _score(self, pending, size):
+        self.batch_sizes.observe(size)
+        try:
+            predictions = predict_batch(np.concatenate([rows for rows, _ in pending]), model=load_default_model())
+        except Exception as error:
+            if len(pending) == 1:
+                _set_exception(pending[0][1], error)
+                return
+            # Score each request on its own so only the one that caused the error fails
+            for rows, future in pending:
+                try:
+                    _set_result(future, predict_batch(rows, model=load_default_model()))
+                except Exception as error:
+                    _set_exception(future, error)
+            return
+
+        start = 0
+        for rows, future in pending:
+            _set_result(future, predictions[start:start + len(rows)])
+            start += len(rows)
+
+
+def _set_result(future, predictions):
+    if not future.done():
+        future.set_result(predictions.tolist())
+
+
+def _set_exception(future, error):
+    if not future.done():
+        future.set_exception(error)
+
+
+def parse_instances(payload):
+    # Accepts {"instances": [...]} or a single instance; an instance is a feature list or a feature object
+    single = not (isinstance(payload, dict) and 'instances' in payload)
+    instances = [payload] if single else payload['instances']
+    if not isinstance(instances, list) or not instances:
+        raise ValueError("'instances' must be a non-empty list")
+
+    rows = np.empty((len(instances), len(FEATURES)))
+    for i, instance in enumerate(instances):
+        if isinstance(instance, dict):
+            missing = [name for name in FEATURES if name not in instance]
+            if missing:
+                raise ValueError(f"instance {i} is missing {', '.join(missing)}")
+            instance = [instance[name] for name in FEATURES]
+        if not isinstance(instance, list) or len(instance) != len(FEATURES):
+            raise ValueError(f"instance {i} must have {len(FEATURES)} values ({', '.join(FEATURES)})")
+        if not all(isinstance(value, (int, float)) and not isinstance(value, bool) for value in instance):
+            raise ValueError(f"instance {i} must be numeric")
+        try:
+            rows[i] = instance
+        except OverflowError:
+            # An integer too large for a float, e.g. 400 digits
+            raise ValueError(f"instance {i} has a value out of range") from None
+    # JSON parsers accept NaN and Infinity, which the model would turn into a failed batch
+    finite = np.isfinite(rows).all(axis=1)
+    if not finite.all():
+        raise ValueError(f"instance {int(np.argmin(finite))} must have finite values")
+    return rows, single
+
+
+class PredictionService:
+    def __init__(self, max_batch=512, max_wait=0.002):
+        self.batcher = MicroBatcher(max_batch, max_wait)
+        self.latency = Histogram()
+        self.started = time.time()
+
+    async def handle_predict(self, body):
+        try:
+            rows, single = parse_instances(json.loads(body))
+        except ValueError as error:
+            return 400, {'error': str(error)}
+        predictions = await self.batcher.predict(rows)
+        return 200, {'predicted_visitors': predictions[0]} if single else {'predictions': predictions}
+
+    @staticmethod
+    def lookup_table():
+        # The table in front of the served model, or None when there is none. Its counts start over when a
+        # retrained model brings a new table
+        model = load_default_model()
+        return model.table if isinstance(model, TablePredictor) else None
+
+    def health(self):
+        table = self.lookup_table()
+        return 200, {
+            'status': 'ok',
+            'uptime_seconds': round(time.time() - self.started, 3),
+            'model_sha256': registry.version(DEFAULT_MODEL_PATH),
+            'latency': self.latency.snapshot(),
+            'batch_size': self.batcher.batch_sizes.snapshot(),
+            'lookup_table': None if table is None else {
+                'hits': table.hits, 'lookups': table.lookups, 'hit_rate': round(table.hit_rate, 4)},
+        }
+
+    def metrics(self):
+        lines = [
+            self.latency.prometheus('wavetour_predict_latency_seconds'),
+            self.batcher.batch_sizes.prometheus('wavetour_predict_batch_rows'),
+        ]
+        table = self.lookup_table()
+        if table is not None:
+            lines += [
+                '# TYPE wavetour_lookup_table_hits_total counter',
+                f"wavetour_lookup_table_hits_total {table.hits}",
+                '# TYPE wavetour_lookup_table_lookups_total counter',
+                f"wavetour_lookup_table_lookups_total {table.lookups}",
+                '# TYPE wavetour_lookup_table_hit_rate gauge',
+                f"wavetour_lookup_table_hit_rate {table.hit_rate:g}",
+            ]
+        return '\n'.join(lines) + '\n'
+
+    async def dispatch(self, method, path, body):
+        if path == '/predict':
+            if method != 'POST':
+                return 405, {'error': 'use POST'}
+            start = time.perf_counter()
+            status, payload = await self.handle_predict(body)
+            self.latency.observe(time.perf_counter() - start)
+            return status, payload
+        if path == '/health' and method == 'GET':
+            return self.health()
+        if path == '/metrics' and method == 'GET':
+            return 200, self.metrics()
+        return 404, {'error': f"no route for {method} {path}"}
+
+    async def handle_connection(self, reader, writer):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                method, path, version = request_line.decode('latin-1').split()
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b'\r\n', b'\n', b''):
+                        break
+                    name, _, value = line.decode('latin-1').partition(':')
+                    headers[name.strip().lower()] = value.strip()
+
+                length = int(headers.get('content-length', 0))
+                if length > MAX_BODY_BYTES:
+                    status, payload = 413, {'error': 'request body too large'}
+                else:
+                    body = await reader.readexactly(length) if length else b''
+                    try:
+                        status, payload = await self.dispatch(method, path.split('?', 1)[0], body)
+                    except Exception as error:
+                        status, payload = 500, {'error': str(error)}
+
+                keep_alive = headers.get('connection', '').lower() != 'close' and version == 'HTTP/1.1'
+                self._respond(writer, status, payload, keep_alive)
+                await writer.drain()
+                if not keep_alive or status == 413:
+                    break
+        except (ValueError, asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    @staticmethod
+    def _respond(writer, status, payload, keep_alive):
+        if isinstance(payload, str):
+            body, content_type = payload.encode(), 'text/plain; version=0.0.4'
+        else:
+            body, content_type = json.dumps(payload).encode(), 'application/json'
+        writer.write(
+            f"HTTP/1.1 {status} {REASONS[status]}\r\n"
+            f"Content-Type: {content_type}\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode() + body
+        )
+
+
+async def serve(host='0.0.0.0', port=8000, max_batch=512, max_wait=0.002):
+    service = PredictionService(max_batch, max_wait)
+    # Load the model and warm the scoring path before accepting traffic so the first request does not pay for it
+    predict_batch(np.zeros((1, len(FEATURES))), model=load_default_model())
+    service.batcher.start()
+    server = await asyncio.start_server(service.handle_connection, host, port, backlog=1024)
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        await service.batcher.stop()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='WaveTour prediction API')
+    parser.add_argument('--host', default='0.0.0.0')
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--max-batch', type=int, default=512, help='rows scored per model call at most')
+    parser.add_argument('--max-wait-ms', type=float, default=2.0, help='how long a batch may wait to fill up')
+    args = parser.parse_args()
+
+    asyncio.run(serve(args.host, args.port, args.max_batch, args.max_wait_ms / 1000))
@@ -1,11 +1,211 @@
-import joblib
+import json
+import os
+
 import numpy as np
 
-def load_model():
-    model = joblib.load('models/tourism_model.pkl')
+from src.schema import FEATURES
+from src.model_registry import (DEFAULT_LINEAR_MODEL_PATH, DEFAULT_LOOKUP_TABLE_PATH, DEFAULT_MODEL_PATH, get_model,
+                                registry)
+
+# Rows scored per model.predict call; bounds the working set of predict_batch
+DEFAULT_CHUNK_SIZE = 65_536
+
+
+def load_model(path=DEFAULT_MODEL_PATH, mmap_mode=None):
+    # Served from the in-process registry; the artifact is only read again when it changes on disk
+    model = get_model(path, mmap_mode=mmap_mode)
     return model
 
-def make_prediction(input_data):
+
+class LinearPredictor:
+    # Pure NumPy stand-in for the exported LinearRegression, so inference does not import scikit-learn
+
+    def __init__(self, features, coefficients, intercept):
+        self.features = list(features)
+        self.coef_ = np.asarray(coefficients, dtype=np.float64)
+        self.intercept_ = float(intercept)
+
+    @classmethod
+    def load(cls, path=DEFAULT_LINEAR_MODEL_PATH):
+        with open(path) as f:
+            artifact = json.load(f)
+        return cls(artifact['features'], artifact['coefficients'], artifact['intercept'])
+
+    def predict(self, X):
+        if hasattr(X, 'columns'):
+            X = X[self.features].to_numpy(dtype=np.float64)
+        return np.asarray(X, dtype=np.float64) @ self.coef_ + self.intercept_
+
+
+def load_linear_model(path=DEFAULT_LINEAR_MODEL_PATH):
+    return get_model(path, loader=LinearPredictor.load)
+
+
+class LookupTable:
+    # Dense table of model outputs over every integer feature combination seen in training
+
+    def __init__(self, values, offsets, features, model_sha256):
+        self.values = np.ascontiguousarray(values, dtype=np.float64)
+        self.offsets = np.asarray(offsets, dtype=np.float64)
+        self.features = list(features)
+        self.model_sha256 = model_sha256
+        self._shape = np.asarray(self.values.shape)
+        self._strides = np.cumprod((self.values.shape[1:] + (1,))[::-1])[::-1]
+        self._flat = self.values.reshape(-1)
+        self._axes = list(zip(self.offsets.tolist(), self.values.shape, self._strides.tolist()))
+        self.hits = 0
+        self.lookups = 0
+
+    @classmethod
+    def build(cls, model, lows, highs, model_sha256):
+        import pandas as pd
+
+        lows, highs = np.asarray(lows, dtype=np.int64), np.asarray(highs, dtype=np.int64)
+        axes = [np.arange(low, high + 1) for low, high in zip(lows, highs)]
+        grid = np.stack(np.meshgrid(*axes, indexing='ij'), axis=-1).reshape(-1, len(axes))
+        values = model.predict(pd.DataFrame(grid, columns=FEATURES)).reshape([len(axis) for axis in axes])
+        return cls(values, lows, FEATURES, model_sha256)
+
+    @classmethod
+    def load(cls, path=DEFAULT_LOOKUP_TABLE_PATH):
+        with np.load(path, allow_pickle=False) as artifact:
+            return cls(artifact['values'], artifact['offsets'], artifact['features'].tolist(),
+                       str(artifact['model_sha256']))
+
+    def save(self, path=DEFAULT_LOOKUP_TABLE_PATH):
+        tmp_path = path + '.tmp.npz'
+        np.savez(tmp_path, values=self.values, offsets=self.offsets, features=np.array(self.features),
+                 model_sha256=np.array(self.model_sha256))
+        os.replace(tmp_path, path)
+
+    @property
+    def hit_rate(self):
+        return self.hits / self.lookups if self.lookups else 0.0
+
+    def reset_stats(self):
+        self.hits = 0
+        self.lookups = 0
+
+    def lookup(self, row):
+        # Scalar fast path for make_prediction; returns None when the row is off the grid or has the wrong
+        # number of features, so the model gets to reject it
+        self.lookups += 1
+        if len(row) != len(self._axes):
+            return None
+        flat = 0
+        for value, (offset, size, stride) in zip(row, self._axes):
+            cell = value - offset
+            if cell != int(cell) or not 0 <= cell < size:
+                return None
+            flat += int(cell) * stride
+        self.hits += 1
+        return self._flat[flat]
+
+    def predict(self, X, fallback):
+        # One gather for rows on the integer grid; everything else goes to the fallback model
+        if hasattr(X, 'columns'):
+            matrix = X[self.features].to_numpy(dtype=np.float64)
+        else:
+            matrix = np.asarray(X, dtype=np.float64)
+        if matrix.ndim != 2 or matrix.shape[1] != len(self.offsets):
+            # Not rows of this table's features: the fallback model raises its own error
+            self.lookups += len(matrix)
+            return fallback.predict(X)
+        index = matrix - self.offsets
+        cells = index.astype(np.int64)
+        hit = ((cells == index) & (cells >= 0) & (cells < self._shape)).all(axis=1)
+
+        out = np.empty(len(matrix))
+        out[hit] = self._flat[cells[hit] @ self._strides]
+        misses = ~hit
+        if misses.any():
+            out[misses] = fallback.predict(X[misses] if hasattr(X, 'columns') else matrix[misses])
+
+        self.hits += int(hit.sum())
+        self.lookups += len(matrix)
+        return out
+
+
+class TablePredictor:
+    __slots__ = ('table', 'model')
+
+    def __init__(self, table, model):
+        self.table = table
+        self.model = model
+
+    def predict(self, X):
+        return self.table.predict(X, self.model)
+
+
+def load_lookup_table(path=DEFAULT_LOOKUP_TABLE_PATH):
+    return get_model(path, loader=LookupTable.load)
+
+
+def load_default_model():
+    # The sklearn model, fronted by its lookup table when train_model built one for this exact artifact
     model = load_model()
+    if os.path.exists(DEFAULT_LOOKUP_TABLE_PATH):
+        table = load_lookup_table()
+        if table.model_sha256 == registry.version(DEFAULT_MODEL_PATH):
+            return TablePredictor(table, model)
+    return model
+
+
+def make_prediction(input_data, model=None):
+    if model is None:
+        model = load_default_model()
+    if isinstance(model, TablePredictor):
+        prediction = model.table.lookup(input_data)
+        if prediction is not None:
+            return prediction
+        model = model.model
     prediction = model.predict(np.array(input_data).reshape(1, -1))
     return prediction[0]
+
+
+def _feature_frame(data):
+    # Validate the schema once for a whole frame or array and return it with columns in model order
+    import pandas as pd
+
+    if isinstance(data, pd.DataFrame):
+        missing = [column for column in FEATURES if column not in data.columns]
+        if missing:
+            raise ValueError(f"Missing feature columns: {', '.join(missing)}")
+        frame = data[FEATURES]
+        non_numeric = [column for column, dtype in frame.dtypes.items() if not pd.api.types.is_numeric_dtype(dtype)]
+        if non_numeric:
+            raise ValueError(f"Feature columns must be numeric: {', '.join(non_numeric)}")
+        return frame
+
+    matrix = np.asarray(data)
+    if matrix.ndim != 2 or matrix.shape[1] != len(FEATURES):
+        raise ValueError(f"Expected a 2-D array with {len(FEATURES)} columns ({', '.join(FEATURES)}), "
+                         f"got shape {matrix.shape}")
+    if not np.issubdtype(matrix.dtype, np.number):
+        raise ValueError(f"Feature array must be numeric, got dtype {matrix.dtype}")
+    return pd.DataFrame(matrix, columns=FEATURES, copy=False)
+
+
+def _score(model, frame, chunk_size, out):
+    for start in range(0, len(frame), chunk_size):
+        stop = min(start + chunk_size, len(frame))
+        out[start:stop] = model.predict(frame.iloc[start:stop])
+    return out
+
+
+def predict_batch(data, chunk_size=DEFAULT_CHUNK_SIZE, model=None):
+    # Score a DataFrame, a 2-D array or an iterable of either, one vectorized predict call per chunk
+    import pandas as pd
+
+    if model is None:
+        model = load_default_model()
+
+    if isinstance(data, (pd.DataFrame, np.ndarray)):
+        frame = _feature_frame(data)
+        return _score(model, frame, chunk_size, np.empty(len(frame)))
+
+    results = []
+    for chunk in data:
+        frame = _feature_frame(chunk)
+        results.append(_score(model, frame, chunk_size, np.empty(len(frame))))
+    return np.concatenate(results) if results else np.empty(0)
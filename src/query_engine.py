@@ -0,0 +1,318 @@
+import sys
+import os
+
+# Add the parent directory of the current file to the sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import argparse
+
+import pandas as pd
+
+from src.data_preprocessing import WORKBOOK_CACHE_DIR, iter_validated_chunks
+from src.ingestion import CSV_SHEET, INGEST_DIR, IngestStore
+from src.schema import FEATURES, TARGET
+from src.shared_cache import open_sqlite
+
+TOURISM_CSV = os.path.join('data', 'tourism_data.csv')
+QUERY_DB = os.path.join(WORKBOOK_CACHE_DIR, 'query.sqlite')
+# Rows of the training CSV inserted per statement while loading
+INSERT_BATCH_ROWS = 50_000
+
+FACT_DIMENSIONS = ('country', 'year', 'category')
+ROW_DIMENSIONS = tuple(FEATURES)
+AGGREGATES = {'sum': 'SUM', 'mean': 'AVG', 'min': 'MIN', 'max': 'MAX', 'count': 'COUNT'}
+
+SCHEMA = [
+    # Which version of each table is loaded, and what its categories are called, e.g. 'Country of Origin'
+    'CREATE TABLE IF NOT EXISTS sources (country TEXT NOT NULL, dataset TEXT NOT NULL, version TEXT NOT NULL, '
+    'category_label TEXT NOT NULL, PRIMARY KEY (country, dataset))',
+    # Every workbook sheet in long form: one row per Year and category. A wide sheet's columns become its
+    # categories; a sheet keyed by a text column, such as Visitor Arrivals, takes its categories from that column
+    'CREATE TABLE IF NOT EXISTS facts (country TEXT NOT NULL, dataset TEXT NOT NULL, year INTEGER NOT NULL, '
+    'category TEXT NOT NULL, value REAL NOT NULL)',
+    'CREATE INDEX IF NOT EXISTS facts_by_year ON facts (country, dataset, year, category)',
+    'CREATE INDEX IF NOT EXISTS facts_by_category ON facts (country, dataset, category, year)',
+    # The training CSV plus the rows ingested into it
+    'CREATE TABLE IF NOT EXISTS tourism_rows (month INTEGER NOT NULL, temperature INTEGER NOT NULL, '
+    'local_events INTEGER NOT NULL, holiday_season INTEGER NOT NULL, predicted_visitors INTEGER NOT NULL)',
+    'CREATE INDEX IF NOT EXISTS tourism_rows_by_month ON tourism_rows (month, holiday_season)',
+    'CREATE INDEX IF NOT EXISTS tourism_rows_by_temperature ON tourism_rows (temperature)',
+]
+
+
+def _names(values, field):
+    if isinstance(values, str):
+        values = (values,)
+    values = tuple(values or ())
+    if not all(isinstance(value, str) for value in values):
+        raise ValueError(f"{field} must be strings, got {values!r}")
+    return values
+
+
+def _range(bounds, field):
+    # None, or an inclusive (first, last) pair of integers
+    if bounds is None:
+        return None
+    first, last = (int(bound) for bound in bounds)
+    if first > last:
+        raise ValueError(f"{field} range {first}-{last} is empty")
+    return first, last
+
+
+def _grouping(group_by, aggregate, dimensions):
+    group_by = _names(group_by, 'group_by')
+    unknown = [column for column in group_by if column not in dimensions]
+    if unknown:
+        raise ValueError(f"Cannot group by {', '.join(unknown)}, expected some of: {', '.join(dimensions)}")
+    if aggregate is not None and aggregate not in AGGREGATES:
+        raise ValueError(f"Unsupported aggregate {aggregate!r}, expected one of: {', '.join(AGGREGATES)}")
+    if group_by and aggregate is None:
+        raise ValueError('group_by needs an aggregate')
+    return group_by, aggregate
+
+
+def _limit(limit):
+    if limit is not None and int(limit) < 1:
+        raise ValueError(f"limit must be positive, got {limit}")
+    return None if limit is None else int(limit)
+
+
+class FactQuery:
+    # A slice of one workbook dataset. Empty filters match everything. Without an aggregate the matching
+    # (country, year, category, value) rows are returned; with one, a row per group_by combination
+    __slots__ = ('dataset', 'countries', 'years', 'categories', 'group_by', 'aggregate', 'limit')
+
+    def __init__(self, dataset, countries=(), years=None, categories=(), group_by=(), aggregate=None, limit=None):
+        self.dataset = _names(dataset, 'dataset')[0]
+        self.countries = _names(countries, 'countries')
+        self.years = _range(years, 'years')
+        self.categories = _names(categories, 'categories')
+        self.group_by, self.aggregate = _grouping(group_by, aggregate, FACT_DIMENSIONS)
+        self.limit = _limit(limit)
+
+
+class RowQuery:
+    # A slice of the training rows, filtered on the model's features. The aggregate applies to predicted_visitors
+    __slots__ = ('months', 'holiday_season', 'temperature', 'local_events', 'group_by', 'aggregate', 'limit')
+
+    def __init__(self, months=(), holiday_season=None, temperature=None, local_events=None, group_by=(),
+                 aggregate=None, limit=None):
+        self.months = tuple(int(month) for month in months)
+        self.holiday_season = None if holiday_season is None else bool(holiday_season)
+        self.temperature = _range(temperature, 'temperature')
+        self.local_events = _range(local_events, 'local_events')
+        self.group_by, self.aggregate = _grouping(group_by, aggregate, ROW_DIMENSIONS)
+        self.limit = _limit(limit)
+
+
+def _in(column, values, where, params):
+    if values:
+        where.append(f"{column} IN ({', '.join('?' * len(values))})")
+        params.extend(values)
+
+
+def _between(column, bounds, where, params):
+    if bounds is not None:
+        where.append(f"{column} BETWEEN ? AND ?")
+        params.extend(bounds)
+
+
+def _select(table, dimensions, measure, order, query, where, params):
+    # The filters and the aggregation run inside SQLite, so only the rows of the answer reach pandas. Unaggregated
+    # rows come in the given order
+    if query.aggregate:
+        selected = [*query.group_by, f"{AGGREGATES[query.aggregate]}({measure}) AS {measure}"]
+        order = query.group_by
+    else:
+        selected = [*dimensions, measure]
+    sql = f"SELECT {', '.join(selected)} FROM {table}"
+    if where:
+        sql += f" WHERE {' AND '.join(where)}"
+    if query.aggregate and query.group_by:
+        sql += f" GROUP BY {', '.join(query.group_by)}"
+    if order:
+        sql += f" ORDER BY {', '.join(order)}"
+    if query.limit is not None:
+        sql += ' LIMIT ?'
+        params.append(query.limit)
+    return sql, params
+
+
+def fact_sql(query):
+    where, params = ['dataset = ?'], [query.dataset]
+    _in('country', query.countries, where, params)
+    _between('year', query.years, where, params)
+    _in('category', query.categories, where, params)
+    # facts_by_year serves this order without sorting
+    return _select('facts', FACT_DIMENSIONS, 'value', FACT_DIMENSIONS, query, where, params)
+
+
+def row_sql(query):
+    where, params = [], []
+    _in('month', query.months, where, params)
+    if query.holiday_season is not None:
+        where.append('holiday_season = ?')
+        params.append(int(query.holiday_season))
+    _between('temperature', query.temperature, where, params)
+    _between('local_events', query.local_events, where, params)
+    # Unaggregated rows in file order
+    return _select('tourism_rows', ROW_DIMENSIONS, TARGET, (), query, where, params)
+
+
+def long_form(frame):
+    # (category label, [(year, category, value), ...]) of a sheet; missing values are left out
+    text = [column for column in frame.columns if column != 'Year' and not pd.api.types.is_numeric_dtype(frame[column])]
+    numbers = [column for column in frame.columns if column != 'Year' and column not in text]
+    if len(text) == 1 and len(numbers) == 1:
+        label, values = text[0], frame[['Year', text[0], numbers[0]]]
+    else:
+        label = 'Category'
+        values = frame.melt(id_vars='Year', value_vars=numbers, var_name='category')[['Year', 'category', 'value']]
+    values = values.dropna()
+    return label, list(zip(values.iloc[:, 0].astype(int).tolist(), values.iloc[:, 1].astype(str).tolist(),
+                           values.iloc[:, 2].astype(float).tolist()))
+
+
+class QueryEngine:
+    # Embedded SQLite copy of the workbook sheets and the training CSV for ad-hoc filters. Each table is loaded
+    # once per version, like the DatasetStore tables it is copied from, and kept in a file under data/.cache so a
+    # restart only checks versions. Reads never wait on a load: the file is in WAL mode
+
+    def __init__(self, path=QUERY_DB):
+        self.path = path
+        self._connection = open_sqlite(path, SCHEMA)
+
+    def _version(self, country, dataset):
+        row = self._connection().execute('SELECT version FROM sources WHERE country = ? AND dataset = ?',
+                                         (country, dataset)).fetchone()
+        return row[0] if row else None
+
+    def _replace(self, country, dataset, version, load):
+        # Swap in a table's rows unless this version is loaded already; load() inserts them inside the transaction
+        connection = self._connection()
+        connection.execute('BEGIN IMMEDIATE')
+        try:
+            # Another thread or process may have loaded it while this one waited for the write lock
+            if self._version(country, dataset) == version:
+                connection.execute('ROLLBACK')
+                return False
+            label = load(connection)
+            connection.execute('INSERT OR REPLACE INTO sources VALUES (?, ?, ?, ?)', (country, dataset, version, label))
+            connection.execute('COMMIT')
+        except BaseException:
+            connection.execute('ROLLBACK')
+            raise
+        return True
+
+    def sync_store(self, country, store, datasets, version=None):
+        # Load the datasets of a country's DatasetStore whose table version changed; returns those reloaded
+        reloaded = []
+        for dataset in datasets:
+            table_version = store.table_version(dataset, version)
+            if self._version(country, dataset) == table_version:
+                continue
+
+            def load(connection, dataset=dataset):
+                label, rows = long_form(store.table(dataset, version))
+                connection.execute('DELETE FROM facts WHERE country = ? AND dataset = ?', (country, dataset))
+                connection.executemany('INSERT INTO facts VALUES (?, ?, ?, ?, ?)',
+                                       [(country, dataset, *row) for row in rows])
+                return label
+
+            if self._replace(country, dataset, table_version, load):
+                reloaded.append(dataset)
+        return reloaded
+
+    def sync_csv(self, csv_path=TOURISM_CSV, ingest_dir=INGEST_DIR):
+        # Stream the training CSV and its ingested rows in when either changed; True when they were reloaded
+        stat, ingest = os.stat(csv_path), IngestStore(csv_path, ingest_dir)
+        version = f"{os.path.abspath(csv_path)}:{stat.st_mtime_ns}:{stat.st_size}+{ingest.version()}"
+        if self._version('', CSV_SHEET) == version:
+            return False
+        columns = list(ROW_DIMENSIONS) + [TARGET]
+        insert = f"INSERT INTO tourism_rows VALUES ({', '.join('?' * len(columns))})"
+
+        def load(connection):
+            connection.execute('DELETE FROM tourism_rows')
+            # Rows failing the schema are left out, as when training
+            for clean, _, _ in iter_validated_chunks(csv_path, chunk_rows=INSERT_BATCH_ROWS):
+                connection.executemany(insert, clean[columns].astype('int64').itertuples(index=False, name=None))
+            ingested = ingest.read_sheet(CSV_SHEET)
+            if ingested is not None:
+                connection.executemany(insert, ingested[columns].astype('int64').itertuples(index=False, name=None))
+            return 'month'
+
+        return self._replace('', CSV_SHEET, version, load)
+
+    def _frame(self, sql, params):
+        cursor = self._connection().execute(sql, params)
+        return pd.DataFrame(cursor.fetchall(), columns=[column[0] for column in cursor.description])
+
+    def facts(self, query):
+        return self._frame(*fact_sql(query))
+
+    def rows(self, query):
+        return self._frame(*row_sql(query))
+
+    def plan(self, query):
+        # SQLite's plan for a query, e.g. to check that it searches an index instead of scanning the table
+        sql, params = fact_sql(query) if isinstance(query, FactQuery) else row_sql(query)
+        return [row[-1] for row in self._connection().execute(f"EXPLAIN QUERY PLAN {sql}", params)]
+
+    def categories(self, country, dataset):
+        return [row[0] for row in self._connection().execute(
+            'SELECT DISTINCT category FROM facts WHERE country = ? AND dataset = ? ORDER BY category',
+            (country, dataset))]
+
+    def years(self, country, dataset):
+        # (first, last) of a loaded dataset, or None when it has no rows
+        first, last = self._connection().execute('SELECT MIN(year), MAX(year) FROM facts WHERE country = ? AND '
+                                                 'dataset = ?', (country, dataset)).fetchone()
+        return None if first is None else (first, last)
+
+    def category_label(self, country, dataset):
+        row = self._connection().execute('SELECT category_label FROM sources WHERE country = ? AND dataset = ?',
+                                          (country, dataset)).fetchone()
+        return row[0] if row else 'Category'
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Filter and aggregate the tourism datasets')
+    parser.add_argument('--db', default=QUERY_DB)
+    shared = argparse.ArgumentParser(add_help=False)
+    shared.add_argument('--aggregate', choices=list(AGGREGATES))
+    shared.add_argument('--limit', type=int)
+    commands = parser.add_subparsers(dest='command', required=True)
+    facts = commands.add_parser('facts', parents=[shared], help='a workbook dataset of a country')
+    facts.add_argument('dataset', help='sheet name, e.g. "Purpose of Visit"')
+    facts.add_argument('--country', action='append', default=[], help='country spec to read (all loaded by default)')
+    facts.add_argument('--years', type=int, nargs=2, metavar=('FIRST', 'LAST'))
+    facts.add_argument('--category', action='append', default=[])
+    facts.add_argument('--group-by', action='append', default=[], choices=FACT_DIMENSIONS)
+    rows = commands.add_parser('rows', parents=[shared], help='the training rows of data/tourism_data.csv')
+    rows.add_argument('--csv', default=TOURISM_CSV)
+    rows.add_argument('--month', action='append', default=[], type=int)
+    rows.add_argument('--holiday-season', type=int, choices=[0, 1])
+    rows.add_argument('--temperature', type=int, nargs=2, metavar=('LOW', 'HIGH'))
+    rows.add_argument('--local-events', type=int, nargs=2, metavar=('LOW', 'HIGH'))
+    rows.add_argument('--group-by', action='append', default=[], choices=ROW_DIMENSIONS)
+    args = parser.parse_args()
+
+    engine = QueryEngine(args.db)
+    try:
+        if args.command == 'facts':
+            from src.datasets import DatasetRegistry
+            from src.views import load_country_specs
+
+            registry = DatasetRegistry(load_country_specs())
+            for country in args.country or registry.countries():
+                engine.sync_store(country, registry.store(country), [args.dataset])
+            result = engine.facts(FactQuery(args.dataset, args.country, args.years, args.category, args.group_by,
+                                            args.aggregate, args.limit))
+        else:
+            engine.sync_csv(args.csv)
+            result = engine.rows(RowQuery(args.month, args.holiday_season, args.temperature, args.local_events,
+                                          args.group_by, args.aggregate, args.limit))
+    except (KeyError, ValueError) as error:
+        parser.error(str(error))
+    print(result.to_string(index=False))
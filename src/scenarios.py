@@ -0,0 +1,138 @@
+import sys
+import os
+
+# Add the parent directory of the current file to the sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from src.predictions import load_default_model, predict_batch
+from src.schema import FEATURES, TOURISM_SCHEMA
+
+# Months flagged as holiday season throughout data/tourism_data.csv
+HOLIDAY_MONTHS = (4, 5, 11, 12)
+DEFAULT_QUANTILES = (0.05, 0.25, 0.5, 0.75, 0.95)
+# Feature rows materialised at once per worker; 1M rows of 4 float64 features is 32 MB
+SCENARIO_CHUNK_ROWS = 1_000_000
+
+TEMPERATURE = FEATURES.index('temperature')
+LOCAL_EVENTS = FEATURES.index('local_events')
+HOLIDAY_SEASON = FEATURES.index('holiday_season')
+
+_worker = {}
+
+
+def scenario_grid(months=range(1, 13), temperatures=(31,), local_events=(2,), holiday_months=HOLIDAY_MONTHS):
+    # Every month x temperature x local_events combination, in FEATURES order, with holiday_season set by month
+    axes = np.meshgrid(np.asarray(months), np.asarray(temperatures), np.asarray(local_events), indexing='ij')
+    month, temperature, events = (axis.ravel() for axis in axes)
+    return np.column_stack([month, temperature, events, np.isin(month, holiday_months)]).astype(np.float64)
+
+
+def apply_shifts(grid, temperature_shift=0.0, holiday_events=0, event_shift=0):
+    # Deterministic what-ifs: a temperature change everywhere, extra local events everywhere or in holiday months
+    shifted = grid.copy()
+    shifted[:, TEMPERATURE] += temperature_shift
+    shifted[:, LOCAL_EVENTS] += event_shift + holiday_events * shifted[:, HOLIDAY_SEASON]
+    return _clip(shifted)
+
+
+def _clip(matrix):
+    # Keep perturbed rows integral and inside the ranges the schema accepts
+    np.rint(matrix, out=matrix)
+    for column in (TEMPERATURE, LOCAL_EVENTS):
+        spec = TOURISM_SCHEMA[FEATURES[column]]
+        np.clip(matrix[..., column], spec['min'], spec['max'], out=matrix[..., column])
+    return matrix
+
+
+def _attach_model(model):
+    _worker['model'] = load_default_model() if model is None else model
+
+
+def _simulate_points(task):
+    # All draws for a block of grid points, scored a chunk of rows at a time; only per-point aggregates leave
+    points, draws, temperature_sd, events_sd, quantiles, chunk_rows, seed = task
+    model = _worker.get('model') or load_default_model()
+    rng = np.random.default_rng(seed)
+    per_chunk = max(1, chunk_rows // len(points))
+    outcomes = np.empty((len(points), draws))
+
+    for start in range(0, draws, per_chunk):
+        stop = min(start + per_chunk, draws)
+        matrix = np.repeat(points[:, np.newaxis, :], stop - start, axis=1)
+        if temperature_sd:
+            matrix[..., TEMPERATURE] += rng.normal(0.0, temperature_sd, matrix.shape[:2])
+        if events_sd:
+            matrix[..., LOCAL_EVENTS] += rng.normal(0.0, events_sd, matrix.shape[:2])
+        matrix = _clip(matrix).reshape(-1, len(FEATURES))
+        outcomes[:, start:stop] = predict_batch(matrix, chunk_size=len(matrix), model=model).reshape(len(points), -1)
+
+    return outcomes.mean(axis=1), np.quantile(outcomes, quantiles, axis=1).T
+
+
+def simulate(grid, draws=1000, temperature_sd=0.0, events_sd=0.0, quantiles=DEFAULT_QUANTILES,
+             chunk_rows=SCENARIO_CHUNK_ROWS, workers=None, model=None, seed=0):
+    # Monte Carlo over a scenario grid: each row is perturbed draws times (normal noise on temperature and
+    # local_events, rounded and clipped to the schema) and scored. Returns one row per grid point with the
+    # mean and quantiles of the predicted visitors, never the len(grid) * draws raw predictions
+    grid = np.asarray(grid, dtype=np.float64)
+    if temperature_sd == 0 and events_sd == 0:
+        draws = 1
+
+    # Blocks of whole grid points, sized so a worker holds about chunk_rows outcomes; seeding per block keeps
+    # results independent of the worker count
+    points_per_task = max(1, min(len(grid), chunk_rows // draws))
+    tasks = [(grid[start:start + points_per_task], draws, temperature_sd, events_sd, tuple(quantiles), chunk_rows,
+              (seed, start)) for start in range(0, len(grid), points_per_task)]
+
+    workers = os.cpu_count() if workers is None else workers
+    if workers > 1 and len(tasks) > 1:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_attach_model, initargs=(model,)) as pool:
+            results = list(pool.map(_simulate_points, tasks))
+    else:
+        _attach_model(model)
+        try:
+            results = [_simulate_points(task) for task in tasks]
+        finally:
+            _worker.clear()
+
+    summary = pd.DataFrame(grid, columns=FEATURES).astype({column: TOURISM_SCHEMA[column]['dtype']
+                                                           for column in FEATURES})
+    summary['mean'] = np.concatenate([mean for mean, _ in results])
+    stacked = np.concatenate([values for _, values in results])
+    for index, q in enumerate(quantiles):
+        summary[f"p{q * 100:g}"] = stacked[:, index]
+    summary.attrs['evaluations'] = len(grid) * draws
+    return summary
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Distribution of predicted visitors under a what-if scenario')
+    parser.add_argument('--temperatures', type=int, nargs='*', default=list(range(20, 41)))
+    parser.add_argument('--events', type=int, nargs='*', default=list(range(0, 6)))
+    parser.add_argument('--temperature-shift', type=float, default=0.0, help='degrees added to every row')
+    parser.add_argument('--holiday-events', type=int, default=0, help='local events added in holiday months')
+    parser.add_argument('--temperature-sd', type=float, default=1.5)
+    parser.add_argument('--events-sd', type=float, default=1.0)
+    parser.add_argument('--draws', type=int, default=10_000)
+    parser.add_argument('--workers', type=int, default=None)
+    args = parser.parse_args()
+
+    base = scenario_grid(temperatures=args.temperatures, local_events=args.events)
+    scenario = apply_shifts(base, args.temperature_shift, args.holiday_events)
+    summary = simulate(scenario, draws=args.draws, temperature_sd=args.temperature_sd, events_sd=args.events_sd,
+                       workers=args.workers)
+    baseline = simulate(base, draws=args.draws, temperature_sd=args.temperature_sd, events_sd=args.events_sd,
+                        workers=args.workers)
+
+    # Monthly view: the scenario's quantiles averaged over the grid cells of each month, next to the baseline
+    by_month = summary.groupby('month')[['mean', 'p5', 'p50', 'p95']].mean()
+    by_month.insert(1, 'baseline mean', baseline.groupby('month')['mean'].mean())
+    with pd.option_context('display.float_format', '{:,.1f}'.format):
+        print(by_month)
+    print(f"{summary.attrs['evaluations'] + baseline.attrs['evaluations']:,} scenario evaluations")
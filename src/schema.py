@@ -0,0 +1,12 @@
+# Column layout of data/tourism_data.csv, kept free of heavy imports so light workers can use it
+FEATURES = ['month', 'temperature', 'local_events', 'holiday_season']
+TARGET = 'predicted_visitors'
+
+# Smallest dtype that holds each column, plus the values a row may take before it is rejected
+TOURISM_SCHEMA = {
+    'month': {'dtype': 'int8', 'min': 1, 'max': 12},
+    'temperature': {'dtype': 'int8', 'min': -60, 'max': 60},
+    'local_events': {'dtype': 'int8', 'min': 0, 'max': 100},
+    'holiday_season': {'dtype': 'bool'},
+    'predicted_visitors': {'dtype': 'int32', 'min': 0},
+}
@@ -0,0 +1,299 @@
+import abc
+import hashlib
+import io
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from urllib.parse import urlparse
+
+# Cache tier shared by every replica of the app: sqlite:///path/cache.sqlite on a volume all replicas mount, or
+# redis://host:6379/0. Unset, each replica only has its own caches
+CACHE_URL = os.environ.get('WAVETOUR_CACHE_URL', '')
+# Keys are content hashes and never go stale, so the TTL only bounds how long unused entries are kept
+DEFAULT_TTL_SECONDS = float(os.environ.get('WAVETOUR_CACHE_TTL', 7 * 24 * 3600))
+# Size bound of the SQLite backend; a Redis server evicts by its own maxmemory policy
+DEFAULT_MAX_BYTES = int(os.environ.get('WAVETOUR_CACHE_MAX_BYTES', 1 << 30))
+# How long a replica may hold the lock on a missing entry before the others assume it died and compute it
+LOCK_TIMEOUT_SECONDS = 120.0
+LOCK_POLL_SECONDS = 0.05
+SETUP_ATTEMPTS = 100
+# Granularity of the SQLite backend's last-read times, which order its evictions
+ACCESS_RESOLUTION_SECONDS = 60.0
+
+SQLITE_SCHEMA = [
+    'CREATE TABLE IF NOT EXISTS entries (key TEXT PRIMARY KEY, value BLOB NOT NULL, size INTEGER NOT NULL, '
+    'expires REAL NOT NULL, accessed REAL NOT NULL)',
+    'CREATE INDEX IF NOT EXISTS entries_accessed ON entries (accessed)',
+    'CREATE TABLE IF NOT EXISTS locks (key TEXT PRIMARY KEY, owner TEXT NOT NULL, expires REAL NOT NULL)',
+]
+
+
+def content_key(namespace, *parts):
+    # Key of a value determined by parts, e.g. a workbook's SHA-256 and a sheet name
+    digest = hashlib.sha256(repr(parts).encode('utf-8')).hexdigest()
+    return f"{namespace}/{digest}"
+
+
+def parquet_bytes(frame, index=None):
+    buffer = io.BytesIO()
+    frame.to_parquet(buffer, index=index)
+    return buffer.getvalue()
+
+
+def read_parquet_bytes(data):
+    import pandas as pd
+
+    return pd.read_parquet(io.BytesIO(data))
+
+
+def open_sqlite(path, schema=()):
+    # A function returning the calling thread's connection to the SQLite file at path, which is set up in WAL mode
+    # so readers never wait on a writer, with the schema statements applied
+    local = threading.local()
+
+    def connection():
+        # sqlite3 connections must stay on the thread that opened them
+        current = getattr(local, 'connection', None)
+        if current is None:
+            current = sqlite3.connect(path, timeout=30, isolation_level=None)
+            local.connection = current
+        return current
+
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    # Processes starting together race to create the file, and switching it to WAL mode can fail with "database is
+    # locked" without waiting on the busy timeout, so setting up is retried
+    for attempt in range(SETUP_ATTEMPTS):
+        try:
+            current = connection()
+            current.execute('PRAGMA journal_mode=WAL')
+            for statement in schema:
+                current.execute(statement)
+            return connection
+        except sqlite3.OperationalError:
+            if attempt == SETUP_ATTEMPTS - 1:
+                raise
+            time.sleep(LOCK_POLL_SECONDS)
+
+
+class CacheBackend(abc.ABC):
+    # Bytes by key, with a lock per key so that of all replicas missing an entry only one computes it.
+    # Subclasses implement get, set, acquire and release
+    # False when nothing is shared, so callers can skip serialising values no other replica will read
+    shared = True
+
+    def __init__(self, ttl=DEFAULT_TTL_SECONDS, lock_timeout=LOCK_TIMEOUT_SECONDS):
+        self.ttl = ttl
+        self.lock_timeout = lock_timeout
+        self.owner = uuid.uuid4().hex
+        # Threads of this replica missing the same key queue here instead of polling the backend
+        self._stripes = [threading.Lock() for _ in range(64)]
+        self.hits = 0
+        self.misses = 0
+        self.computed = 0
+
+    @abc.abstractmethod
+    def get(self, key):
+        pass
+
+    @abc.abstractmethod
+    def set(self, key, value, ttl=None):
+        pass
+
+    @abc.abstractmethod
+    def acquire(self, key):
+        # True when this replica now holds the key's lock; a lock older than lock_timeout is taken over
+        pass
+
+    @abc.abstractmethod
+    def release(self, key):
+        pass
+
+    def get_or_compute(self, key, compute, ttl=None):
+        # The value for key, computed by compute() and stored when missing. While one replica computes it, the
+        # others wait for its result; after lock_timeout they compute it themselves
+        value = self.get(key)
+        if value is not None:
+            self.hits += 1
+            return value
+        with self._stripes[hash(key) % len(self._stripes)]:
+            value = self.get(key)
+            if value is not None:
+                self.hits += 1
+                return value
+            self.misses += 1
+            deadline = time.monotonic() + self.lock_timeout
+            locked = self.acquire(key)
+            while not locked and time.monotonic() < deadline:
+                time.sleep(LOCK_POLL_SECONDS)
+                value = self.get(key)
+                if value is not None:
+                    self.hits += 1
+                    return value
+                locked = self.acquire(key)
+            try:
+                # Stored by another replica between the last lookup and taking the lock
+                value = self.get(key)
+                if value is None:
+                    value = compute()
+                    self.computed += 1
+                    self.set(key, value, ttl)
+            finally:
+                if locked:
+                    self.release(key)
+        return value
+
+
+class NullBackend(CacheBackend):
+    # No shared tier: every lookup misses and every replica computes for itself
+    shared = False
+
+    def get(self, key):
+        return None
+
+    def set(self, key, value, ttl=None):
+        pass
+
+    def acquire(self, key):
+        return True
+
+    def release(self, key):
+        pass
+
+    def get_or_compute(self, key, compute, ttl=None):
+        self.computed += 1
+        return compute()
+
+
+class SQLiteBackend(CacheBackend):
+    # One SQLite file, in WAL mode so readers never wait on a writer. Entries past their TTL are dropped and the
+    # least recently read ones are evicted once the values exceed max_bytes. Put the file on a local or block
+    # volume; SQLite's locking is unreliable on network filesystems such as NFS
+
+    def __init__(self, path, max_bytes=DEFAULT_MAX_BYTES, ttl=DEFAULT_TTL_SECONDS, lock_timeout=LOCK_TIMEOUT_SECONDS):
+        super().__init__(ttl, lock_timeout)
+        self.path = path
+        self.max_bytes = max_bytes
+        self._connection = open_sqlite(path, SQLITE_SCHEMA)
+
+    def get(self, key):
+        now = time.time()
+        connection = self._connection()
+        row = connection.execute('SELECT value, accessed FROM entries WHERE key = ? AND expires > ?',
+                                 (key, now)).fetchone()
+        if row is None:
+            return None
+        if now - row[1] > ACCESS_RESOLUTION_SECONDS:
+            # Reads are only written back once a minute, so hot entries do not serialise readers on the write lock
+            connection.execute('UPDATE entries SET accessed = ? WHERE key = ?', (now, key))
+        return bytes(row[0])
+
+    def set(self, key, value, ttl=None):
+        now = time.time()
+        ttl = self.ttl if ttl is None else ttl
+        connection = self._connection()
+        connection.execute('BEGIN IMMEDIATE')
+        try:
+            connection.execute('INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?)',
+                               (key, sqlite3.Binary(value), len(value), now + ttl, now))
+            connection.execute('DELETE FROM entries WHERE expires <= ?', (now,))
+            total = connection.execute('SELECT COALESCE(SUM(size), 0) FROM entries').fetchone()[0]
+            if total > self.max_bytes:
+                # Oldest reads first, never the entry just written
+                for old_key, size in connection.execute('SELECT key, size FROM entries WHERE key != ? '
+                                                        'ORDER BY accessed', (key,)).fetchall():
+                    connection.execute('DELETE FROM entries WHERE key = ?', (old_key,))
+                    total -= size
+                    if total <= self.max_bytes:
+                        break
+            connection.execute('COMMIT')
+        except BaseException:
+            connection.execute('ROLLBACK')
+            raise
+
+    def acquire(self, key):
+        now = time.time()
+        connection = self._connection()
+        connection.execute('BEGIN IMMEDIATE')
+        try:
+            connection.execute('DELETE FROM locks WHERE key = ? AND expires <= ?', (key, now))
+            inserted = connection.execute('INSERT OR IGNORE INTO locks VALUES (?, ?, ?)',
+                                          (key, self.owner, now + self.lock_timeout)).rowcount
+            connection.execute('COMMIT')
+        except BaseException:
+            connection.execute('ROLLBACK')
+            raise
+        return inserted == 1
+
+    def release(self, key):
+        self._connection().execute('DELETE FROM locks WHERE key = ? AND owner = ?', (key, self.owner))
+
+    def size_bytes(self):
+        return self._connection().execute('SELECT COALESCE(SUM(size), 0) FROM entries').fetchone()[0]
+
+
+class RedisBackend(CacheBackend):
+    # Any client with redis-py's get, set(nx=, ex=) and delete, e.g. fakeredis as a local stand-in. Size-based
+    # eviction is the server's: run it with maxmemory and maxmemory-policy allkeys-lru
+
+    def __init__(self, url=None, client=None, prefix='wavetour:', ttl=DEFAULT_TTL_SECONDS,
+                 lock_timeout=LOCK_TIMEOUT_SECONDS):
+        super().__init__(ttl, lock_timeout)
+        if client is None:
+            # redis is only needed by deployments that share the cache through a Redis server
+            import redis
+            client = redis.Redis.from_url(url)
+        self.client = client
+        self.prefix = prefix
+
+    def get(self, key):
+        return self.client.get(self.prefix + key)
+
+    def set(self, key, value, ttl=None):
+        self.client.set(self.prefix + key, value, ex=max(1, int(self.ttl if ttl is None else ttl)))
+
+    def acquire(self, key):
+        # SET NX with an expiry: the lock frees itself if its holder dies
+        return bool(self.client.set(f"{self.prefix}lock:{key}", self.owner, nx=True,
+                                    ex=max(1, int(self.lock_timeout))))
+
+    def release(self, key):
+        lock = f"{self.prefix}lock:{key}"
+        owner = self.client.get(lock)
+        if owner is not None and (owner.decode() if isinstance(owner, bytes) else owner) == self.owner:
+            self.client.delete(lock)
+
+
+def _sqlite(url):
+    # sqlite:///relative/path or sqlite:////absolute/path, as in SQLAlchemy URLs
+    return SQLiteBackend(url[len('sqlite:///'):])
+
+
+BACKENDS = {
+    '': lambda url: NullBackend(),
+    'none': lambda url: NullBackend(),
+    'sqlite': _sqlite,
+    'redis': lambda url: RedisBackend(url),
+    'rediss': lambda url: RedisBackend(url),
+}
+
+
+def open_backend(url):
+    scheme = urlparse(url).scheme if url else ''
+    if scheme not in BACKENDS:
+        raise ValueError(f"Unsupported cache URL {url!r}, expected one of: {', '.join(sorted(filter(None, BACKENDS)))}")
+    return BACKENDS[scheme](url)
+
+
+_backend = None
+_backend_lock = threading.Lock()
+
+
+def shared_backend():
+    # The process-wide backend for CACHE_URL, opened on first use
+    global _backend
+    with _backend_lock:
+        if _backend is None:
+            _backend = open_backend(CACHE_URL)
+        return _backend
@@ -0,0 +1,262 @@
+import json
+import os
+from functools import wraps
+
+import pandas as pd
+import streamlit as st
+
+from src.backtesting import accuracy_percent
+from src.data_preprocessing import shared_view
+from src.figures import build_figure, cached_figure
+from src.image_assets import image_bytes
+from src.instrumentation import add_payload, finish_rerun, metrics, span, start_fragment
+from src.query_engine import FactQuery
+
+SPECS_DIR = os.path.join('data', 'specs')
+SPEC_EXTENSIONS = ('.json', '.yaml', '.yml')
+# How often a page waiting on a forecast checks whether its fit has finished
+FORECAST_POLL_SECONDS = 1
+# Rows a query block shows before asking for narrower filters
+QUERY_ROW_LIMIT = 1000
+# Datasets with more categories than this, such as Visitor Arrivals' countries of origin, start with none chosen
+QUERY_DEFAULT_CATEGORIES = 20
+# Each way of summarising a query block's rows: (group_by, aggregate), or None for the rows themselves
+QUERY_SUMMARIES = {
+    'Rows': None,
+    'Sum by year': (('year',), 'sum'),
+    'Sum by category': (('category',), 'sum'),
+    'Mean by category': (('category',), 'mean'),
+}
+
+
+def _fragment(stage):
+    # st.fragment whose own reruns are timed too: it opens a rerun when no script rerun is being timed, records it
+    # on return and, with the performance panel on, shows it in place of the panel the script drew last
+    def decorate(func):
+        @wraps(func)
+        def run(*args, **kwargs):
+            rerun = start_fragment(st.session_state.get('perf_panel', False))
+            with span(stage):
+                func(*args, **kwargs)
+            if rerun is not None:
+                rerun = finish_rerun()
+                if st.session_state.get('perf_panel'):
+                    performance_panel(rerun, metrics)
+        return st.fragment(run)
+    return decorate
+
+
+def load_spec(path):
+    with open(path, encoding='utf-8') as f:
+        if path.endswith(('.yaml', '.yml')):
+            # PyYAML is only needed by deployments that write their specs in YAML
+            import yaml
+            return yaml.safe_load(f)
+        return json.load(f)
+
+
+def load_country_specs(specs_dir=SPECS_DIR):
+    # {country: spec} for every spec file; a country is added by dropping a file here
+    specs = {}
+    for entry in sorted(os.listdir(specs_dir)):
+        if entry.endswith(SPEC_EXTENSIONS):
+            spec = load_spec(os.path.join(specs_dir, entry))
+            specs[spec['country']] = spec
+    return specs
+
+
+class _Page:
+    __slots__ = ('spec', 'view', 'store', 'version', 'theme', 'forecasts', 'queries')
+
+    def __init__(self, spec, view, store, version, theme, forecasts, queries=None):
+        self.spec = spec
+        self.view = view
+        self.store = store
+        self.version = version
+        self.theme = theme
+        self.forecasts = forecasts
+        self.queries = queries
+
+    def table(self, name):
+        return self.store.table(name, self.version)
+
+
+def show_chart(page, name, table=None, version=None):
+    # Built once per (country, view, chart, table version, theme); the table is only read on a cache miss.
+    # Charts of derived data are handed their table and the version of the data it was derived from
+    chart = page.spec['charts'][name]
+    if version is None:
+        version = page.store.table_version(chart['source'], page.version)
+    key = (page.spec['country'], page.view, name, version, page.theme)
+    figure = cached_figure(key, lambda: build_figure(chart, page.table(chart['source']) if table is None else table))
+    st.plotly_chart(figure, use_container_width=chart.get('container_width', True))
+
+
+def _table_block(page, block):
+    st.header(block['title'])
+    st.dataframe(shared_view(page.table(block['source'])), use_container_width=True, hide_index=True)
+
+
+def _chart_block(page, block):
+    show_chart(page, block['chart'])
+
+
+@st.fragment(run_every=FORECAST_POLL_SECONDS)
+def _await_forecasts(forecasts):
+    # Only this placeholder reruns while the fits are queued; once they finish the whole page is redrawn
+    if not forecasts.pending():
+        st.rerun()
+    st.info("Fitting the forecast model, it will appear here in a moment.")
+
+
+def _forecast_block(page, block):
+    # Model forecast for the years after the history, against the actual values where they are known
+    st.header(block['title'])
+    st.write(block['caption'])
+    history = page.table(block['history']).set_index('Year')[block['series']]
+    version = page.store.table_version(block['history'], page.version)
+    with span('forecast'):
+        try:
+            forecast = page.forecasts.forecast((page.spec['country'], block['series']), history,
+                                               model=block.get('model', 'ets'), horizon=block.get('horizon', 3),
+                                               version=version)
+        except Exception as error:
+            # Too little history or a fit that failed for this data version; the rest of the view still renders
+            st.warning(f"The forecast is not available: {error}")
+            return
+    if forecast is None:
+        _await_forecasts(page.forecasts)
+        return
+
+    forecast = forecast.rename(columns={'Forecast': block['predicted']})
+    if block.get('actuals'):
+        forecast = forecast.merge(page.table(block['actuals']), on='Year', how='left')
+        forecast['Accuracy (%)'] = accuracy_percent(forecast[block['predicted']], forecast[block['actual']])
+    # Values stay numeric; only the table's styler and the headline below round them for display
+    numbers = [column for column in forecast.columns if column != 'Year']
+    st.table(forecast.style.format(precision=2, na_rep='–', subset=numbers))
+    show_chart(page, block['chart'], forecast, version)
+    if 'Accuracy (%)' in forecast and forecast['Accuracy (%)'].notna().any():
+        total = forecast['Accuracy (%)'].mean()
+        st.markdown(f"<h2 style='color: green; text-align: center;'>Total Accuracy: {total:.2f}%</h2>",
+                    unsafe_allow_html=True)
+
+
+@_fragment('section')
+def _section_block(page, block):
+    # Closed by default; a closed section reads no table and builds no figure, and opening or closing it reruns
+    # only this fragment
+    with st.container(border=True):
+        key = f"section-{page.spec['country']}-{page.view}-{block['title']}"
+        if st.toggle(block['title'], value=block.get('expanded', False), key=key):
+            _render_blocks(page, block['blocks'])
+
+
+@_fragment('query')
+def _query_block(page, block):
+    # Ad-hoc filters over the block's datasets. The query engine filters and aggregates, so only the rows shown
+    # here are read into pandas, and changing a filter reruns only this fragment
+    st.header(block['title'])
+    country = page.spec['country']
+    with span('sync'):
+        page.queries.sync_store(country, page.store, block['datasets'], page.version)
+
+    key = f"query-{country}-{page.view}-{block['title']}"
+    dataset = st.selectbox("Dataset", block['datasets'], key=f"{key}-dataset")
+    years = page.queries.years(country, dataset)
+    if years is None:
+        st.info("This dataset has no values yet.")
+        return
+    label = page.queries.category_label(country, dataset)
+    categories = page.queries.categories(country, dataset)
+    default = [] if len(categories) > QUERY_DEFAULT_CATEGORIES else [
+        category for category in categories if not category.startswith('Total')]
+
+    columns = st.columns([2, 3, 2])
+    if years[0] < years[1]:
+        years = columns[0].slider("Years", years[0], years[1], years, key=f"{key}-{dataset}-years")
+    chosen = columns[1].multiselect(label, categories, default=default, placeholder="All",
+                                    key=f"{key}-{dataset}-categories")
+    summary = QUERY_SUMMARIES[columns[2].radio("Show", list(QUERY_SUMMARIES), key=f"{key}-summary")]
+    group_by, aggregate = summary or ((), None)
+
+    with span('query'):
+        result = page.queries.facts(FactQuery(dataset, country, years, chosen, group_by, aggregate,
+                                              limit=QUERY_ROW_LIMIT + 1))
+    if len(result) > QUERY_ROW_LIMIT:
+        st.caption(f"Showing the first {QUERY_ROW_LIMIT:,} rows; narrow the filters to see the rest.")
+        result = result.head(QUERY_ROW_LIMIT)
+    result = result.drop(columns='country', errors='ignore').rename(
+        columns={'year': 'Year', 'category': label, 'value': 'Value'})
+    st.dataframe(result, use_container_width=True, hide_index=True)
+
+
+BLOCKS = {
+    'table': _table_block,
+    'chart': _chart_block,
+    'forecast': _forecast_block,
+    'section': _section_block,
+    'query': _query_block,
+}
+
+
+def _render_blocks(page, blocks):
+    for block in blocks:
+        with span(f"{block['type']} block"):
+            BLOCKS[block['type']](page, block)
+
+
+def render_view(spec, view, store, theme, forecasts, queries=None):
+    page = _Page(spec, view, store, store.version(), theme, forecasts, queries)
+    layout = spec['views'][view]
+    if layout.get('header_image'):
+        with span('image'):
+            data = image_bytes(layout['header_image'])
+        add_payload('images', len(data))
+        st.image(data, use_column_width=True, output_format='JPEG')
+    _render_blocks(page, layout['blocks'])
+
+
+@_fragment('view')
+def country_page(registry, country, theme, forecasts, queries=None):
+    # The dataset chooser and the chosen view. Choosing another dataset reruns only this fragment, not the login
+    # check, the sidebar and the country lookup of the script around it
+    spec = registry.spec(country)
+    view = st.selectbox("Choose dataset to view", list(spec['views']), key=f"view-{country}")
+    with span('index'):
+        years = registry.years(country)[view]
+    if years:
+        st.caption(f"Covers {years[0]}–{years[1]}")
+    render_view(spec, view, registry.store(country), theme, forecasts, queries)
+
+
+def _milliseconds(seconds):
+    return round(seconds * 1000, 2)
+
+
+def performance_panel(rerun, metrics, profile=None):
+    # Admin view of where this rerun spent its time, the process-wide stage histograms and an optional profile
+    with st.expander("Performance", expanded=True):
+        if rerun is not None:
+            label = 'This fragment rerun' if rerun.kind == 'fragment' else 'This rerun'
+            st.markdown(f"**{label}:** {rerun.seconds * 1000:,.1f} ms, payload "
+                        + ", ".join(f"{kind} {size / 1024:,.0f} KB" for kind, size in sorted(rerun.payload.items())))
+            # In start order, nested spans indented under the stage that contains them
+            spans = sorted(rerun.spans, key=lambda span: span[2])
+            st.dataframe(pd.DataFrame({
+                'stage': ['\u2003' * depth + stage for stage, depth, _, _ in spans],
+                'starts at ms': [_milliseconds(offset) for _, _, offset, _ in spans],
+                'ms': [_milliseconds(seconds) for _, _, _, seconds in spans],
+            }), hide_index=True, use_container_width=True)
+
+        snapshots = {'rerun': metrics.reruns.snapshot(), 'fragment rerun': metrics.fragment_reruns.snapshot(),
+                     **{stage: histogram.snapshot() for stage, histogram in sorted(metrics.stages.items())}}
+        st.markdown("**Since startup** (p50/p99 are histogram bucket bounds)")
+        st.dataframe(pd.DataFrame([
+            {'stage': stage, 'count': snapshot['count'], 'mean ms': round(snapshot['mean_ms'], 2),
+             'p50 ms': snapshot['p50_ms'], 'p99 ms': snapshot['p99_ms']}
+            for stage, snapshot in snapshots.items()]), hide_index=True, use_container_width=True)
+
+        if profile:
+            st.markdown("**Profile of this rerun**")
+            st.code(profile, language=None)
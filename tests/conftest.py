@@ -0,0 +1,5 @@
+import os
+import sys
+
+# Put the repository root first on sys.path so src resolves to this checkout
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
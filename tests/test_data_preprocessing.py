@@ -0,0 +1,23 @@
+import pandas as pd
+import pytest
+
+from src.data_preprocessing import iter_validated_chunks
+
+
+@pytest.mark.parametrize('engine', ['pyarrow', 'c'])
+def test_text_in_a_numeric_column_rejects_only_that_row(tmp_path, engine):
+    # One text value makes the whole temperature column parse as text; "31.0" is still a valid temperature
+    path = tmp_path / 'tourism.csv'
+    path.write_text('month,temperature,local_events,holiday_season,predicted_visitors\n'
+                    '1,25,2,0,400\n'
+                    '2,abc,3,1,500\n'
+                    '3,31.0,4,0,600\n')
+
+    chunks = list(iter_validated_chunks(str(path), engine=engine))
+    clean = pd.concat([chunk for chunk, _, _ in chunks])
+    rejected = pd.concat([report for _, report, _ in chunks], ignore_index=True)
+
+    assert clean.index.tolist() == [0, 2]
+    assert clean['temperature'].tolist() == [25, 31]
+    assert str(clean['temperature'].dtype) == 'int8'
+    assert rejected[['row', 'column', 'value', 'reason']].values.tolist() == [[1, 'temperature', 'abc', 'not a number']]
@@ -0,0 +1,53 @@
+import json
+import os
+import shutil
+
+import pytest
+
+from src.datasets import DatasetRegistry
+from src.views import load_country_specs
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+WORKBOOK = os.path.join(ROOT, 'data', 'new_tourism_data_2010_2015_fixed.xlsx')
+SPEC = os.path.join(ROOT, 'data', 'specs', 'thailand.json')
+COUNTRIES = [
+    "Thailand", "Oman", "United Arab Emirates", "Saudi Arabia", "Qatar",
+    "United Kingdom", "United States", "Canada", "Turkey", "France",
+    "Italy", "Greece", "Spain", "Egypt", "Morocco", "Colombia",
+    "China", "Japan", "India"
+]
+
+
+@pytest.fixture(scope='module')
+def onboarded(tmp_path_factory):
+    # A copy of the Thailand workbook and spec per country, as if 19 countries had been onboarded
+    tmp = tmp_path_factory.mktemp('countries')
+    with open(SPEC, encoding='utf-8') as f:
+        template = json.load(f)
+    specs_dir = tmp / 'specs'
+    specs_dir.mkdir()
+    for country in COUNTRIES:
+        slug = country.lower().replace(' ', '-')
+        workbook = tmp / f"{slug}.xlsx"
+        shutil.copyfile(WORKBOOK, workbook)
+        with open(specs_dir / f"{slug}.json", 'w', encoding='utf-8') as f:
+            json.dump(dict(template, country=country, workbook=str(workbook)), f)
+    return load_country_specs(str(specs_dir)), str(tmp / '.cache'), str(tmp / 'store')
+
+
+def test_index_loads_no_store(onboarded):
+    specs, cache_dir, ingest_dir = onboarded
+    registry = DatasetRegistry(specs, cache_dir=cache_dir, ingest_dir=ingest_dir)
+    index = registry.index()
+    assert sorted(index) == sorted(COUNTRIES)
+    assert index['Thailand']['Weather Patterns'] == (2010, 2015)
+    assert registry.loaded() == []
+
+
+def test_visiting_every_country_keeps_max_loaded_stores(onboarded):
+    specs, cache_dir, ingest_dir = onboarded
+    registry = DatasetRegistry(specs, max_loaded=2, cache_dir=cache_dir, ingest_dir=ingest_dir)
+    for country in registry.countries() * 2:
+        registry.store(country).table('Overall Data')
+        assert len(registry.loaded()) <= registry.max_loaded
+    assert registry.loaded() == registry.countries()[-2:]
@@ -0,0 +1,27 @@
+import os
+import shutil
+
+import joblib
+import numpy as np
+import pytest
+
+from src.model_registry import DEFAULT_MODEL_PATH
+from src.model_training import train_model
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+TOURISM_CSV = os.path.join(ROOT, 'data', 'tourism_data.csv')
+
+
+@pytest.mark.parametrize('chunksize', [7_000, 1_000_000])
+def test_streaming_fit_matches_in_memory_fit(tmp_path, monkeypatch, chunksize):
+    # train_model reads data/ and writes models/ relative to the working directory
+    (tmp_path / 'data').mkdir()
+    shutil.copyfile(TOURISM_CSV, tmp_path / 'data' / 'tourism_data.csv')
+    monkeypatch.chdir(tmp_path)
+
+    train_model(build_lookup_table=False)
+    expected = joblib.load(DEFAULT_MODEL_PATH)
+    train_model(build_lookup_table=False, streaming=True, chunksize=chunksize)
+    actual = joblib.load(DEFAULT_MODEL_PATH)
+    np.testing.assert_allclose(actual.coef_, expected.coef_, rtol=1e-9, atol=1e-8)
+    np.testing.assert_allclose(actual.intercept_, expected.intercept_, rtol=1e-9, atol=1e-8)
@@ -0,0 +1,62 @@
+import asyncio
+import json
+import os
+import shutil
+
+import pytest
+
+from src.model_training import train_model
+from src.prediction_service import PredictionService
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+TOURISM_CSV = os.path.join(ROOT, 'data', 'tourism_data.csv')
+
+BAD_PAYLOADS = {
+    'empty instances': '{"instances": []}',
+    'too few values': '[7, 38, 3]',
+    'missing feature': '{"month": 7, "temperature": 38, "local_events": 3}',
+    'text value': '[7, "hot", 3, 0]',
+    'boolean value': '[7, 38, 3, true]',
+    'nan': '[7, NaN, 3, 0]',
+    'infinity': '{"instances": [[7, 38, 3, 0], [7, Infinity, 3, 0]]}',
+    'float overflow': '[7, 1e400, 3, 0]',
+    'integer overflow': f"[7, {10 ** 400}, 3, 0]",
+    'not json': '[7, 38',
+}
+
+
+@pytest.mark.parametrize('body', BAD_PAYLOADS.values(), ids=BAD_PAYLOADS.keys())
+def test_bad_input_is_a_400(body):
+    # Rejected while parsing, so no model or batcher is needed
+    status, payload = asyncio.run(PredictionService().handle_predict(body.encode()))
+    assert status == 400
+    assert json.dumps(payload) and payload['error']
+
+
+def test_health_and_metrics_report_the_lookup_table(tmp_path, monkeypatch):
+    # train_model reads data/ and writes models/, with the lookup table, relative to the working directory
+    (tmp_path / 'data').mkdir()
+    shutil.copyfile(TOURISM_CSV, tmp_path / 'data' / 'tourism_data.csv')
+    monkeypatch.chdir(tmp_path)
+    train_model()
+
+    async def scenario(service):
+        service.batcher.start()
+        try:
+            # On the integer grid, then between two temperatures
+            for body in ('[7, 38, 3, 0]', '[7, 38.5, 3, 0]'):
+                status, _ = await service.dispatch('POST', '/predict', body.encode())
+                assert status == 200
+        finally:
+            await service.batcher.stop()
+
+    service = PredictionService()
+    asyncio.run(scenario(service))
+
+    status, health = service.health()
+    assert status == 200
+    assert health['lookup_table'] == {'hits': 1, 'lookups': 2, 'hit_rate': 0.5}
+    metrics = service.metrics().splitlines()
+    assert 'wavetour_lookup_table_hits_total 1' in metrics
+    assert 'wavetour_lookup_table_lookups_total 2' in metrics
+    assert 'wavetour_lookup_table_hit_rate 0.5' in metrics
@@ -0,0 +1,48 @@
+import os
+import shutil
+
+import joblib
+import numpy as np
+import pytest
+
+from src.data_preprocessing import FEATURES, load_data
+from src.model_registry import DEFAULT_LINEAR_MODEL_PATH, DEFAULT_LOOKUP_TABLE_PATH, DEFAULT_MODEL_PATH
+from src.model_training import train_model
+from src.predictions import LinearPredictor, LookupTable, TablePredictor, make_prediction
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+TOURISM_CSV = os.path.join(ROOT, 'data', 'tourism_data.csv')
+
+
+def test_linear_predictor_matches_sklearn(tmp_path, monkeypatch):
+    # train_model reads data/ and writes models/ relative to the working directory
+    (tmp_path / 'data').mkdir()
+    shutil.copyfile(TOURISM_CSV, tmp_path / 'data' / 'tourism_data.csv')
+    monkeypatch.chdir(tmp_path)
+    train_model(build_lookup_table=False)
+
+    X = load_data('data/tourism_data.csv')[FEATURES]
+    expected = joblib.load(DEFAULT_MODEL_PATH).predict(X)
+    actual = LinearPredictor.load(DEFAULT_LINEAR_MODEL_PATH).predict(X)
+    np.testing.assert_allclose(actual, expected, rtol=1e-12, atol=1e-9)
+    np.testing.assert_allclose(LinearPredictor.load(DEFAULT_LINEAR_MODEL_PATH).predict(X.to_numpy()), expected,
+                               rtol=1e-12, atol=1e-9)
+
+
+@pytest.fixture
+def table_predictor(tmp_path, monkeypatch):
+    (tmp_path / 'data').mkdir()
+    shutil.copyfile(TOURISM_CSV, tmp_path / 'data' / 'tourism_data.csv')
+    monkeypatch.chdir(tmp_path)
+    train_model()
+    return TablePredictor(LookupTable.load(DEFAULT_LOOKUP_TABLE_PATH), joblib.load(DEFAULT_MODEL_PATH))
+
+
+@pytest.mark.parametrize('row', [[7, 38, 3], [7, 38, 3, 0, 1]])
+def test_lookup_table_leaves_rows_of_the_wrong_length_to_the_model(table_predictor, row):
+    # The table would match the first four features; the model rejects the row as sklearn always did
+    with pytest.raises(ValueError, match='features'):
+        make_prediction(row, model=table_predictor)
+    with pytest.raises(ValueError, match='features'):
+        table_predictor.predict(np.array([row, row]))
+    assert table_predictor.table.hits == 0
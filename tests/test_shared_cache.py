@@ -0,0 +1,110 @@
+import threading
+import time
+
+import pytest
+
+from src.shared_cache import RedisBackend, SQLiteBackend
+
+
+class FakeRedis:
+    # The part of redis-py's client RedisBackend uses, with expiries, in memory
+    def __init__(self):
+        self.entries = {}
+        self.lock = threading.Lock()
+
+    def _live(self, key):
+        value, expires = self.entries.get(key, (None, None))
+        if expires is not None and expires <= time.time():
+            del self.entries[key]
+            return None
+        return value
+
+    def get(self, key):
+        with self.lock:
+            return self._live(key)
+
+    def set(self, key, value, nx=False, ex=None):
+        with self.lock:
+            if nx and self._live(key) is not None:
+                return None
+            self.entries[key] = (value if isinstance(value, bytes) else str(value).encode(),
+                                 None if ex is None else time.time() + ex)
+        return True
+
+    def delete(self, key):
+        with self.lock:
+            self.entries.pop(key, None)
+
+
+@pytest.fixture(params=['sqlite', 'redis'])
+def replicas(request, tmp_path):
+    # Two backends over the same store, as two replicas of the app would open it
+    if request.param == 'sqlite':
+        return [SQLiteBackend(str(tmp_path / 'cache.sqlite')) for _ in range(2)]
+    client = FakeRedis()
+    return [RedisBackend(client=client) for _ in range(2)]
+
+
+def test_concurrent_misses_compute_once(replicas):
+    calls = []
+    started = threading.Event()
+
+    def compute():
+        calls.append(1)
+        started.set()
+        # Keep the lock long enough for the other replica to find the entry missing
+        time.sleep(0.3)
+        return b'value'
+
+    results = [None, None]
+
+    def read(i):
+        if i:
+            started.wait(5)
+        results[i] = replicas[i].get_or_compute('key', compute)
+
+    threads = [threading.Thread(target=read, args=(i,)) for i in range(2)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(10)
+
+    assert results == [b'value', b'value']
+    assert len(calls) == 1
+    assert [replica.computed for replica in replicas] == [1, 0]
+    assert replicas[1].misses == 1
+
+
+def test_entries_expire_after_their_ttl(replicas):
+    writer, reader = replicas
+    writer.set('short', b'gone', ttl=1)
+    writer.set('long', b'kept', ttl=60)
+    assert reader.get('short') == b'gone'
+    time.sleep(1.1)
+    assert reader.get('short') is None
+    assert reader.get('long') == b'kept'
+    assert reader.get_or_compute('short', lambda: b'again') == b'again'
+    assert reader.computed == 1
+
+
+def test_a_lock_is_only_released_by_its_owner(replicas):
+    first, second = replicas
+    assert first.acquire('key')
+    assert not second.acquire('key')
+    second.release('key')
+    assert not second.acquire('key')
+    first.release('key')
+    assert second.acquire('key')
+
+
+def test_sqlite_evicts_the_least_recently_read_entries(tmp_path):
+    backend = SQLiteBackend(str(tmp_path / 'cache.sqlite'), max_bytes=250)
+    for key in ('a', 'b', 'c'):
+        backend.set(key, bytes(100))
+    assert backend.get('a') is None
+    assert backend.get('b') == bytes(100) and backend.get('c') == bytes(100)
+    assert backend.size_bytes() == 200
+
+    # A value larger than the bound evicts everything else but is itself kept
+    backend.set('d', bytes(300))
+    assert [backend.get(key) is not None for key in ('b', 'c', 'd')] == [False, False, True]